@@ -14,6 +14,10 @@ TIMER_FILE_BASELINE_START="$OUTPUT_DIR/timer_baseline_start.txt"
 TIMER_FILE_BASELINE_END="$OUTPUT_DIR/timer_baseline_end.txt"
 VAR_FILE="$OUTPUT_DIR/vars.sh"
 
+UPLOAD_PARALLELISM="${UPLOAD_PARALLELISM:-4}"
+UPLOAD_RETRIES="${UPLOAD_RETRIES:-3}"
+JOB_WAIT_TIMEOUT="${JOB_WAIT_TIMEOUT:-600}"
+
 PERF_OUTPUT_FILE="$OUTPUT_DIR/perf-data.txt"
 PERF_BASELINE_FILE="$OUTPUT_DIR/perf-baseline.txt"
 
@@ -97,9 +101,27 @@ function baseline_measurement() {
     fi
 }
 
+function load_runner_vars() {
+    add_var 'RUNNER_CPU' "$(grep -m1 'model name' /proc/cpuinfo | cut -d: -f2 | sed 's/^[[:space:]]*//' || true)"
+    add_var 'RUNNER_KERNEL' "$(uname -r)"
+    add_var 'RUNNER_HOST' "$(cat /etc/machine-id 2>/dev/null || hostid)"
+}
+
+function runner_needs_baseline() {
+    local METHOD="$1"
+    local resp
+    resp=$(curl -s -G "$SERVER_URL/wattsci/runner-baseline" \
+        --data-urlencode "method=$METHOD" \
+        --data-urlencode "runner_cpu=$RUNNER_CPU" \
+        --data-urlencode "runner_kernel=$RUNNER_KERNEL" \
+        --data-urlencode "runner_host=$RUNNER_HOST") || return 0
+    [[ "$(echo "$resp" | grep -oP '"needs_baseline"\s*:\s*\K(true|false)' || true)" != "false" ]]
+}
+
 function start_measurement() {
     initialize_vars
     load_ci_vars
+    load_runner_vars
     read_vars
     
     local BASELINE="false"
@@ -120,6 +142,15 @@ function start_measurement() {
     shift 3
     local TOOL_ARGS=("$@")
 
+    if [[ "$BASELINE" == "auto" ]]; then
+        if runner_needs_baseline "$METHOD"; then
+            BASELINE="true"
+        else
+            BASELINE="false"
+        fi
+        echo "[INFO] Runner baseline registry: baseline=$BASELINE"
+    fi
+
     date "+%s%6N" >> "$TIMER_FILE_START"
     add_var 'LABEL' "$LABEL"
     add_var 'APPROACH' "$APPROACH"
@@ -155,8 +186,113 @@ function end_measurement() {
     upload_measurement
 }
 
+function upload_chunk() {
+    local chunk="$1"
+    local type="$2"
+    local sha
+    sha=$(sha256sum "$chunk" | cut -d' ' -f1)
+
+    echo "[INFO] Uploading $type chunk: $chunk"
+    local resp
+    resp=$(curl -s -X POST "$SERVER_URL/upload" \
+        -F "chunk=@${chunk}" \
+        -F "chunk_name=$(basename "$chunk")" \
+        -F "type=$type" \
+        -F "sha256=$sha" \
+        "${upload_fields[@]}") || true
+    echo "[DEBUG] Server response: $resp"
+}
+
+function missing_chunks() {
+    local type="$1"
+    local status
+    status=$(curl -fsS "$SERVER_URL/upload/status?session_id=$session_id&type=$type") || return 1
+    if ! grep -qP '"missing"\s*:\s*\[' <<< "$status"; then
+        echo "[WARNING] Unexpected upload status for $type: $status" >&2
+        return 1
+    fi
+    grep -oP '"missing"\s*:\s*\[\K[^\]]*' <<< "$status" | tr -d '" ' | tr ',' '\n' || true
+}
+
+function upload_chunks() {
+    local type="$1"
+    local file="$2"
+    local timer_start="$3"
+    local timer_end="$4"
+    local original_name compressed
+    original_name=$(basename "$file")
+    compressed="$OUTPUT_DIR/${original_name}.gz"
+
+    rm -f "${compressed}_chunk_"*
+    gzip -c "$file" > "$compressed"
+    split -b 10M --numeric-suffixes=1 --suffix-length=3 "$compressed" "${compressed}_chunk_"
+
+    local chunks=("${compressed}_chunk_"*)
+    local manifest="[" sep=""
+    for chunk in "${chunks[@]}"; do
+        manifest+="${sep}{\"name\":\"$(basename "$chunk")\",\"size\":$(stat -c%s "$chunk"),\"sha256\":\"$(sha256sum "$chunk" | cut -d' ' -f1)\"}"
+        sep=","
+    done
+    manifest+="]"
+
+    local resp
+    resp=$(curl -s -X POST "$SERVER_URL/upload/manifest" \
+        -F "type=$type" \
+        -F "chunk_count=${#chunks[@]}" \
+        --form-string "chunks=$manifest" \
+        -F "timer_start=$timer_start" \
+        -F "timer_end=$timer_end" \
+        "${upload_fields[@]}")
+    echo "[DEBUG] Manifest response: $resp"
+
+    if [[ -z "$session_id" ]]; then
+        session_id=$(echo "$resp" | grep -oP '"session_id"\s*:\s*"\K[^"]+' || true)
+        echo "[INFO] Session ID received for $type: $session_id"
+    fi
+    if [[ -z "$session_id" ]]; then
+        echo "[ERROR] Manifest rejected for $type measurement"
+        return 1
+    fi
+
+    local attempt missing name running
+    for ((attempt = 1; attempt <= UPLOAD_RETRIES; attempt++)); do
+        if ! missing=$(missing_chunks "$type"); then
+            echo "[WARNING] Upload status query for $type failed (attempt $attempt)"
+            sleep 2
+            continue
+        fi
+        if [[ -z "$missing" ]]; then
+            echo "[INFO] All $type chunks received"
+            return 0
+        fi
+
+        echo "[INFO] Upload attempt $attempt for $type, parallelism=$UPLOAD_PARALLELISM"
+        running=0
+        while read -r name; do
+            [[ -z "$name" ]] && continue
+            upload_chunk "$OUTPUT_DIR/$name" "$type" &
+            running=$((running + 1))
+            if (( running >= UPLOAD_PARALLELISM )); then
+                wait -n || true
+                running=$((running - 1))
+            fi
+        done <<< "$missing"
+        wait
+    done
+
+    if ! missing=$(missing_chunks "$type"); then
+        echo "[ERROR] Could not confirm $type upload after $UPLOAD_RETRIES attempts"
+        return 1
+    fi
+    if [[ -n "$missing" ]]; then
+        echo "[ERROR] Chunks still missing for $type after $UPLOAD_RETRIES attempts: $(echo $missing)"
+        return 1
+    fi
+    echo "[INFO] All $type chunks received"
+}
+
 function upload_measurement() {
-    local session_id=""
+    local session_id="" upload_failed=""
 
     local upload_fields=(
         -F "CI=$CI"
@@ -169,77 +305,71 @@ function upload_measurement() {
         -F "APPROACH=$APPROACH"
         -F "METHOD=$METHOD"
         -F "LABEL=$LABEL"
+        --form-string "RUNNER_CPU=${RUNNER_CPU:-}"
+        --form-string "RUNNER_KERNEL=${RUNNER_KERNEL:-}"
+        --form-string "RUNNER_HOST=${RUNNER_HOST:-}"
     )
 
     if [[ -n "${BASELINE_OUTPUT_FILE:-}" && -f "$BASELINE_OUTPUT_FILE" ]]; then
         echo "[INFO] Uploading baseline measurement"
-        local original_name baseline_compressed
-        original_name=$(basename "$BASELINE_OUTPUT_FILE")
-        baseline_compressed="$OUTPUT_DIR/${original_name}.gz"
-
-        gzip -c "$BASELINE_OUTPUT_FILE" > "$baseline_compressed"
-        split -b 10M --numeric-suffixes=1 --suffix-length=3 "$baseline_compressed" "${baseline_compressed}_chunk_"
-
-        for chunk in "${baseline_compressed}_chunk_"*; do
-            echo "[INFO] Uploading baseline chunk: $chunk"
-            local resp
-            resp=$(curl -s -X POST "$SERVER_URL/upload" \
-                -F "chunk=@${chunk}" \
-                -F "chunk_name=$(basename "$chunk")" \
-                -F "type=baseline" \
-                -F "timer_start=$(tail -n1 "$TIMER_FILE_BASELINE_START")" \
-                -F "timer_end=$(tail -n1 "$TIMER_FILE_BASELINE_END")" \
-                "${upload_fields[@]}")
-            echo "[DEBUG] Server response: $resp"
-
-            if [[ -z "$session_id" ]]; then
-                session_id=$(echo "$resp" | grep -oP '"session_id"\s*:\s*"\K[^"]+')
-                echo "[INFO] Session ID received for baseline: $session_id"
-            fi
-        done
+        upload_chunks "baseline" "$BASELINE_OUTPUT_FILE" \
+            "$(tail -n1 "$TIMER_FILE_BASELINE_START")" "$(tail -n1 "$TIMER_FILE_BASELINE_END")" \
+            || { echo "[ERROR] Baseline upload incomplete"; upload_failed=1; }
     fi
 
     if [[ -n "${OUTPUT_FILE:-}" && -f "$OUTPUT_FILE" ]]; then
         echo "[INFO] Uploading main measurement"
-        local original_name main_compressed
-        original_name=$(basename "$OUTPUT_FILE")
-        main_compressed="$OUTPUT_DIR/${original_name}.gz"
-
-        gzip -c "$OUTPUT_FILE" > "$main_compressed"
-        split -b 10M --numeric-suffixes=1 --suffix-length=3 "$main_compressed" "${main_compressed}_chunk_"
-
-        for chunk in "${main_compressed}_chunk_"*; do
-            echo "[INFO] Uploading main chunk: $chunk"
-            local resp
-            resp=$(curl -s -X POST "$SERVER_URL/upload" \
-                -F "chunk=@${chunk}" \
-                -F "chunk_name=$(basename "$chunk")" \
-                -F "type=main" \
-                -F "timer_start=$(tail -n1 "$TIMER_FILE_START")" \
-                -F "timer_end=$(tail -n1 "$TIMER_FILE_END")" \
-                "${upload_fields[@]}")
-            echo "[DEBUG] Server response: $resp"
-
-            if [[ -z "$session_id" ]]; then
-                session_id=$(echo "$resp" | grep -oP '"session_id"\s*:\s*"\K[^"]+')
-                echo "[INFO] Session ID received for main: $session_id"
-            fi
-        done
+        upload_chunks "main" "$OUTPUT_FILE" \
+            "$(tail -n1 "$TIMER_FILE_START")" "$(tail -n1 "$TIMER_FILE_END")" \
+            || { echo "[ERROR] Main upload incomplete"; upload_failed=1; }
+    fi
+
+    if [[ -n "$upload_failed" ]]; then
+        echo "[ERROR] Not reconstructing session ${session_id:-<none>} with chunks missing"
+        return 1
     fi
 
     if [[ -n "$session_id" ]]; then
-        local start_time end_time response
-        start_time=$(tail -n 1 "$TIMER_FILE_START")
-        end_time=$(tail -n 1 "$TIMER_FILE_END")
+        local response
         response=$(curl -s -X POST "$SERVER_URL/reconstruct" \
             -F "session_id=$session_id" \
             "${upload_fields[@]}")
         echo "[DEBUG] Reconstruct response: $response"
+
+        local job_id
+        job_id=$(echo "$response" | grep -oP '"job_id"\s*:\s*"\K[^"]+' || true)
+        if [[ -z "$job_id" ]]; then
+            echo "[ERROR] Reconstruction was not queued for session $session_id"
+            return 1
+        fi
+        wait_for_job "$job_id"
     fi
 }
 
+function wait_for_job() {
+    local job_id="$1"
+    local waited=0 status=""
+    while (( waited < JOB_WAIT_TIMEOUT )); do
+        status=$(curl -s "$SERVER_URL/jobs/$job_id" | grep -oP '"status"\s*:\s*"\K[^"]+' || true)
+        case "$status" in
+            succeeded)
+                echo "[INFO] Reconstruction job $job_id succeeded"
+                return 0
+                ;;
+            failed)
+                echo "[ERROR] Reconstruction job $job_id failed"
+                return 1
+                ;;
+        esac
+        sleep 2
+        waited=$((waited + 2))
+    done
+    echo "[ERROR] Reconstruction job $job_id still ${status:-unknown} after ${JOB_WAIT_TIMEOUT}s"
+    return 1
+}
+
 function show_usage() {
-    echo "[INFO] Usage: $0 start_measurement [baseline=true|false] LABEL APPROACH METHOD [TOOL_ARGS ...]"
+    echo "[INFO] Usage: $0 start_measurement [baseline=true|false|auto] LABEL APPROACH METHOD [TOOL_ARGS ...]"
     echo "[INFO]        $0 end_measurement"
     exit 1
 }
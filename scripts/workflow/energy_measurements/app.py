@@ -8,7 +8,13 @@ from controllers.upload_controller import upload_blueprint
 from controllers.result_controller import result_blueprint
 from controllers.consumption_controller import consumption_blueprint
 from controllers.refactor_compare import compare_blueprint
-from db.db import db_session
+from controllers.job_controller import job_blueprint
+from controllers.trend_controller import trend_blueprint
+from controllers.convergence_controller import convergence_blueprint
+from controllers.runner_baseline_controller import runner_baseline_blueprint
+from services.job_service import start_job_workers
+from db.db import db_session, engine
+from db.migrations import run_migrations
 
 if not os.path.exists('logs'):
     os.makedirs('logs')
@@ -27,6 +33,13 @@ app.register_blueprint(upload_blueprint)
 app.register_blueprint(result_blueprint)
 app.register_blueprint(consumption_blueprint)
 app.register_blueprint(compare_blueprint)
+app.register_blueprint(job_blueprint)
+app.register_blueprint(trend_blueprint)
+app.register_blueprint(convergence_blueprint)
+app.register_blueprint(runner_baseline_blueprint)
+
+run_migrations(engine)
+start_job_workers()
 
 @app.before_request
 def log_request_info():
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import requests
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("WATTSCI_CARBON_FALLBACK_INTENSITY", "300")
+
+from services import carbon_service
+from services.carbon_providers import ElectricityMapsProvider
+
+class StubProvider(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), StubProviderHandler)
+        self.latency = latency
+        self.down = False
+        self.calls = Counter()
+
+def _intensity(moment):
+    return 200 + 10 * (moment.hour % 12)
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        self.server.calls[url.path.rsplit("/", 1)[-1]] += 1
+        time.sleep(self.server.latency)
+        if self.server.down:
+            return self._send(503, {"message": "unavailable"})
+        if url.path.endswith("/latest"):
+            return self._send(200, {"zone": params.get("zone"), "carbonIntensity": _intensity(datetime.now(timezone.utc))})
+        start = datetime.fromisoformat(params["start"])
+        end = datetime.fromisoformat(params["end"])
+        data = []
+        while start < end:
+            data.append({"datetime": start.isoformat().replace("+00:00", "Z"), "carbonIntensity": _intensity(start)})
+            start += timedelta(hours=1)
+        self._send(200, {"zone": params.get("zone"), "data": data})
+
+def _window(start, minutes):
+    timer_start = int(start.timestamp() * 1_000_000)
+    return str(timer_start), str(timer_start + minutes * 60 * 1_000_000)
+
+def main():
+    parser = argparse.ArgumentParser(description="Carbon intensity lookups per reconstruct against a local stub provider")
+    parser.add_argument("--ingests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    args = parser.parse_args()
+
+    server = StubProvider(args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/v3"
+    carbon_service.set_provider(ElectricityMapsProvider(url=url, token="stub", timeout=1))
+
+    started = time.perf_counter()
+    for _ in range(args.ingests):
+        for _ in ("baseline", "main"):
+            requests.get(f"{url}/carbon-intensity/latest", headers={"auth-token": "stub"}).json()["carbonIntensity"]
+    legacy = (time.perf_counter() - started) / args.ingests
+    print(f"{args.ingests} reconstructs, {args.latency_ms:g} ms provider latency")
+    print(f"  blocking latest x2     {legacy * 1000:8.2f} ms/reconstruct   {server.calls['latest'] / args.ingests:.2f} calls")
+
+    now = datetime.now(timezone.utc)
+    for label, offset in (("recent windows", timedelta(minutes=10)), ("historical windows", timedelta(hours=5))):
+        server.calls.clear()
+        carbon_service.refresh_carbon_intensity()
+        server.calls.clear()
+        started = time.perf_counter()
+        for i in range(args.ingests):
+            start = now - offset - timedelta(minutes=i % 30)
+            windows = {
+                "baseline": carbon_service.measurement_window(*_window(start, 2)),
+                "main": carbon_service.measurement_window(*_window(start + timedelta(minutes=3), 2))
+            }
+            intensities = carbon_service.carbon_intensity_for_windows(windows)
+        elapsed = (time.perf_counter() - started) / args.ingests
+        print(f"  {label:22s} {elapsed * 1000:8.2f} ms/reconstruct   "
+              f"{sum(server.calls.values()) / args.ingests:.2f} calls   {intensities}")
+    expected = _intensity(start)
+    assert intensities["baseline"] == expected, (intensities, expected)
+
+    carbon_service.set_provider(ElectricityMapsProvider(url=url, token="stub", timeout=1))
+    server.down = True
+    server.calls.clear()
+    started = time.perf_counter()
+    for _ in range(args.ingests):
+        intensities = carbon_service.carbon_intensity_for_windows({"baseline": None, "main": None})
+    elapsed = (time.perf_counter() - started) / args.ingests
+    assert intensities == {"baseline": 300.0, "main": 300.0}, intensities
+    print(f"  provider down          {elapsed * 1000:8.2f} ms/reconstruct   "
+          f"{sum(server.calls.values()) / args.ingests:.2f} calls   fallback {intensities['main']}")
+
+    server.down = False
+    carbon_service.refresh_carbon_intensity()
+    server.down = True
+    server.calls.clear()
+    started = time.perf_counter()
+    for _ in range(args.ingests):
+        intensities = carbon_service.carbon_intensity_for_windows({"baseline": None, "main": None})
+    elapsed = (time.perf_counter() - started) / args.ingests
+    print(f"  down after prefetch    {elapsed * 1000:8.2f} ms/reconstruct   "
+          f"{sum(server.calls.values()) / args.ingests:.2f} calls   last known {intensities['main']}")
+
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+import os
+import sys
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.convergence import check_convergence, fold
+
+WORKLOADS = {"stable (cv 1%)": 0.01, "typical (cv 3%)": 0.03, "noisy (cv 10%)": 0.10}
+
+def simulate(cv, max_runs, rng, base=None, shift=0.0):
+    moments = None
+    for _ in range(max_runs):
+        moments = fold(moments, rng.normal(100 * (1 + shift), 100 * cv))
+        verdict = check_convergence({"pkg": moments}, base and {"pkg": base}, max_runs=max_runs)
+        if verdict["status"] == "done":
+            break
+    return verdict, moments
+
+def main():
+    parser = argparse.ArgumentParser(description="Runs needed before the convergence check answers done")
+    parser.add_argument("--trials", type=int, default=300)
+    parser.add_argument("--max-runs", type=int, default=30)
+    parser.add_argument("--shift", type=float, default=-0.05, help="true relative change of the refactor")
+    args = parser.parse_args()
+    rng = np.random.default_rng(3)
+
+    print(f"precision rule, {args.trials} simulated sessions per workload")
+    for label, cv in WORKLOADS.items():
+        runs, errors = [], []
+        for _ in range(args.trials):
+            verdict, moments = simulate(cv, args.max_runs, rng)
+            runs.append(moments[0])
+            errors.append(abs(moments[1] - 100) / 100)
+        print(f"  {label:16s} mean runs {np.mean(runs):5.1f}   p95 error of the mean {np.percentile(errors, 95):.2%}   "
+              f"CI minutes saved {1 - np.mean(runs) / args.max_runs:.0%}")
+
+    print(f"\nsequential comparison against a {args.max_runs}-run base")
+    for label, cv in WORKLOADS.items():
+        for shift in (0.0, args.shift):
+            runs, decided = [], 0
+            for _ in range(args.trials):
+                base = None
+                for value in rng.normal(100, 100 * cv, args.max_runs):
+                    base = fold(base, value)
+                verdict, moments = simulate(cv, args.max_runs, rng, base, shift)
+                runs.append(moments[0])
+                decided += verdict["reason"] == "decided"
+            print(f"  {label:16s} shift {shift:+.0%}   mean runs {np.mean(runs):5.1f}   decided {decided / args.trials:.1%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
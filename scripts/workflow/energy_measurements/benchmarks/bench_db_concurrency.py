@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import threading
+from datetime import datetime
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_result_queries import _summary, populate
+from db.db import create_db_engine, db_session
+from db.migrations import run_migrations
+from models.result import Result
+from services.import_service import bulk_insert_results
+from services.rollup_service import apply_rollup, rollup_rows
+
+def _record(rng, i, repositories, branches):
+    return {
+        "session_id": f"bench-{i}",
+        "ci": "github",
+        "run_id": str(2000000 + i),
+        "branch": f"branch-{rng.randrange(branches)}",
+        "repository": f"org/repo-{rng.randrange(repositories)}",
+        "workflow_id": f"workflow-{rng.randrange(10)}",
+        "workflow_name": "energy",
+        "commit_hash": f"{rng.getrandbits(160):040x}",
+        "approach": "original",
+        "method": "perf",
+        "label": "main",
+        "json_main": f"/uploads/bench-{i}/main/measurement0/decompressed.json",
+        "json_baseline": f"/uploads/bench-{i}/baseline/measurement0/decompressed.json",
+        "summary_main": _summary(rng),
+        "summary_baseline": _summary(rng),
+        "created_at": datetime.utcnow()
+    }
+
+class Worker(threading.Thread):
+    def __init__(self, engine, stop, seed, args):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.stop = stop
+        self.rng = random.Random(seed)
+        self.args = args
+        self.latencies = []
+        self.errors = 0
+
+    def run(self):
+        while not self.stop.is_set():
+            start = time.perf_counter()
+            try:
+                with Session(self.engine) as session:
+                    self.operation(session)
+                self.latencies.append(time.perf_counter() - start)
+            except OperationalError:
+                self.errors += 1
+
+class Reader(Worker):
+    def operation(self, session):
+        session.query(Result).filter(
+            Result.repository == f"org/repo-{self.rng.randrange(self.args.repositories)}",
+            Result.branch == f"branch-{self.rng.randrange(self.args.branches)}"
+        ).all()
+
+class Writer(Worker):
+    counter = iter(range(10 ** 9))
+
+    def operation(self, session):
+        result = Result(**_record(self.rng, next(Writer.counter), self.args.repositories, self.args.branches))
+        session.add(result)
+        session.flush()
+        apply_rollup(session, rollup_rows(result, result.summary_main, result.summary_baseline))
+        session.commit()
+
+def _percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+def run_mixed(engine, args):
+    stop = threading.Event()
+    workers = [Reader(engine, stop, i, args) for i in range(args.readers)]
+    workers += [Writer(engine, stop, 1000 + i, args) for i in range(args.writers)]
+    for worker in workers:
+        worker.start()
+    time.sleep(args.duration)
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    stats = {}
+    for kind in (Reader, Writer):
+        group = [w for w in workers if isinstance(w, kind)]
+        latencies = [l for w in group for l in w.latencies]
+        stats[kind.__name__.lower() + "s"] = (
+            len(latencies) / args.duration,
+            _percentile(latencies, 0.5),
+            _percentile(latencies, 0.95),
+            sum(w.errors for w in group)
+        )
+    return stats
+
+def run_imports(engine, args):
+    rng = random.Random(99)
+    start = time.perf_counter()
+    with Session(engine) as session:
+        for i in range(args.import_rows):
+            result = Result(**_record(rng, 10 ** 8 + i, args.repositories, args.branches))
+            session.add(result)
+            session.flush()
+            apply_rollup(session, rollup_rows(result, result.summary_main, result.summary_baseline))
+            session.commit()
+    per_row = time.perf_counter() - start
+
+    db_session.remove()
+    db_session.configure(bind=engine)
+    records = [_record(rng, 2 * 10 ** 8 + i, args.repositories, args.branches) for i in range(args.import_rows)]
+    start = time.perf_counter()
+    bulk_insert_results(records, args.batch_size)
+    bulk = time.perf_counter() - start
+    db_session.remove()
+    return per_row, bulk
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput and latency of concurrent result readers and writers")
+    parser.add_argument("--url", help="database URL (defaults to a temporary SQLite file per journal mode)")
+    parser.add_argument("--journal-modes", default="WAL,DELETE", help="SQLite journal modes to compare")
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repositories", type=int, default=50)
+    parser.add_argument("--branches", type=int, default=5)
+    parser.add_argument("--import-rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.url:
+        targets = [(args.url, None)]
+    else:
+        targets = [
+            (f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='wattsci-bench-'), 'results.db')}", mode)
+            for mode in args.journal_modes.split(",")
+        ]
+
+    for url, journal_mode in targets:
+        engine = create_db_engine(url, journal_mode=journal_mode, pool_size=args.readers + args.writers)
+        run_migrations(engine)
+        populate(engine, args.rows, args.repositories, args.branches, args.seed)
+
+        label = f"{engine.dialect.name}" + (f" journal_mode={journal_mode}" if journal_mode else "")
+        print(f"\n{label}: {args.readers} readers, {args.writers} writers, {args.duration:.0f}s, {args.rows} rows")
+        for name, (rate, median, p95, errors) in run_mixed(engine, args).items():
+            print(f"  {name:8s} {rate:9.1f} ops/s   median {median * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms   errors {errors}")
+
+        per_row, bulk = run_imports(engine, args)
+        print(f"  import of {args.import_rows} results: per-row commits {per_row:.2f}s, "
+              f"bulk_insert_results {bulk:.2f}s ({per_row / max(bulk, 1e-9):.1f}x)")
+        engine.dispose()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.github_client import GitHubClient
+from tests.fake_github import FakeGitHub
+
+def legacy_compare(base_url, repo, base, branch, token):
+    headers = {"Authorization": f"Bearer {token}", "Accept": "application/vnd.github+json"}
+    response = requests.get(f"{base_url}/repos/{repo}/pulls?head={repo.split('/')[0]}:{branch}&base={base}", headers=headers)
+    if response.status_code == 200 and response.json():
+        number = response.json()[0]["number"]
+    else:
+        response = requests.post(f"{base_url}/repos/{repo}/pulls", headers=headers, json={"head": branch, "base": base})
+        number = response.json()["number"]
+    requests.post(f"{base_url}/repos/{repo}/issues/{number}/comments", headers=headers, json={"body": "x"})
+    return number
+
+def client_compare(client, repo, base, branch, token):
+    number = client.create_pull_request(repo, base, branch, token, title="GreenCodeRefactor")
+    client.post_comment(repo, number, token, "x")
+    return number
+
+def run(server, compare, compares, repos):
+    server.clear_pulls()
+    server.reset()
+    started = time.perf_counter()
+    numbers = [compare(f"org/repo-{i % repos}", "main", "refactor") for i in range(compares)]
+    elapsed = time.perf_counter() - started
+    return numbers, elapsed, sum(server.calls.values()), server.connections
+
+def main():
+    parser = argparse.ArgumentParser(description="GitHub round trips per compare against a local fake GitHub server")
+    parser.add_argument("--compares", type=int, default=200)
+    parser.add_argument("--repos", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    server = FakeGitHub(args.latency_ms / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    token = "ghp_bench"
+
+    legacy = run(server, lambda r, b, h: legacy_compare(base_url, r, b, h, token), args.compares, args.repos)
+    client = GitHubClient(base_url=base_url, backoff=0.01)
+    pooled = run(server, lambda r, b, h: client_compare(client, r, b, h, token), args.compares, args.repos)
+    assert legacy[0] == pooled[0], "PR numbers differ between legacy and pooled paths"
+
+    print(f"{args.compares} compares over {args.repos} repositories, {args.latency_ms:g} ms server latency")
+    for label, (_, elapsed, calls, connections) in (("plain requests", legacy), ("pooled client", pooled)):
+        print(f"  {label:15s} {elapsed * 1000 / args.compares:6.2f} ms/compare   "
+              f"{calls / args.compares:.2f} requests/compare   {connections} connections")
+
+    server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from methods.perf_parser import PerfAccumulator
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+DEFAULT_GLOB = os.path.join(REPO_ROOT, "evaluation", "results", "energy_measurements", "*", "*", "measurement*", "decompressed")
+
+def parse_regex(text):
+    data = {}
+    line_pattern = re.compile(r"^\s*([\d.,]+)\s+([\d.,]+)\s+\w+\s+(\S+)")
+    for line in text.splitlines():
+        match = line_pattern.match(line)
+        if match:
+            _, value_str, event = match.groups()
+            value = float(value_str.replace(",", "."))
+            data.setdefault(event, []).append(value)
+    return data
+
+def parse_bulk(raw, block_size):
+    accumulator = PerfAccumulator()
+    for i in range(0, len(raw), block_size):
+        accumulator.feed(raw[i:i + block_size])
+    return accumulator.close()
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the per-line regex parser with the bulk perf parser")
+    parser.add_argument("paths", nargs="*", help="decompressed perf-stat files (defaults to evaluation/results)")
+    parser.add_argument("--scale", type=int, default=20, help="concatenate the input this many times")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--block-size", type=int, default=8 * 1024 * 1024)
+    parser.add_argument("--comma", action="store_true", help="rewrite decimals with ',' to exercise locale handling")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(DEFAULT_GLOB))
+    if not paths:
+        print("No input files found")
+        return 1
+
+    raw = b"".join(open(p, "rb").read() for p in paths) * args.scale
+    if args.comma:
+        raw = re.sub(rb"(\d)\.(\d)", rb"\1,\2", raw)
+    lines = raw.count(b"\n")
+    print(f"{len(paths)} files x{args.scale}: {len(raw) / 1e6:.1f} MB, {lines} lines")
+
+    regex_time, expected = best_of(lambda: parse_regex(raw.decode("utf-8")), args.repeat)
+    bulk_time, actual = best_of(lambda: parse_bulk(raw, args.block_size), args.repeat)
+
+    for event, values in expected.items():
+        if not np.array_equal(np.asarray(values), actual[event]):
+            print(f"MISMATCH for {event}")
+            return 1
+
+    print(f"regex: {regex_time:.3f} s ({lines / regex_time / 1e6:.2f} M lines/s)")
+    print(f"bulk:  {bulk_time:.3f} s ({lines / bulk_time / 1e6:.2f} M lines/s)")
+    print(f"speedup: {regex_time / bulk_time:.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.result import Result
+from db.migrations import run_migrations
+
+BATCH_SIZE = 10000
+
+def _summary(rng):
+    consumption = rng.uniform(4, 8)
+    return {
+        "delta_t_seconds": round(rng.uniform(20, 40), 2),
+        "events": {
+            "power/energy-pkg/": {"unit": "W", "mean": round(consumption / 27, 2), "consumption": round(consumption, 2)},
+            "power/energy-cores/": {"unit": "W", "mean": round(consumption / 28, 2), "consumption": round(consumption * 0.95, 2)}
+        }
+    }
+
+def populate(engine, count, repositories, branches, seed):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    table = Result.__table__
+    rows = []
+    with engine.begin() as connection:
+        for i in range(count):
+            repository = f"org/repo-{rng.randrange(repositories)}"
+            run_id = str(1000000 + i // 4)
+            rows.append({
+                "session_id": f"session-{i}",
+                "ci": "github",
+                "run_id": run_id,
+                "branch": f"branch-{rng.randrange(branches)}",
+                "repository": repository,
+                "workflow_id": f"workflow-{rng.randrange(10)}",
+                "workflow_name": "energy",
+                "commit_hash": f"{rng.getrandbits(160):040x}",
+                "approach": rng.choice(("original", "refactored")),
+                "method": "perf",
+                "label": rng.choice(("baseline", "main", "nightly")),
+                "json_main": f"/uploads/session-{i}/main/measurement0/decompressed.json",
+                "json_baseline": f"/uploads/session-{i}/baseline/measurement0/decompressed.json",
+                "summary_main": _summary(rng),
+                "summary_baseline": _summary(rng),
+                "created_at": start + timedelta(seconds=i * 30)
+            })
+            if len(rows) == BATCH_SIZE:
+                connection.execute(table.insert(), rows)
+                rows = []
+        if rows:
+            connection.execute(table.insert(), rows)
+
+def pick_targets(engine, samples, seed):
+    rng = random.Random(seed + 1)
+    with engine.connect() as connection:
+        total = connection.execute(text("SELECT max(id) FROM results")).scalar()
+        ids = [rng.randint(1, total) for _ in range(samples)]
+        rows = [
+            connection.execute(
+                text("SELECT repository, branch, commit_hash, run_id FROM results WHERE id = :id"), {"id": i}
+            ).one()
+            for i in ids
+        ]
+    return rows
+
+QUERIES = {
+    "/wattsci?repository&branch": lambda s, t: s.query(Result).filter(
+        Result.repository == t.repository, Result.branch == t.branch
+    ).all(),
+    "/wattsci?commit_hash": lambda s, t: s.query(Result).filter(Result.commit_hash == t.commit_hash).all(),
+    "/wattsci?run_id": lambda s, t: s.query(Result).filter(Result.run_id == t.run_id).all(),
+    "/wattsci/consumption": lambda s, t: s.query(Result).filter(
+        Result.repository == t.repository, Result.branch == t.branch
+    ).all(),
+    "/wattsci/compare": lambda s, t: s.query(Result).filter(
+        Result.repository == t.repository, Result.branch == t.branch
+    ).order_by(Result.created_at.desc(), Result.id.desc()).first()
+}
+
+def measure(engine, targets):
+    timings = {}
+    for name, query in QUERIES.items():
+        samples = []
+        for target in targets:
+            with Session(engine) as session:
+                start = time.perf_counter()
+                query(session, target)
+                samples.append(time.perf_counter() - start)
+        samples.sort()
+        timings[name] = (samples[len(samples) // 2], samples[int(len(samples) * 0.95)])
+    return timings
+
+def explain(engine, target):
+    if engine.dialect.name != "sqlite":
+        return {}
+    plans = {}
+    with Session(engine) as session:
+        for name, query in QUERIES.items():
+            statement = None
+
+            def capture(conn, cursor, sql, parameters, context, executemany):
+                nonlocal statement
+                if statement is None:
+                    statement = (sql, parameters)
+
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                query(session, target)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+            sql, parameters = statement
+            rows = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", parameters).all()
+            plans[name] = "; ".join(row[-1] for row in rows)
+    return plans
+
+def drop_indexes(engine):
+    with engine.begin() as connection:
+        for index in Result.__table__.indexes:
+            if index.name != "ix_results_id":
+                index.drop(connection, checkfirst=True)
+
+def create_indexes(engine):
+    with engine.begin() as connection:
+        for index in Result.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        if engine.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+
+def report(label, timings, plans):
+    print(f"\n{label}")
+    for name, (median, p95) in timings.items():
+        print(f"  {name:30s} median {median * 1000:8.2f} ms   p95 {p95 * 1000:8.2f} ms")
+        if name in plans:
+            print(f"  {'':30s} plan: {plans[name]}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Query latency of the result endpoints with and without the result indexes")
+    parser.add_argument("--url", help="database URL (defaults to a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=300000)
+    parser.add_argument("--repositories", type=int, default=200)
+    parser.add_argument("--branches", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='wattsci-bench-'), 'results.db')}"
+    engine = create_engine(url)
+    run_migrations(engine)
+    drop_indexes(engine)
+
+    start = time.perf_counter()
+    populate(engine, args.rows, args.repositories, args.branches, args.seed)
+    print(f"inserted {args.rows} results in {time.perf_counter() - start:.1f}s -> {url}")
+
+    targets = pick_targets(engine, args.samples, args.seed)
+    before = measure(engine, targets)
+    before_plans = explain(engine, targets[0])
+
+    start = time.perf_counter()
+    create_indexes(engine)
+    print(f"built indexes in {time.perf_counter() - start:.1f}s")
+
+    after = measure(engine, targets)
+    after_plans = explain(engine, targets[0])
+
+    report("without indexes", before, before_plans)
+    report("with indexes", after, after_plans)
+    print("\nspeedup (median)")
+    for name in QUERIES:
+        print(f"  {name:30s} {before[name][0] / max(after[name][0], 1e-9):8.1f}x")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import sys
+import argparse
+import tempfile
+import numpy as np
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.db import create_db_engine, db_session
+from db.migrations import run_migrations
+from models.runner_baseline import RunnerBaseline
+from services.baseline_service import (
+    record_runner_baseline,
+    runner_baseline_status,
+    runner_baseline_summary,
+    runner_fingerprint
+)
+
+IDLE_POWER = {"power/energy-pkg/": 2.0, "power/energy-cores/": 0.6}
+
+def _capture(rng, idle, cv):
+    events = {}
+    for event, power in idle.items():
+        mean = rng.normal(power, power * cv)
+        events[event] = {"mean": mean, "min": mean * 0.8, "max": mean * 1.3, "consumption": mean * 5}
+    return {"events": events}
+
+def _age(hours):
+    for row in db_session.query(RunnerBaseline):
+        row.updated_at -= timedelta(hours=hours)
+    db_session.commit()
+
+def simulate(args, rng, fingerprint):
+    idle = dict(IDLE_POWER)
+    measured, errors, drift_seen = 0, [], None
+    for session in range(args.sessions):
+        if session == args.drift_at:
+            idle = {event: power * (1 + args.drift) for event, power in idle.items()}
+        if runner_baseline_status(fingerprint, "perf")["needs_baseline"]:
+            capture = _capture(rng, idle, args.cv)
+            record_runner_baseline(fingerprint, "perf", capture)
+            used = capture["events"]
+            measured += 1
+        else:
+            used = runner_baseline_summary(fingerprint, "perf")["events"]
+        db_session.commit()
+
+        error = abs(used["power/energy-pkg/"]["mean"] - idle["power/energy-pkg/"]) / idle["power/energy-pkg/"]
+        errors.append(error)
+        if session >= args.drift_at and drift_seen is None and error < 2 * args.cv:
+            drift_seen = session - args.drift_at
+        _age(24 / args.sessions_per_day)
+    return measured, np.array(errors), drift_seen
+
+def main():
+    parser = argparse.ArgumentParser(description="Baseline captures and wall time with the per-runner idle baseline registry")
+    parser.add_argument("--sessions", type=int, default=300)
+    parser.add_argument("--sessions-per-day", type=float, default=30)
+    parser.add_argument("--cv", type=float, default=0.03, help="capture-to-capture noise of idle power")
+    parser.add_argument("--drift-at", type=int, default=150)
+    parser.add_argument("--drift", type=float, default=0.2)
+    parser.add_argument("--baseline-seconds", type=float, default=30)
+    parser.add_argument("--main-seconds", type=float, default=30)
+    args = parser.parse_args()
+
+    engine = create_db_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='wattsci-bench-'), 'results.db')}")
+    run_migrations(engine)
+    db_session.remove()
+    db_session.configure(bind=engine)
+
+    rng = np.random.default_rng(11)
+    fingerprint = runner_fingerprint("Bench CPU", "6.1.0", "bench-host")
+    measured, errors, drift_seen = simulate(args, rng, fingerprint)
+
+    always = args.sessions * (args.baseline_seconds + args.main_seconds)
+    registry = measured * args.baseline_seconds + args.sessions * args.main_seconds
+    before, after = errors[:args.drift_at], errors[args.drift_at:]
+    print(f"{args.sessions} sessions, {args.sessions_per_day:g}/day, idle noise {args.cv:.0%}, "
+          f"{args.drift:+.0%} idle drift at session {args.drift_at}")
+    print(f"  baseline captures        {measured} of {args.sessions} ({measured / args.sessions:.0%})")
+    print(f"  measurement wall time    {registry / always:.0%} of baseline-every-session")
+    print(f"  idle error, stable       median {np.median(before):.2%}   p95 {np.percentile(before, 95):.2%}   "
+          f"(single capture: {args.cv * 0.674:.2%} median)")
+    print(f"  idle error, after drift  median {np.median(after):.2%}   recovered after {drift_seen} sessions")
+    db_session.remove()
+    engine.dispose()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
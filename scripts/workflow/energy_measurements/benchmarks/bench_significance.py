@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.significance import compare_distributions
+
+EVENTS = {"power/energy-pkg/": 120.0, "power/energy-cores/": 90.0, "power/energy-ram/": 12.0}
+
+def sessions(runs, shift, rng):
+    base = {event: rng.lognormal(np.log(mean), 0.05, runs) for event, mean in EVENTS.items()}
+    refactor = {event: rng.lognormal(np.log(mean * (1 + shift)), 0.05, runs) for event, mean in EVENTS.items()}
+    return base, refactor
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and error rates of the refactor significance engine")
+    parser.add_argument("--runs", default="10,100,1000,3000", help="measurements per session")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--trials", type=int, default=200, help="simulated comparisons for the error rates")
+    parser.add_argument("--shift", type=float, default=-0.02, help="true relative change for the power estimate")
+    args = parser.parse_args()
+    rng = np.random.default_rng(11)
+
+    print("latency per comparison")
+    for runs in (int(r) for r in args.runs.split(",")):
+        base, refactor = sessions(runs, args.shift, rng)
+        compare_distributions(base, refactor)
+        samples = []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            compare_distributions(base, refactor)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        print(f"  {runs:6d} runs/session  median {samples[len(samples) // 2] * 1000:7.2f} ms   "
+              f"max {samples[-1] * 1000:7.2f} ms")
+
+    print(f"\nverdicts over {args.trials} simulated comparisons with 30 runs/session")
+    for label, shift in (("no change (false positives)", 0.0), (f"{args.shift:+.0%} change (power)", args.shift)):
+        flagged = 0
+        for trial in range(args.trials):
+            base, refactor = sessions(30, shift, rng)
+            verdicts = compare_distributions(base, refactor, seed=trial)
+            flagged += sum(v["status"] != "no_significant_change" for v in verdicts.values())
+        print(f"  {label:30s} {flagged / (args.trials * len(EVENTS)):.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import os
+import io
+import sys
+import glob
+import gzip
+import json
+import time
+import queue
+import random
+import shutil
+import hashlib
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".."))
+CAPTURE_ROOT = os.path.join(REPO_ROOT, "evaluation", "results", "energy_measurements", "original")
+CHUNK_SIZE = 16 * 1024
+
+def _capture(kind, index):
+    paths = sorted(glob.glob(os.path.join(CAPTURE_ROOT, kind, "measurement*")))
+    path = paths[index % len(paths)]
+    with open(os.path.join(path, "data", "timer_start.txt")) as f:
+        timer_start = f.read().strip()
+    with open(os.path.join(path, "data", "timer_end.txt")) as f:
+        timer_end = f.read().strip()
+    return os.path.join(path, "decompressed"), timer_start, timer_end
+
+def _local_worker(session_dir, worker, measurements, barrier):
+    from methods.perf2 import perf
+    from services.storage_service import allocate_numbered_dir, session_lock
+
+    barrier.wait()
+    for i in range(measurements):
+        allocate_numbered_dir(os.path.join(session_dir, "allocations"), "measurement")
+
+        capture, timer_start, timer_end = _capture("main", worker * measurements + i)
+        with session_lock(session_dir):
+            shutil.copy(capture, os.path.join(session_dir, "perf.txt"))
+            perf(session_dir, "perf.txt", timer_start, timer_end, False).process()
+
+def run_local(args):
+    from methods.perf2 import perf
+
+    session_dir = tempfile.mkdtemp(prefix="wattsci-stress-")
+    os.makedirs(os.path.join(session_dir, "allocations"))
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.processes)
+    workers = [
+        context.Process(target=_local_worker, args=(session_dir, w, args.iterations, barrier))
+        for w in range(args.processes)
+    ]
+
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    expected = args.processes * args.iterations
+    failures = [w.exitcode for w in workers if w.exitcode]
+    allocated = os.listdir(os.path.join(session_dir, "allocations"))
+    data = perf(session_dir, "perf.txt", None, None, False).load(exact=True)
+    keys = [k for k in data if k.startswith("measurement_")]
+    samples = data.get("aggregate", {}).get("withBaseline", {})
+
+    problems = []
+    if failures:
+        problems.append(f"{len(failures)} workers exited with errors")
+    if len(allocated) != expected:
+        problems.append(f"allocated {len(allocated)} measurement dirs, expected {expected}")
+    if len(keys) != expected:
+        problems.append(f"session has {len(keys)} measurements, expected {expected}")
+    if any(event.get("samples") != expected for event in samples.values()):
+        problems.append("aggregate does not cover every measurement")
+
+    print(f"local: {args.processes} processes x {args.iterations} measurements in {elapsed:.2f}s -> {session_dir}")
+    return problems
+
+def _form(args):
+    return {
+        "CI": "stress", "RUN_ID": str(args.run_id), "REF_NAME": "stress", "REPOSITORY": "stress/stress",
+        "WORKFLOW_ID": "stress", "WORKFLOW_NAME": "stress", "COMMIT_HASH": "stress",
+        "APPROACH": "stress", "METHOD": "perf", "LABEL": "stress"
+    }
+
+def _upload(http, url, form, kind, capture, timer_start, timer_end):
+    with open(capture, "rb") as f:
+        compressed = gzip.compress(f.read(), mtime=0)
+    parts = [compressed[i:i + CHUNK_SIZE] for i in range(0, len(compressed), CHUNK_SIZE)]
+    names = [f"stress.gz_chunk_{i + 1:03d}" for i in range(len(parts))]
+    manifest = [
+        {"name": name, "size": len(part), "sha256": hashlib.sha256(part).hexdigest()}
+        for name, part in zip(names, parts)
+    ]
+    response = http.post(f"{url}/upload/manifest", data={
+        **form, "type": kind, "chunks": json.dumps(manifest), "timer_start": timer_start, "timer_end": timer_end
+    })
+    response.raise_for_status()
+
+    order = list(range(len(parts)))
+    random.shuffle(order)
+    for i in order:
+        response = http.post(
+            f"{url}/upload",
+            data={**form, "type": kind, "chunk_name": names[i], "sha256": manifest[i]["sha256"]},
+            files={"chunk": (names[i], io.BytesIO(parts[i]))}
+        )
+        response.raise_for_status()
+        session_id = response.json()["session_id"]
+    return session_id
+
+def _wait_for_job(http, url, job_id, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = http.get(f"{url}/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.2)
+    return {"id": job_id, "status": "timeout"}
+
+def _http_worker(args, worker, barrier, results):
+    import requests
+
+    http = requests.Session()
+    form = _form(args)
+    for round_index in range(args.iterations):
+        barrier.wait(args.timeout)
+        session_id = None
+        for kind in ("baseline", "main"):
+            capture, timer_start, timer_end = _capture(kind, round_index)
+            session_id = _upload(http, args.url, form, kind, capture, timer_start, timer_end)
+
+        barrier.wait(args.timeout)
+        response = http.post(f"{args.url}/reconstruct", data={**form, "session_id": session_id})
+        response.raise_for_status()
+        job = _wait_for_job(http, args.url, response.json()["job_id"], args.timeout)
+        results.put((round_index, worker, job))
+
+def run_http(args):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(args.processes)
+    results = context.Queue()
+    workers = [
+        context.Process(target=_http_worker, args=(args, w, barrier, results))
+        for w in range(args.processes)
+    ]
+
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    problems = []
+    jobs = []
+    try:
+        for _ in range(args.processes * args.iterations):
+            jobs.append(results.get(timeout=args.timeout))
+    except queue.Empty:
+        problems.append(f"only {len(jobs)} reconstructions reported back")
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    if any(w.exitcode for w in workers):
+        problems.append(f"{sum(1 for w in workers if w.exitcode)} workers exited with errors")
+    paths = []
+    for round_index in range(args.iterations):
+        round_jobs = [job for r, _, job in jobs if r == round_index]
+        succeeded = [job for job in round_jobs if job["status"] == "succeeded"]
+        if len(succeeded) != 1:
+            problems.append(f"round {round_index}: {len(succeeded)} reconstructions succeeded, expected 1")
+        for job in round_jobs:
+            if job["status"] == "timeout":
+                problems.append(f"round {round_index}: job {job['id']} did not finish")
+        for job in succeeded:
+            paths += [job["result"]["json_main"], job["result"]["json_baseline"]]
+
+    if len(set(paths)) != len(paths):
+        problems.append("two jobs reported the same measurement directory")
+    for path in paths:
+        if os.path.exists(path):
+            with open(path) as f:
+                json.load(f)
+
+    print(f"http: {args.processes} processes x {args.iterations} rounds in {elapsed:.2f}s, {len(paths) // 2} measurements")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Hammer one session with concurrent uploads and reconstructions")
+    parser.add_argument("--mode", choices=("local", "http"), default="local")
+    parser.add_argument("--url", default="http://localhost:5000", help="server for --mode http")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--run-id", type=int, default=int(time.time()), help="distinct RUN_ID gives a fresh session")
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    problems = run_local(args) if args.mode == "local" else run_http(args)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    if not problems:
+        print("OK")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
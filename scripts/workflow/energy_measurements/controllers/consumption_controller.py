@@ -1,11 +1,17 @@
+import os
 import logging
 from flask import Blueprint, request, jsonify
-from services.result_service import get_results_by_repo_branch
+from services.result_service import get_results_by_repo_branch, get_results_by_repo_branches
+from services.cache_service import cached_response
 
 logger = logging.getLogger(__name__)
 consumption_blueprint = Blueprint("consumption", __name__)
 
+BATCH_LIMIT = int(os.environ.get("WATTSCI_CONSUMPTION_BATCH_LIMIT", "500"))
+BATCH_KEYS = ("repo", "branch", "from_commit", "to_commit")
+
 @consumption_blueprint.route("/wattsci/consumption", methods=["GET"])
+@cached_response("repo")
 def get_consumption():
     repo = request.args.get("repo")
     branch = request.args.get("branch")
@@ -21,3 +27,40 @@ def get_consumption():
     except Exception as e:
         logger.error(f"Error fetching consumption results: {e}", exc_info=True)
         return jsonify({"error": str(e)}), 500
+
+def _normalize_query(entry):
+    if not isinstance(entry, dict):
+        return None
+    query = {k: str(entry[k]).strip() for k in BATCH_KEYS if entry.get(k)}
+    if not query.get("repo") or not query.get("branch"):
+        return None
+    return query
+
+@consumption_blueprint.route("/wattsci/consumption/batch", methods=["POST"])
+def get_consumption_batch():
+    body = request.get_json(silent=True) or {}
+    entries = body.get("queries")
+
+    if not isinstance(entries, list) or not entries:
+        logger.warning("Consumption batch called without queries")
+        return jsonify({"error": "Missing queries"}), 400
+    if len(entries) > BATCH_LIMIT:
+        return jsonify({"error": f"Too many queries: {len(entries)} (limit {BATCH_LIMIT})"}), 400
+
+    queries = [_normalize_query(entry) for entry in entries]
+    valid = [query for query in queries if query is not None]
+
+    try:
+        logger.info(f"Fetching consumption results for {len(valid)} repository/branch queries")
+        resolved = iter(get_results_by_repo_branches(valid))
+        results = [
+            next(resolved) if query is not None else {
+                **{k: entry.get(k) for k in BATCH_KEYS if isinstance(entry, dict)},
+                "error": "Each query needs repo and branch"
+            }
+            for query, entry in zip(queries, entries)
+        ]
+        return jsonify({"results": results})
+    except Exception as e:
+        logger.error(f"Error fetching batch consumption results: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,42 @@
+import logging
+from flask import Blueprint, request, jsonify
+from services.cache_service import cached_response
+from services.convergence_service import get_convergence
+
+logger = logging.getLogger(__name__)
+convergence_blueprint = Blueprint("convergence", __name__)
+
+CONVERGENCE_FILTERS = ("repository", "branch", "commit_hash", "workflow_id", "approach", "method", "label")
+OPTIONS = {
+    "tolerance": float,
+    "confidence": float,
+    "min_runs": int,
+    "max_runs": int,
+    "alpha": float,
+    "min_effect": float
+}
+
+@convergence_blueprint.route("/wattsci/convergence", methods=["GET"])
+@cached_response("repository")
+def get_convergence_endpoint():
+    filters = {key: request.args.get(key).strip() for key in CONVERGENCE_FILTERS if request.args.get(key)}
+    if not filters.get("repository") or not filters.get("branch") or not filters.get("commit_hash"):
+        logger.warning("Missing required query parameters for convergence endpoint")
+        return jsonify({"error": "Missing required query parameters: repository, branch, commit_hash"}), 400
+
+    try:
+        options = {name: parse(request.args[name]) for name, parse in OPTIONS.items() if request.args.get(name)}
+    except ValueError as e:
+        return jsonify({"error": f"Invalid convergence options: {e}"}), 400
+    if any(not 0 < options[name] < 1 for name in ("tolerance", "confidence", "alpha") if name in options):
+        return jsonify({"error": "tolerance, confidence and alpha must be between 0 and 1"}), 400
+
+    events = [e.strip() for e in request.args.get("events", "").split(",") if e.strip()] or None
+    base_branch = request.args.get("base_branch", "").strip() or None
+    base_commit = request.args.get("base_commit", "").strip() or None
+
+    try:
+        return jsonify(get_convergence(filters, events, base_branch, base_commit, **options)), 200
+    except Exception as e:
+        logger.error(f"Error checking convergence for {filters}: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,17 @@
+import logging
+from flask import Blueprint, jsonify
+from services.job_service import get_job
+
+logger = logging.getLogger(__name__)
+job_blueprint = Blueprint("job", __name__)
+
+@job_blueprint.route("/jobs/<job_id>", methods=["GET"])
+def get_job_status(job_id):
+    try:
+        job = get_job(job_id)
+        if job is None:
+            return jsonify({"error": "Job not found"}), 404
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        logger.error(f"Error fetching job {job_id}: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
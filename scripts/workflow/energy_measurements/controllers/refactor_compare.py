@@ -1,67 +1,38 @@
-import json
 import logging
 import requests
 import urllib.parse
+from collections import defaultdict
 from flask import Blueprint, request, jsonify
 from models.result import Result
 from db.db import db_session
 from services.compare_artifacts import compare_artifacts
+from services.github_client import github_client
+from services.result_service import get_summary, prefetch_summaries, save_backfilled_summaries
+from services.significance import TESTS
 
 logger = logging.getLogger(__name__)
 compare_blueprint = Blueprint("compare", __name__)
 
+AVERAGED_FIELDS = ("consumption", "carbon_footprint_g")
 
-def create_pull_request(repo, base_branch, refactor_branch, github_token, head_owner=None):
-    headers = {
-        "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28"
-    }
-
-    owner, repo_name = repo.split("/")
-    if head_owner is None:
-        head_owner = owner
-
-    repo_api = f"https://api.github.com/repos/{repo}"
-
-    head = refactor_branch if head_owner == owner else f"{head_owner}:{refactor_branch}"
-
-    existing_prs_url = f"{repo_api}/pulls?head={head}&base={base_branch}"
-    existing_response = requests.get(existing_prs_url, headers=headers)
-    if existing_response.status_code == 200 and existing_response.json():
-        logger.info("Pull request already exists.")
-        return existing_response.json()[0]["number"]
-
-    data = {
-        "title": "GreenCodeRefactor",
-        "head": head,
-        "base": base_branch,
-        "body": "This PR was created automatically to compare energy performance."
-    }
 
-    print("=== DEBUG: Creating PR with the following data ===")
-    print(f"POST URL: {repo_api}/pulls")
-    print(f"Headers: {headers}")
-    print("Payload JSON:")
-    print(json.dumps(data, indent=2))
-    print("============================================")
-
-    response = requests.post(f"{repo_api}/pulls", headers=headers, json=data)
-
-    if response.status_code == 201:
-        logger.info("Pull request created successfully.")
-        return response.json()["number"]
-    else:
-        logger.error(f"Failed to create PR: {response.status_code} - {response.text}")
+def create_pull_request(repo, base_branch, refactor_branch, github_token, head_owner=None):
+    try:
+        return github_client.create_pull_request(
+            repo,
+            base_branch,
+            refactor_branch,
+            github_token,
+            head_owner=head_owner,
+            title="GreenCodeRefactor",
+            body="This PR was created automatically to compare energy performance."
+        )
+    except requests.RequestException as e:
+        logger.error(f"Failed to create PR: {e}")
         return None
 
 
 def post_comparison_comment(repo, pr_number, github_token, comparison_data):
-    headers = {
-        "Authorization": f"Bearer {github_token}",
-        "Accept": "application/vnd.github+json"
-    }
-
     if "comparison" in comparison_data:
         comparison = comparison_data["comparison"]
     else:
@@ -112,7 +83,9 @@ def post_comparison_comment(repo, pr_number, github_token, comparison_data):
             color = get_color(diff_cons)
             sign = "+" if diff_cons > 0 else ""
             value_badge = make_badge("", f"{sign}{diff_cons:.3f}J", color)
-            summary_lines.append(f"**{key}**: {value_badge}")
+            significance = vals.get("significance") or {}
+            verdict = f" ({vals.get('status')}, p={significance['p_value']:.3g})" if "p_value" in significance else f" ({vals.get('status')})"
+            summary_lines.append(f"**{key}**: {value_badge}{verdict}")
         if diff_carb is not None:
             color = get_color(diff_carb)
             sign = "+" if diff_carb > 0 else ""
@@ -138,8 +111,11 @@ def post_comparison_comment(repo, pr_number, github_token, comparison_data):
 *Note: Green = Improvement (decrease), Red = Regression (increase)*
 """
 
-    comment_url = f"https://api.github.com/repos/{repo}/issues/{pr_number}/comments"
-    response = requests.post(comment_url, headers=headers, json={"body": comment_body})
+    try:
+        response = github_client.post_comment(repo, pr_number, github_token, comment_body)
+    except requests.RequestException as e:
+        logger.error(f"Failed to comment on PR: {e}")
+        return
 
     if response.status_code == 201:
         logger.info("Comment posted to PR.")
@@ -148,6 +124,54 @@ def post_comparison_comment(repo, pr_number, github_token, comparison_data):
 
 
 
+def _mean_events(event_sets):
+    values = defaultdict(lambda: defaultdict(list))
+    for events in event_sets:
+        for event, data in events.items():
+            for field in AVERAGED_FIELDS:
+                if isinstance(data, dict) and isinstance(data.get(field), (int, float)):
+                    values[event][field].append(data[field])
+    return {
+        event: {field: sum(samples) / len(samples) for field, samples in fields.items()}
+        for event, fields in values.items()
+    }
+
+def _branch_artifact(repo, branch):
+    latest = (
+        db_session.query(Result)
+        .filter(Result.repository == repo, Result.branch == branch)
+        .order_by(Result.created_at.desc(), Result.id.desc())
+        .first()
+    )
+    if latest is None:
+        return None
+
+    results = (
+        db_session.query(Result)
+        .filter(Result.repository == repo, Result.branch == branch, Result.commit_hash == latest.commit_hash)
+        .order_by(Result.id)
+        .all()
+    )
+    prefetch_summaries(results, ("main",))
+    event_sets = [(get_summary(result) or {}).get("events", {}) for result in results]
+    artifact = {f"measurement_{i}": {"withBaseline": events} for i, events in enumerate(event_sets)}
+    artifact["aggregate"] = {"withBaseline": _mean_events(event_sets)}
+    return artifact
+
+def _significance_options(form):
+    options = {}
+    for name in ("alpha", "min_effect"):
+        value = form.get(name)
+        if value:
+            options[name] = float(value)
+    if form.get("test"):
+        if form["test"] not in TESTS:
+            raise ValueError(f"test must be one of: {', '.join(TESTS)}")
+        options["test"] = form["test"]
+    if not 0 < options.get("alpha", 0.5) < 1:
+        raise ValueError("alpha must be between 0 and 1")
+    return options
+
 @compare_blueprint.route("/wattsci/compare", methods=["POST"])
 def compare_results():
     repo = request.form.get("repo")
@@ -161,38 +185,27 @@ def compare_results():
             "error": "Missing required parameters: repo, base_branch, refactor_branch, github_token"
         }), 400
 
+    try:
+        options = _significance_options(request.form)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid significance options: {e}"}), 400
+
     try:
         repo = repo.strip()
         base_branch = base_branch.strip()
         refactor_branch = refactor_branch.strip()
         github_token = github_token.strip()
 
-        print(repo, base_branch, refactor_branch )
+        base_data = _branch_artifact(repo, base_branch)
+        refactor_data = _branch_artifact(repo, refactor_branch)
+        save_backfilled_summaries()
 
-        base_result = (
-            db_session.query(Result)
-            .filter(Result.repository == repo, Result.branch == base_branch)
-            .order_by(Result.created_at.desc())
-            .first()
-        )
-        refactor_result = (
-            db_session.query(Result)
-            .filter(Result.repository == repo, Result.branch == refactor_branch)
-            .order_by(Result.created_at.desc())
-            .first()
-        )
-
-        if not base_result or not refactor_result:
+        if not base_data or not refactor_data:
             msg = "Results not found for given base_branch or refactor_branch"
             logger.warning(msg)
             return jsonify({"error": msg}), 404
 
-        with open(base_result.json_path, "r") as f:
-            base_data = json.load(f)
-        with open(refactor_result.json_path, "r") as f:
-            refactor_data = json.load(f)
-
-        comparison = compare_artifacts(base_data, refactor_data)
+        comparison = compare_artifacts(base_data, refactor_data, **options)
 
         pr_number = create_pull_request(repo, base_branch, refactor_branch, github_token)
         if pr_number:
@@ -1,12 +1,25 @@
-import logging
-from flask import Blueprint, request, jsonify
+import os
 import json
+import logging
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from collections import defaultdict
-from services.result_service import get_results_by_filters
+from db.db import db_session
+from services.cache_service import cached_response
+from services.result_service import FILTER_FIELDS, get_commit_page, get_results_for_commits, get_summary, prefetch_summaries, save_backfilled_summaries, subtract_events
+from services.rollup_service import can_serve, get_commit_rollups
+from models.commit_rollup import CommitRollup
 
 logger = logging.getLogger(__name__)
 result_blueprint = Blueprint("result", __name__)
 
+RESULT_FIELDS = ("measurements", "averages")
+PAGE_SIZE = int(os.environ.get("WATTSCI_RESULTS_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.environ.get("WATTSCI_RESULTS_MAX_PAGE_SIZE", "1000"))
+SUMMARY_VARIANTS = {
+    CommitRollup.MAIN: ("main",),
+    CommitRollup.SUBTRACTED: ("main", "baseline")
+}
+
 def accumulate_event_sums(event_sums, event_counts, events):
     for event_name, event_data in events.items():
         if event_name not in event_sums:
@@ -44,152 +57,212 @@ def calculate_averages(event_sums, event_counts, delta_t_values=None):
     return averages
 
 
-def subtract_events(main_events, baseline_events):
-    subtracted = {}
-    for event_name, main_data in main_events.items():
-        baseline_data = baseline_events.get(event_name)
-        if baseline_data:
-            subtracted[event_name] = {}
-            for k, v in main_data.items():
-                if isinstance(v, (int, float)):
-                    subtracted[event_name][k] = v - baseline_data.get(k, 0)
-                else:
-                    subtracted[event_name][k] = v
-        else:
-            subtracted[event_name] = main_data.copy()
-            subtracted[event_name]["no_baseline"] = True
-    return subtracted
+def _parse_filters(args):
+    return {key: args.get(key).strip() for key in FILTER_FIELDS if args.get(key) is not None}
 
 
-@result_blueprint.route("/wattsci", methods=["GET"])
-def get_results_main():
-    filters = {}
-    for key in [
-        "ci", "run_id", "branch", "repository", "workflow_id",
-        "workflow_name", "commit_hash", "approach", "method", "label"
-    ]:
-        val = request.args.get(key)
-        if val is not None:
-            filters[key] = val.strip()
+def _parse_listing(args):
+    fields = [f.strip() for f in args.get("fields", ",".join(RESULT_FIELDS)).split(",") if f.strip()]
+    unknown = set(fields) - set(RESULT_FIELDS)
+    if not fields or unknown:
+        raise ValueError(f"Invalid fields: {', '.join(sorted(unknown)) or 'none'}; expected {', '.join(RESULT_FIELDS)}")
 
-    if not filters:
-        return jsonify({"error": "At least one filter parameter is required"}), 400
+    limit = int(args.get("limit", PAGE_SIZE))
+    if limit < 1:
+        raise ValueError("limit must be positive")
 
-    try:
-        results = get_results_by_filters(**filters)
-        if not results:
-            return jsonify({"error": "No results found"}), 404
+    cursor = args.get("cursor")
+    output_format = args.get("format", "json")
+    if output_format not in ("json", "ndjson"):
+        raise ValueError(f"Invalid format: {output_format}")
 
-        commits = defaultdict(lambda: {
-            "measurements": [],
-            "event_sums": {},
-            "event_counts": {},
-            "delta_t_values": []
-        })
+    return set(fields), min(limit, MAX_PAGE_SIZE), int(cursor) if cursor else None, output_format == "ndjson"
 
-        for result in results:
-            commit = result.commit_hash
-            if result.json_main:
-                try:
-                    with open(result.json_main, "r", encoding="utf-8") as f:
-                        main_content = json.load(f)
-                        commits[commit]["measurements"].append(main_content)
-
-                        if "delta_t_seconds" in main_content:
-                            commits[commit]["delta_t_values"].append(main_content["delta_t_seconds"])
-
-                        accumulate_event_sums(
-                            commits[commit]["event_sums"],
-                            commits[commit]["event_counts"],
-                            main_content.get("events", {})
-                        )
-                except Exception as e:
-                    logger.warning(f"Could not read JSON file {result.json_main}: {e}")
-
-        output = {}
-        for commit, data in commits.items():
-            output[commit] = {
-                "measurements": data["measurements"],
-                "averages": calculate_averages(
-                    data["event_sums"], data["event_counts"], data["delta_t_values"]
-                )
-            }
 
-        print(output)
+def _commit_entry(measurements, event_sums, event_counts, delta_t_values, fields):
+    entry = {}
+    if "measurements" in fields:
+        entry["measurements"] = measurements
+    if "averages" in fields:
+        entry["averages"] = calculate_averages(event_sums, event_counts, delta_t_values)
+    return entry
 
-        return jsonify(output), 200
 
-    except Exception as e:
-        logger.error(f"Exception occurred while fetching results: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
+def _main_entry(results, fields):
+    measurements = []
+    event_sums = {}
+    event_counts = {}
+    delta_t_values = []
 
+    for result in results:
+        try:
+            main_content = get_summary(result, "main")
+        except Exception as e:
+            logger.warning(f"Could not load summary for result {result.id} ({result.json_main}): {e}")
+            continue
+        if main_content:
+            measurements.append(main_content)
 
-@result_blueprint.route("/wattsci/subtracted", methods=["GET"])
-def get_results_subtracted():
-    filters = {}
-    for key in [
-        "ci", "run_id", "branch", "repository", "workflow_id",
-        "workflow_name", "commit_hash", "approach", "method", "label"
-    ]:
-        val = request.args.get(key)
-        if val is not None:
-            filters[key] = val.strip()
+            if "delta_t_seconds" in main_content:
+                delta_t_values.append(main_content["delta_t_seconds"])
 
-    if not filters:
-        return jsonify({"error": "At least one filter parameter is required"}), 400
+            accumulate_event_sums(event_sums, event_counts, main_content.get("events", {}))
 
-    try:
-        results = get_results_by_filters(**filters)
-        if not results:
-            return jsonify({"error": "No results found"}), 404
+    if not measurements:
+        return None, None
+    return _commit_entry(measurements, event_sums, event_counts, delta_t_values, fields), None
 
-        commits = defaultdict(list)
-        output = {}
 
-        for result in results:
-            commits[result.commit_hash].append(result)
+def _subtracted_entry(results, fields):
+    if any(r.json_baseline is None and r.summary_baseline is None for r in results):
+        return None, f"Not all measurements have baseline for commit {results[0].commit_hash}"
 
-        for commit, results_in_commit in commits.items():
-            if any(r.json_baseline is None for r in results_in_commit):
-                return jsonify({"error": f"Not all measurements have baseline for commit {commit}"}), 400
+    measurements = []
+    event_sums = {}
+    event_counts = {}
+    delta_t_values = []
 
-            event_sums = {}
-            event_counts = {}
-            measurements = []
-            delta_t_values = []
+    for result in results:
+        main_content = get_summary(result, "main")
+        baseline_content = get_summary(result, "baseline")
 
-            for result in results_in_commit:
-                main_content = baseline_content = None
+        subtracted_events = subtract_events(
+            main_content.get("events", {}), baseline_content.get("events", {})
+        )
+        subtracted_measurement = main_content.copy()
+        subtracted_measurement["events"] = subtracted_events
+        measurements.append(subtracted_measurement)
 
-                if result.json_main:
-                    with open(result.json_main, "r", encoding="utf-8") as f:
-                        main_content = json.load(f)
+        if "delta_t_seconds" in main_content:
+            delta_t_values.append(main_content["delta_t_seconds"])
 
-                if result.json_baseline:
-                    with open(result.json_baseline, "r", encoding="utf-8") as f:
-                        baseline_content = json.load(f)
+        accumulate_event_sums(event_sums, event_counts, subtracted_events)
 
-                subtracted_events = subtract_events(
-                    main_content.get("events", {}), baseline_content.get("events", {})
-                )
-                subtracted_measurement = main_content.copy()
-                subtracted_measurement["events"] = subtracted_events
-                measurements.append(subtracted_measurement)
+    return _commit_entry(measurements, event_sums, event_counts, delta_t_values, fields), None
 
-                if "delta_t_seconds" in main_content:
-                    delta_t_values.append(main_content["delta_t_seconds"])
 
-                accumulate_event_sums(event_sums, event_counts, subtracted_events)
+def _rollup_entry(commit, rollup, variant):
+    runs = rollup.get(CommitRollup.MAIN, {}).get(CommitRollup.RUN)
+    if not runs or not runs["count"]:
+        return None, None
 
-            output[commit] = {
-                "measurements": measurements,
-                "averages": calculate_averages(event_sums, event_counts, delta_t_values)
-            }
+    sums = rollup.get(variant, {})
+    variant_runs = sums.get(CommitRollup.RUN)
+    if not variant_runs or variant_runs["count"] != runs["count"]:
+        return None, f"Not all measurements have baseline for commit {commit}"
+
+    event_sums = {}
+    event_counts = {}
+    for event_name, event_data in sums.items():
+        if event_name == CommitRollup.RUN:
+            continue
+        event_sums[event_name] = {k: event_data[k] for k in ("consumption", "mean", "carbon_footprint_g")}
+        event_counts[event_name] = event_data["count"]
 
-        print(output)
+    averages = calculate_averages(event_sums, event_counts)
+    if variant_runs["delta_t_count"]:
+        averages["delta_t_seconds"] = round(variant_runs["delta_t_sum"] / variant_runs["delta_t_count"], 2)
+    return {"averages": averages}, None
 
-        return jsonify(output), 200
 
+def _results_page(build_entry, variants):
+    def build_page(filters, commits, fields):
+        results = get_results_for_commits(filters, commits)
+        prefetch_summaries(results, variants)
+        grouped = defaultdict(list)
+        for result in results:
+            grouped[result.commit_hash].append(result)
+        return [(commit, *build_entry(grouped[commit], fields)) for commit in commits]
+    return build_page
+
+
+def _rollup_page(variant):
+    def build_page(filters, commits, fields):
+        rollups = get_commit_rollups(filters, commits)
+        return [(commit, *_rollup_entry(commit, rollups.get(commit, {}), variant)) for commit in commits]
+    return build_page
+
+
+def _iter_commit_pages(filters, cursor, limit, build_page, fields):
+    while True:
+        commits, next_cursor = get_commit_page(filters, after=cursor, limit=limit)
+        yield (build_page(filters, commits, fields) if commits else []), next_cursor
+        if next_cursor is None:
+            return
+        cursor = next_cursor
+
+
+def _ndjson_response(pages):
+    def generate():
+        try:
+            for page, _ in pages:
+                for commit, entry, error in page:
+                    if error:
+                        yield json.dumps({"commit_hash": commit, "error": error}) + "\n"
+                        return
+                    if entry is not None:
+                        yield json.dumps({"commit_hash": commit, **entry}) + "\n"
+                save_backfilled_summaries()
+                db_session.expunge_all()
+        except Exception as e:
+            logger.error(f"Exception occurred while streaming results: {e}", exc_info=True)
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _list_results(build_entry, variant):
+    filters = _parse_filters(request.args)
+    if not filters:
+        return jsonify({"error": "At least one filter parameter is required"}), 400
+
+    try:
+        fields, limit, cursor, stream = _parse_listing(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if fields == {"averages"} and can_serve(filters):
+        build_page = _rollup_page(variant)
+    else:
+        build_page = _results_page(build_entry, SUMMARY_VARIANTS[variant])
+
+    pages = _iter_commit_pages(filters, cursor, limit, build_page, fields)
+    if stream:
+        return _ndjson_response(pages)
+
+    page, next_cursor = next(pages)
+    if not page and cursor is None:
+        return jsonify({"error": "No results found"}), 404
+
+    output = {}
+    for commit, entry, error in page:
+        if error:
+            return jsonify({"error": error}), 400
+        if entry is not None:
+            output[commit] = entry
+    save_backfilled_summaries()
+
+    response = jsonify(output)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return response, 200
+
+
+@result_blueprint.route("/wattsci", methods=["GET"])
+@cached_response("repository")
+def get_results_main():
+    try:
+        return _list_results(_main_entry, CommitRollup.MAIN)
+    except Exception as e:
+        logger.error(f"Exception occurred while fetching results: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+
+@result_blueprint.route("/wattsci/subtracted", methods=["GET"])
+@cached_response("repository")
+def get_results_subtracted():
+    try:
+        return _list_results(_subtracted_entry, CommitRollup.SUBTRACTED)
     except Exception as e:
         logger.error(f"Exception occurred while fetching subtracted results: {e}", exc_info=True)
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
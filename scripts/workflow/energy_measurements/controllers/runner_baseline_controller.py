@@ -0,0 +1,24 @@
+import logging
+from flask import Blueprint, request, jsonify
+from services.baseline_service import runner_baseline_status, runner_fingerprint
+
+logger = logging.getLogger(__name__)
+runner_baseline_blueprint = Blueprint("runner_baseline", __name__)
+
+@runner_baseline_blueprint.route("/wattsci/runner-baseline", methods=["GET"])
+def get_runner_baseline():
+    method = request.args.get("method", "").strip()
+    fingerprint = request.args.get("fingerprint", "").strip() or runner_fingerprint(
+        request.args.get("runner_cpu"), request.args.get("runner_kernel"), request.args.get("runner_host")
+    )
+    if not method or not fingerprint:
+        logger.warning("Missing required query parameters for runner baseline endpoint")
+        return jsonify({
+            "error": "Missing required query parameters: method and fingerprint or runner_cpu, runner_kernel, runner_host"
+        }), 400
+
+    try:
+        return jsonify(runner_baseline_status(fingerprint, method)), 200
+    except Exception as e:
+        logger.error(f"Error reading runner baseline {fingerprint}: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
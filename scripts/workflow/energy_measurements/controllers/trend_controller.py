@@ -0,0 +1,42 @@
+import os
+import logging
+from flask import Blueprint, request, jsonify
+from models.commit_rollup import CommitRollup
+from services.cache_service import cached_response
+from services.trend_service import TREND_MODES, get_trend
+
+logger = logging.getLogger(__name__)
+trend_blueprint = Blueprint("trend", __name__)
+
+TREND_POINTS = int(os.environ.get("WATTSCI_TREND_POINTS", "100"))
+MAX_TREND_POINTS = int(os.environ.get("WATTSCI_TREND_MAX_POINTS", "2000"))
+TREND_FILTERS = ("repository", "branch", "workflow_id", "approach", "method", "label")
+
+@trend_blueprint.route("/wattsci/trend", methods=["GET"])
+@cached_response("repository")
+def get_trend_endpoint():
+    filters = {key: request.args.get(key).strip() for key in TREND_FILTERS if request.args.get(key)}
+    event = request.args.get("event")
+    variant = request.args.get("variant", CommitRollup.MAIN)
+    mode = request.args.get("mode", "bucket")
+
+    if not filters.get("repository") or not filters.get("branch") or not event:
+        logger.warning("Missing required query parameters for trend endpoint")
+        return jsonify({"error": "Missing required query parameters: repository, branch, event"}), 400
+    if variant not in (CommitRollup.MAIN, CommitRollup.SUBTRACTED):
+        return jsonify({"error": f"Invalid variant: {variant}"}), 400
+    if mode not in TREND_MODES:
+        return jsonify({"error": f"Invalid mode: {mode}"}), 400
+    try:
+        points = int(request.args.get("points", TREND_POINTS))
+    except ValueError:
+        return jsonify({"error": "points must be an integer"}), 400
+    if points < 3:
+        return jsonify({"error": "points must be at least 3"}), 400
+
+    try:
+        trend = get_trend(filters, event, variant, min(points, MAX_TREND_POINTS), mode)
+        return jsonify(trend), 200
+    except Exception as e:
+        logger.error(f"Error building trend for {filters}: {e}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
@@ -1,22 +1,73 @@
 import logging
 from flask import Blueprint, json, request, jsonify
 import os
-from services.file_service import get_session_dir_by_form, reconstruct_file_from_chunks, BASE_UPLOAD_DIR
-from models.result import Result
+from services.file_service import get_session_dir_by_form, BASE_UPLOAD_DIR, IDENTIFYING_FIELDS, RUNNER_FIELDS
+from services.manifest_service import ChunkIntegrityError, chunk_status, save_manifest, store_chunk, write_timers
+from services.ingest_service import chunk_received, discard_ingest
+from services.job_service import enqueue_reconstruction
+from services.storage_service import session_lock
 from db.db import db_session
 from methods.runner import MethodRunner
-from db.db import db_session
-from models.result import Result
 
 logger = logging.getLogger(__name__)
 upload_blueprint = Blueprint("upload", __name__)
 
+CHUNK_TYPES = ("main", "baseline")
+
+@upload_blueprint.route("/upload/manifest", methods=["POST"])
+def upload_manifest():
+    session_dir, session_id = get_session_dir_by_form(request.form)
+    chunk_type = request.form.get("type", "main")
+    chunks_field = request.form.get("chunks")
+    chunk_count = request.form.get("chunk_count")
+
+    if chunk_type not in CHUNK_TYPES:
+        return jsonify({"error": f"Invalid type: {chunk_type}"}), 400
+    if not chunks_field:
+        logger.warning("Upload manifest missing chunks")
+        return jsonify({"error": "Missing chunks"}), 400
+
+    type_dir = os.path.join(session_dir, chunk_type)
+    try:
+        chunks = json.loads(chunks_field)
+        with session_lock(session_dir, shared=True):
+            discard_ingest(type_dir)
+            save_manifest(type_dir, chunks, int(chunk_count) if chunk_count else None)
+            write_timers(type_dir, request.form.get("timer_start"), request.form.get("timer_end"), overwrite=True)
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Invalid manifest for session {session_id}: {e}")
+        return jsonify({"error": "Invalid manifest", "details": str(e)}), 400
+
+    logger.info(f"Manifest with {len(chunks)} chunks saved for session {session_id} in {chunk_type}")
+    status = chunk_status(type_dir)
+    return jsonify({
+        "status": "manifest_saved",
+        "session_id": session_id,
+        "type": chunk_type,
+        "missing": status["missing"]
+    }), 200
+
+@upload_blueprint.route("/upload/status", methods=["GET"])
+def upload_status():
+    session_id = request.args.get("session_id")
+    chunk_type = request.args.get("type", "main")
+    if not session_id:
+        return jsonify({"error": "Missing session_id"}), 400
+    if chunk_type not in CHUNK_TYPES:
+        return jsonify({"error": f"Invalid type: {chunk_type}"}), 400
+
+    session_dir = os.path.join(BASE_UPLOAD_DIR, os.path.basename(session_id))
+    status = chunk_status(os.path.join(session_dir, chunk_type))
+    status.update({"session_id": session_id, "type": chunk_type})
+    return jsonify(status), 200
+
 @upload_blueprint.route("/upload", methods=["POST"])
 def upload_chunk():
     session_dir, session_id = get_session_dir_by_form(request.form)
     chunk = request.files.get("chunk")
     chunk_name = request.form.get("chunk_name")
     chunk_type = request.form.get("type", "main")
+    sha256 = request.form.get("sha256")
     
     timer_start = request.form.get("timer_start")
     timer_end = request.form.get("timer_end")
@@ -24,37 +75,50 @@ def upload_chunk():
     if not chunk or not chunk_name:
         logger.warning("Upload chunk missing file or chunk_name")
         return jsonify({"error": "Missing file or chunk_name"}), 400
+    if chunk_type not in CHUNK_TYPES:
+        return jsonify({"error": f"Invalid type: {chunk_type}"}), 400
 
-    chunks_dir = os.path.join(session_dir, chunk_type, "chunks")
-    os.makedirs(chunks_dir, exist_ok=True)
+    type_dir = os.path.join(session_dir, chunk_type)
+    chunks_dir = os.path.join(type_dir, "chunks")
+    data_dir = None
 
-    chunk_path = os.path.join(chunks_dir, chunk_name)
     try:
-        chunk.save(chunk_path)
-        logger.info(f"Chunk {chunk_name} saved for session {session_id} in {chunk_type}")
-
-        if timer_start and timer_end:
-            data_dir = os.path.join(session_dir, chunk_type, "data")
-            os.makedirs(data_dir, exist_ok=True)
-            with open(os.path.join(data_dir, "timer_start.txt"), "w") as f:
-                f.write(timer_start)
-            with open(os.path.join(data_dir, "timer_end.txt"), "w") as f:
-                f.write(timer_end)
-            logger.info(f"Timestamps saved in {data_dir} for session {session_id}")
-
+        with session_lock(session_dir, shared=True):
+            stored, digest, size = store_chunk(type_dir, chunk_name, chunk.stream, sha256)
+            logger.info(f"Chunk {chunk_name} {stored} for session {session_id} in {chunk_type}")
+
+            if stored != "duplicate":
+                chunk_received(
+                    type_dir,
+                    MethodRunner.accumulator_class_for(request.form.get("METHOD")),
+                    chunk_name,
+                    replaced=stored == "replaced"
+                )
+
+            if timer_start and timer_end:
+                data_dir, written = write_timers(type_dir, timer_start, timer_end)
+                if written:
+                    logger.info(f"Timestamps saved in {data_dir} for session {session_id}")
+
+    except ChunkIntegrityError as e:
+        logger.warning(f"Rejected chunk {chunk_name} for session {session_id}: {e}")
+        return jsonify({"error": "Chunk integrity check failed", "details": str(e)}), 422
     except Exception as e:
         logger.error(f"Failed to save chunk {chunk_name} for session {session_id}: {e}")
         return jsonify({"error": "Failed to save chunk"}), 500
 
     return jsonify({
-        "status": "received",
+        "status": "duplicate" if stored == "duplicate" else "received",
         "chunk": chunk_name,
+        "sha256": digest,
+        "size": size,
         "session_id": session_id,
         "type": chunk_type,
         "timer_start": timer_start,
         "timer_end": timer_end,
         "chunks_path": chunks_dir,
-        "data_path": data_dir if timer_start else None
+        "data_path": data_dir,
+        "missing": chunk_status(type_dir)["missing"]
     }), 200
 
 @upload_blueprint.route("/reconstruct", methods=["POST"])
@@ -64,62 +128,23 @@ def reconstruct():
         logger.warning("Reconstruct called without session_id")
         return jsonify({"error": "Missing session_id"}), 400
 
-    session_dir = os.path.join(BASE_UPLOAD_DIR, session_id)
-    ci = request.form.get("CI")
-    run_id = request.form.get("RUN_ID")
-    branch = request.form.get("REF_NAME")
-    repository = request.form.get("REPOSITORY")
-    workflow_id = request.form.get("WORKFLOW_ID")
-    workflow_name = request.form.get("WORKFLOW_NAME")
-    commit_hash = request.form.get("COMMIT_HASH")
-    approach = request.form.get("APPROACH")
-    method = request.form.get("METHOD")
-    label = request.form.get("LABEL")
+    session_dir = os.path.join(BASE_UPLOAD_DIR, os.path.basename(session_id))
+    if not os.path.isdir(session_dir):
+        logger.warning(f"Reconstruct called for unknown session {session_id}")
+        return jsonify({"error": "Unknown session_id"}), 404
 
-    try:
-        logger.info(f"Starting reconstruction for session {session_id}")
-
-        json_baseline_path = None
-        baseline_chunks_dir = os.path.join(session_dir, "baseline")
-        if os.path.exists(baseline_chunks_dir):
-            path = reconstruct_file_from_chunks(baseline_chunks_dir)
-            runner_baseline = MethodRunner(approach, method, baseline_chunks_dir, path)
-            json_baseline_path = runner_baseline.run()
-
-        json_main_path = None
-        main_chunks_dir = os.path.join(session_dir, "main")
-        if os.path.exists(main_chunks_dir):
-            path = reconstruct_file_from_chunks(main_chunks_dir)
-            runner_main = MethodRunner(approach, method, main_chunks_dir, path)
-            json_main_path = runner_main.run()
-
-        result = Result(
-            session_id=session_id,
-            ci=ci,
-            run_id=run_id,
-            branch=branch,
-            repository=repository,
-            workflow_id=workflow_id,
-            workflow_name=workflow_name,
-            commit_hash=commit_hash,
-            approach=approach,
-            method=method,
-            label=label,
-            json_main=json_main_path,
-            json_baseline=json_baseline_path
-        )
-        db_session.add(result)
-        db_session.commit()
+    fields = {f: request.form.get(f) for f in IDENTIFYING_FIELDS + RUNNER_FIELDS}
 
+    try:
+        job = enqueue_reconstruction(session_id, fields)
         return jsonify({
             "session_id": session_id,
-            "status": "success",
-            "result_id": result.id,
-            "json_main": json_main_path,
-            "json_baseline": json_baseline_path
-        }), 200
+            "status": job.status,
+            "job_id": job.id,
+            "status_url": f"/jobs/{job.id}"
+        }), 202
 
     except Exception as e:
         db_session.rollback()
-        logger.error(f"Error during reconstruction for session {session_id}: {e}", exc_info=True)
-        return jsonify({"error": "Failed to reconstruct file", "details": str(e)}), 500
+        logger.error(f"Error queueing reconstruction for session {session_id}: {e}", exc_info=True)
+        return jsonify({"error": "Failed to queue reconstruction", "details": str(e)}), 500
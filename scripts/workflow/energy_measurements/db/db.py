@@ -0,0 +1,64 @@
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+DATABASE_URL = os.environ.get(
+    "WATTSCI_DATABASE_URL",
+    "sqlite:///" + os.path.join(os.path.expanduser("~"), "cimeasurement", "wattsci.db")
+)
+POOL_SIZE = int(os.environ.get("WATTSCI_DB_POOL_SIZE", "10"))
+MAX_OVERFLOW = int(os.environ.get("WATTSCI_DB_MAX_OVERFLOW", "20"))
+POOL_TIMEOUT = float(os.environ.get("WATTSCI_DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.environ.get("WATTSCI_DB_POOL_RECYCLE", "1800"))
+SQLITE_JOURNAL_MODE = os.environ.get("WATTSCI_SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("WATTSCI_SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("WATTSCI_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def _sqlite_pragmas(journal_mode, synchronous, busy_timeout_ms):
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.close()
+    return set_pragmas
+
+def create_db_engine(
+    url=None,
+    pool_size=None,
+    max_overflow=None,
+    journal_mode=None,
+    synchronous=None,
+    busy_timeout_ms=None,
+    **kwargs
+):
+    url = make_url(url or DATABASE_URL)
+    pool_size = POOL_SIZE if pool_size is None else pool_size
+    max_overflow = MAX_OVERFLOW if max_overflow is None else max_overflow
+
+    if url.get_backend_name() == "sqlite":
+        if url.database and url.database != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
+            kwargs.setdefault("pool_size", pool_size)
+            kwargs.setdefault("max_overflow", max_overflow)
+            kwargs.setdefault("pool_timeout", POOL_TIMEOUT)
+        busy_timeout_ms = SQLITE_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+        kwargs.setdefault("connect_args", {"check_same_thread": False, "timeout": busy_timeout_ms / 1000})
+        engine = create_engine(url, **kwargs)
+        event.listen(engine, "connect", _sqlite_pragmas(
+            journal_mode or SQLITE_JOURNAL_MODE,
+            synchronous or SQLITE_SYNCHRONOUS,
+            busy_timeout_ms
+        ))
+        return engine
+
+    kwargs.setdefault("pool_size", pool_size)
+    kwargs.setdefault("max_overflow", max_overflow)
+    kwargs.setdefault("pool_timeout", POOL_TIMEOUT)
+    kwargs.setdefault("pool_recycle", POOL_RECYCLE)
+    kwargs.setdefault("pool_pre_ping", True)
+    return create_engine(url, **kwargs)
+
+engine = create_db_engine()
+db_session = scoped_session(sessionmaker(bind=engine))
@@ -1,4 +1,4 @@
-from models.result import Base
-from db import engine
+from db.db import engine
+from db.migrations import run_migrations
 
-Base.metadata.create_all(bind=engine)
\ No newline at end of file
+run_migrations(engine)
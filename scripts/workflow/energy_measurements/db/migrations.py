@@ -0,0 +1,125 @@
+import logging
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, MetaData, Table, inspect, select, func, text
+from models.result import Base, Result
+from models.job import Job
+from models.data_version import DataVersion
+from models.commit_rollup import CommitRollup
+from models.runner_baseline import RunnerBaseline
+from services.result_service import load_summary
+from services.rollup_service import apply_rollup_bulk, rollup_rows
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 1000
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime, nullable=False, default=datetime.utcnow)
+)
+
+def _columns(connection, table):
+    return {c["name"] for c in inspect(connection).get_columns(table)}
+
+def _add_column(connection, table, column):
+    if column.name in _columns(connection, table):
+        return
+    column_type = column.type.compile(dialect=connection.dialect)
+    connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column.name} {column_type}"))
+
+def _create_tables(connection):
+    Base.metadata.create_all(connection, tables=[Result.__table__, Job.__table__])
+
+def _add_result_summaries(connection):
+    _add_column(connection, "results", Result.__table__.c.summary_main)
+    _add_column(connection, "results", Result.__table__.c.summary_baseline)
+
+def _add_result_created_at(connection):
+    if "created_at" in _columns(connection, "results"):
+        return
+    _add_column(connection, "results", Result.__table__.c.created_at)
+    connection.execute(
+        Result.__table__.update().where(Result.__table__.c.created_at.is_(None)).values(created_at=datetime.utcnow())
+    )
+
+def _add_result_indexes(connection):
+    for index in Result.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
+def _create_data_versions(connection):
+    DataVersion.__table__.create(connection, checkfirst=True)
+
+def _summary(row, variant):
+    summary = getattr(row, f"summary_{variant}")
+    json_path = getattr(row, f"json_{variant}")
+    if summary is None and json_path:
+        try:
+            summary = load_summary(json_path)
+        except Exception as e:
+            logger.warning(f"Result {row.id}: {variant} summary unavailable for rollup ({e})")
+    return summary
+
+def _backfill_commit_rollups(connection):
+    results = Result.__table__
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(results).where(results.c.id > last_id).order_by(results.c.id).limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        apply_rollup_bulk(connection, [
+            rollup for row in rows for rollup in rollup_rows(row, _summary(row, "main"), _summary(row, "baseline"))
+        ])
+        last_id = rows[-1].id
+
+def _create_commit_rollups(connection):
+    if inspect(connection).has_table(CommitRollup.__tablename__):
+        return
+    CommitRollup.__table__.create(connection)
+    _backfill_commit_rollups(connection)
+
+def _add_rollup_consumption_range(connection):
+    if "consumption_min" in _columns(connection, CommitRollup.__tablename__):
+        return
+    _add_column(connection, CommitRollup.__tablename__, CommitRollup.__table__.c.consumption_min)
+    _add_column(connection, CommitRollup.__tablename__, CommitRollup.__table__.c.consumption_max)
+    connection.execute(CommitRollup.__table__.delete())
+    _backfill_commit_rollups(connection)
+
+def _create_runner_baselines(connection):
+    _add_column(connection, "results", Result.__table__.c.runner)
+    RunnerBaseline.__table__.create(connection, checkfirst=True)
+
+MIGRATIONS = [
+    (1, "create_tables", _create_tables),
+    (2, "add_result_summaries", _add_result_summaries),
+    (3, "add_result_created_at", _add_result_created_at),
+    (4, "add_result_indexes", _add_result_indexes),
+    (5, "create_data_versions", _create_data_versions),
+    (6, "create_commit_rollups", _create_commit_rollups),
+    (7, "add_rollup_consumption_range", _add_rollup_consumption_range),
+    (8, "create_runner_baselines", _create_runner_baselines)
+]
+
+def current_version(connection):
+    schema_version.create(connection, checkfirst=True)
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+def run_migrations(engine):
+    with engine.begin() as connection:
+        version = current_version(connection)
+
+    for number, name, migration in MIGRATIONS:
+        if number <= version:
+            continue
+        with engine.begin() as connection:
+            migration(connection)
+            connection.execute(schema_version.insert().values(version=number, name=name, applied_at=datetime.utcnow()))
+        logger.info(f"Applied schema migration {number} ({name})")
+        version = number
+
+    return version
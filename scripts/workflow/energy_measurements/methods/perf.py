@@ -1,12 +1,17 @@
 import os
-import re
-import json
-import numpy as np
+from services.carbon_service import apply_carbon_intensity
+from services.result_codec import result_path, write_result
+from .perf_parser import PerfAccumulator, parse_file
+from .stats import describe_many
 
 class perf:
-    def __init__(self, dir, path):
+    accumulator_class = PerfAccumulator
+
+    def __init__(self, dir, path, accumulator=None):
         self.path = path
         self.dir = dir
+        self.accumulator = accumulator
+        self.carbon_intensity = None
         self.data = None
         self.timer_start = None
         self.timer_end = None
@@ -25,45 +30,13 @@ class perf:
                 self.timer_end = f.read().strip()
 
     def _parse_file(self, path):
-        data = {}
-        line_pattern = re.compile(r"^\s*([\d.,]+)\s+([\d.,]+)\s+\w+\s+(\S+)")
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                match = line_pattern.match(line)
-                if match:
-                    _, value_str, event = match.groups()
-                    value = float(value_str.replace(",", "."))
-                    data.setdefault(event, []).append(value)
-        return data
+        return parse_file(path, samples_dir=self.dir)
 
     def _calculate_stats(self, data, delta_t):
-        result = {}
-        for event, values in data.items():
-            arr = np.array(values)
-            mean = np.mean(arr)
-            event_data = {
-                "unit": "W",
-                "samples": len(arr),
-                "min": round(float(np.min(arr)), 2),
-                "max": round(float(np.max(arr)), 2),
-                "mean": round(float(mean), 2),
-                "std": round(float(np.std(arr)), 2),
-                "percentiles": {
-                    "p25": round(float(np.percentile(arr, 25)), 2),
-                    "p50": round(float(np.percentile(arr, 50)), 2),
-                    "p75": round(float(np.percentile(arr, 75)), 2),
-                    "p90": round(float(np.percentile(arr, 90)), 2),
-                    "p95": round(float(np.percentile(arr, 95)), 2),
-                    "p99": round(float(np.percentile(arr, 99)), 2),
-                },
-            }
-            if delta_t is not None:
-                event_data["consumption"] = round(float(mean * delta_t), 2)
-            result[event] = event_data
-        return result
+        return describe_many(data, delta_t, decimals=2)
 
     def process(self) -> str:
-        if not os.path.exists(self.path):
+        if self.accumulator is None and not os.path.exists(self.path):
             raise FileNotFoundError(f"Archivo no encontrado: {self.path}")
 
         delta_t = None
@@ -74,7 +47,10 @@ class perf:
             except ValueError:
                 delta_t = None
 
-        data = self._parse_file(self.path)
+        if self.accumulator is not None:
+            data = self.accumulator.close()
+        else:
+            data = self._parse_file(self.path)
         stats = self._calculate_stats(data, delta_t)
 
         result = {
@@ -83,13 +59,14 @@ class perf:
             "delta_t_seconds": delta_t,
             "events": stats
         }
+        if self.carbon_intensity:
+            apply_carbon_intensity(result, self.carbon_intensity)
 
         dir_name = os.path.dirname(self.path)
         base_name = os.path.splitext(os.path.basename(self.path))[0]
-        output_path = os.path.join(dir_name, f"{base_name}.json")
+        output_path = result_path(dir_name, base_name)
 
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2)
+        write_result(output_path, result)
 
         self.data = result
         return output_path
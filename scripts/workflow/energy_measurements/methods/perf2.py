@@ -1,16 +1,24 @@
 import os
-import re
 import json
-import numpy as np
+from services.storage_service import session_lock, write_json_atomic
+from services.convergence import check_convergence, fold
+from services.result_codec import read_result, result_path, write_result
+from .perf_parser import parse_file
+from .sketch import DDSketch
+from .stats import PERCENTILE_KEYS, describe_many
+
+MEANS_RELATIVE_ACCURACY = 0.001
 
 class perf:
-    def __init__(self, session_dir: str, original_name: str, timer_start, timer_end, is_baseline):
+    def __init__(self, session_dir: str, original_name: str, timer_start, timer_end, is_baseline, runner_baseline=None):
         self.session_dir = session_dir
         self.original_name = original_name
         self.timer_start = timer_start
         self.timer_end = timer_end
         self.is_baseline = is_baseline
+        self.runner_baseline = runner_baseline
         self.data = None
+        self.convergence = None
 
     def format_time_interval(self, start, end):
         try:
@@ -20,10 +28,7 @@ class perf:
             return "N/A"
 
     def generate_markdown_table(self, stats):
-        headers = [
-            "Event", "Samples", "Min", "Max", "Mean", "Std Dev",
-            "p25", "p50", "p75", "p90", "p95", "p99", "Consumption (J)"
-        ]
+        headers = ["Event", "Samples", "Min", "Max", "Mean", "Std Dev"] + PERCENTILE_KEYS + ["Consumption (J)"]
         lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
 
         for event, data in stats.items():
@@ -35,19 +40,16 @@ class perf:
                 f"{data.get('max', 0):.3f}" if "max" in data else "N/A",
                 f"{data.get('mean', 0):.3f}" if "mean" in data else "N/A",
                 f"{data.get('std', 0):.3f}" if "std" in data else "N/A",
-                f"{percentiles.get('p25', 0):.3f}" if "p25" in percentiles else "N/A",
-                f"{percentiles.get('p50', 0):.3f}" if "p50" in percentiles else "N/A",
-                f"{percentiles.get('p75', 0):.3f}" if "p75" in percentiles else "N/A",
-                f"{percentiles.get('p90', 0):.3f}" if "p90" in percentiles else "N/A",
-                f"{percentiles.get('p95', 0):.3f}" if "p95" in percentiles else "N/A",
-                f"{percentiles.get('p99', 0):.3f}" if "p99" in percentiles else "N/A",
-                f"{data.get('consumption', 0):.3f}" if data.get("consumption") is not None else "N/A",
             ]
+            line += [f"{percentiles[p]:.3f}" if p in percentiles else "N/A" for p in PERCENTILE_KEYS]
+            line.append(f"{data.get('consumption', 0):.3f}" if data.get("consumption") is not None else "N/A")
             lines.append("| " + " | ".join(line) + " |")
 
         return "\n".join(lines)
 
     def generate_summary(self):
+        if self.data is None:
+            self.data = self.load()
         print(self.data)
         if not self.data:
             return "_No data to summarize_"
@@ -91,11 +93,15 @@ class perf:
         if not os.path.exists(path):
             raise FileNotFoundError(f"Archivo no encontrado: {path}")
 
-        data = self._parse_file(path)
-        result = self._calculate_stats(data)
+        with session_lock(self.session_dir):
+            return self._process(path)
 
-        output_path = self._get_output_path()
-        existing_data = self._load_existing_data(output_path)
+    def _process(self, path):
+        state = self._load_state()
+        key = "baseline" if self.is_baseline else f"measurement_{state['next_index']}"
+
+        data = self._parse_file(path, self._get_samples_dir(key))
+        result = self._calculate_stats(data)
 
         if self.is_baseline:
             if self.timer_start is not None:
@@ -103,13 +109,14 @@ class perf:
             if self.timer_end is not None:
                 result["timer_end"] = self.timer_end
 
-            existing_data["baseline"] = result
-
-            self._update_measurements_without_baseline(existing_data)
+            records = [{"op": "set", "key": key, "value": result}]
+            records += [
+                {"op": "update", "key": pending_key, "value": {
+                    "withoutBaseline": self._create_without_baseline(result, with_baseline)
+                }}
+                for pending_key, with_baseline in state["pending"].items()
+            ]
         else:
-            next_index = self._get_next_measurement_index(existing_data)
-            key = f"measurement_{next_index}"
-
             measurement_entry = {}
             if self.timer_start is not None:
                 measurement_entry["timer_start"] = self.timer_start
@@ -118,55 +125,226 @@ class perf:
 
             measurement_entry["withBaseline"] = result
 
-            if "baseline" in existing_data:
-                baseline_data = existing_data["baseline"]
-                measurement_entry["withoutBaseline"] = self._create_without_baseline(baseline_data, result)
+            if state["baseline"] is not None:
+                measurement_entry["withoutBaseline"] = self._create_without_baseline(state["baseline"], result)
+            elif self.runner_baseline:
+                measurement_entry["withoutBaseline"] = self._create_without_baseline(self.runner_baseline, result)
+                measurement_entry["baselineSource"] = "runner"
 
-            existing_data[key] = measurement_entry
+            records = [{"op": "set", "key": key, "value": measurement_entry}]
 
-        self._create_aggregate(existing_data)
-        self._save_data(output_path, existing_data)
+        self._append_log(records)
+        for record in records:
+            self._apply(state, record)
+        self._save_state(state)
         os.remove(path)
 
-        self.data = existing_data
+        self.data = None
+        self.convergence = check_convergence(state["consumption"])
+
+        # The result document is only written when a reader asks for it, see document_path().
+        return self._get_output_path()
+
+    def get_convergence(self, base=None, **options):
+        with session_lock(self.session_dir):
+            consumption = self._load_state()["consumption"]
+        base_consumption = None
+        if base is not None:
+            with session_lock(base.session_dir):
+                base_consumption = base._load_state()["consumption"]
+        return check_convergence(consumption, base_consumption, **options)
+
+    def load(self, exact=False):
+        with session_lock(self.session_dir):
+            state = self._load_state()
+            records = list(self._read_log())
+
+        data = {}
+        for record in records:
+            if record["op"] == "set":
+                data[record["key"]] = record["value"]
+            else:
+                data.setdefault(record["key"], {}).update(record["value"])
+
+        if exact:
+            self._create_aggregate(data)
+        elif state["aggregate"] is not None:
+            data["aggregate"] = state["aggregate"]
+        return data
+
+    def materialize(self, exact=False):
+        self.data = self.load(exact)
+        output_path = self._get_output_path()
+        with session_lock(self.session_dir):
+            self._save_data(output_path, self.data)
+        return output_path
 
+    def document_path(self):
+        output_path = self._get_output_path()
+        with session_lock(self.session_dir):
+            log_path = self._get_log_path()
+            if not os.path.exists(output_path) or (
+                os.path.exists(log_path) and os.path.getmtime(output_path) <= os.path.getmtime(log_path)
+            ):
+                return self.materialize()
         return output_path
 
-    def _update_measurements_without_baseline(self, existing_data):
-        if "baseline" not in existing_data:
+    def _new_state(self):
+        return {
+            "next_index": 0,
+            "measurements": 0,
+            "timer_start": None,
+            "timer_end": None,
+            "baseline": None,
+            "pending": {},
+            "single": None,
+            "variants": {},
+            "aggregate": None,
+            "consumption": {},
+        }
+
+    def _apply(self, state, record):
+        key, value = record["key"], record["value"]
+        if key == "baseline":
+            state["baseline"] = value
             return
 
-        baseline_data = existing_data["baseline"]
-        updated = False
-
-        for key, measurement in existing_data.items():
-            if not key.startswith("measurement_"):
+        if record["op"] == "set":
+            state["next_index"] = max(state["next_index"], int(key.split("_")[1]) + 1)
+            state["measurements"] += 1
+            for timer, pick in (("timer_start", min), ("timer_end", max)):
+                if value.get(timer) is not None:
+                    current = state[timer]
+                    state[timer] = value[timer] if current is None else pick(current, value[timer])
+            if "withoutBaseline" not in value:
+                state["pending"][key] = value["withBaseline"]
+            for event, event_data in value.get("withBaseline", {}).items():
+                if isinstance(event_data, dict) and isinstance(event_data.get("consumption"), (int, float)):
+                    state["consumption"][event] = fold(state["consumption"].get(event), event_data["consumption"])
+            state["single"] = dict(value) if state["measurements"] == 1 else None
+        else:
+            state["pending"].pop(key, None)
+            if state["single"] is not None:
+                state["single"].update(value)
+
+        for variant in ("withBaseline", "withoutBaseline"):
+            if variant in value:
+                self._fold(state["variants"].setdefault(variant, {}), value[variant])
+        state["aggregate"] = self._build_aggregate(state)
+
+    def _fold(self, running_events, stats):
+        for event, event_data in stats.items():
+            if not isinstance(event_data, dict) or "mean" not in event_data:
                 continue
-            if "withBaseline" in measurement and "withoutBaseline" not in measurement:
-                measurement["withoutBaseline"] = self._create_without_baseline(
-                    baseline_data, measurement["withBaseline"]
-                )
-                updated = True
+            running = running_events.setdefault(event, {"means": DDSketch(MEANS_RELATIVE_ACCURACY).to_dict(), "samples": None, "sketched": 0})
 
-        if updated:
-            output_path = self._get_output_path()
-            self._save_data(output_path, existing_data)
+            means = DDSketch.from_dict(running["means"])
+            means.add_many([event_data["mean"]])
+            running["means"] = means.to_dict()
 
-    def _parse_file(self, path):
-        data = {}
-        line_pattern = re.compile(r"^\s*([\d.,]+)\s+([\d.,]+)\s+\w+\s+(\S+)")
+            if "sketch" in event_data:
+                samples = DDSketch.from_dict(event_data["sketch"])
+                if running["samples"] is not None:
+                    samples.merge(DDSketch.from_dict(running["samples"]))
+                running["samples"] = samples.to_dict()
+                running["sketched"] += 1
+
+    def _build_aggregate(self, state):
+        if not state["measurements"]:
+            return None
+
+        aggregate_entry = {}
+        if state["timer_start"] is not None:
+            aggregate_entry["timer_start"] = state["timer_start"]
+        if state["timer_end"] is not None:
+            aggregate_entry["timer_end"] = state["timer_end"]
+
+        if state["single"] is not None:
+            for variant in ("withBaseline", "withoutBaseline"):
+                if variant in state["single"]:
+                    aggregate_entry[variant] = state["single"][variant]
+            return aggregate_entry
 
-        with open(path, "r", encoding="utf-8") as f:
+        delta_t = None
+        if state["timer_start"] is not None and state["timer_end"] is not None:
+            try:
+                delta_t = (int(state["timer_end"]) - int(state["timer_start"])) / 1_000_000
+            except Exception:
+                pass
+
+        for variant, running_events in state["variants"].items():
+            aggregate_entry[variant] = self._describe_running(running_events, delta_t)
+        return aggregate_entry
+
+    def _describe_running(self, running_events, delta_t):
+        data = {}
+        from_means = set()
+        for event, running in running_events.items():
+            means = DDSketch.from_dict(running["means"])
+            if running["samples"] is not None and running["sketched"] == means.count:
+                data[event] = DDSketch.from_dict(running["samples"])
+            else:
+                data[event] = means
+                from_means.add(event)
+
+        stats = describe_many(data, delta_t)
+        for event in from_means:
+            stats.get(event, {}).pop("sketch", None)
+        return stats
+
+    def _load_state(self):
+        state_path = self._get_state_path()
+        if os.path.exists(state_path):
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if "consumption" in state:
+                return state
+        return self._rebuild_state()
+
+    def _rebuild_state(self):
+        if not os.path.exists(self._get_log_path()):
+            self._import_legacy_data()
+        state = self._new_state()
+        for record in self._read_log():
+            self._apply(state, record)
+        if state["measurements"] or state["baseline"] is not None:
+            self._save_state(state)
+        return state
+
+    def _import_legacy_data(self):
+        existing_data = self._load_existing_data(self._get_output_path("json"))
+        if not existing_data:
+            return
+        records = []
+        if "baseline" in existing_data:
+            records.append({"op": "set", "key": "baseline", "value": existing_data["baseline"]})
+        measurement_keys = sorted(
+            (k for k in existing_data if k.startswith("measurement_") and k.split("_")[1].isdigit()),
+            key=lambda k: int(k.split("_")[1])
+        )
+        records += [{"op": "set", "key": k, "value": existing_data[k]} for k in measurement_keys]
+        self._append_log(records)
+
+    def _save_state(self, state):
+        write_json_atomic(self._get_state_path(), state)
+
+    def _append_log(self, records):
+        with open(self._get_log_path(), "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def _read_log(self):
+        log_path = self._get_log_path()
+        if not os.path.exists(log_path):
+            return
+        with open(log_path, "r", encoding="utf-8") as f:
             for line in f:
-                match = line_pattern.match(line)
-                if match:
-                    _, value_str, event = match.groups()
-                    value = float(value_str.replace(",", "."))
-                    data.setdefault(event, []).append(value)
-        return data
+                if line.strip():
+                    yield json.loads(line)
+
+    def _parse_file(self, path, samples_dir=None):
+        return parse_file(path, samples_dir=samples_dir)
 
     def _calculate_stats(self, data):
-        result = {}
         delta_t = None
         if self.timer_start and self.timer_end:
             try:
@@ -174,76 +352,33 @@ class perf:
             except ValueError:
                 delta_t = None
 
-        for event, values in data.items():
-            arr = np.array(values)
-            mean = np.mean(arr)
-            event_data = {
-                "unit": "W",
-                "samples": len(arr),
-                "min": round(float(np.min(arr)), 3),
-                "max": round(float(np.max(arr)), 3),
-                "mean": round(float(mean), 3),
-                "std": round(float(np.std(arr)), 3),
-                "percentiles": {
-                    "p25": round(float(np.percentile(arr, 25)), 3),
-                    "p50": round(float(np.percentile(arr, 50)), 3),
-                    "p75": round(float(np.percentile(arr, 75)), 3),
-                    "p90": round(float(np.percentile(arr, 90)), 3),
-                    "p95": round(float(np.percentile(arr, 95)), 3),
-                    "p99": round(float(np.percentile(arr, 99)), 3),
-                },
-            }
-            if delta_t is not None:
-                event_data["consumption"] = round(float(mean * delta_t), 3)
-
-            result[event] = event_data
-        return result
-
-    def _get_output_path(self):
+        return describe_many(data, delta_t)
+
+    def _get_output_path(self, codec=None):
+        base_name, _ = os.path.splitext(self.original_name)
+        return result_path(self.session_dir, base_name, codec)
+
+    def _get_log_path(self):
+        base_name, _ = os.path.splitext(self.original_name)
+        return os.path.join(self.session_dir, f"{base_name}.log.jsonl")
+
+    def _get_state_path(self):
+        base_name, _ = os.path.splitext(self.original_name)
+        return os.path.join(self.session_dir, f"{base_name}.state.json")
+
+    def _get_samples_dir(self, key):
         base_name, _ = os.path.splitext(self.original_name)
-        return os.path.join(self.session_dir, f"{base_name}.json")
+        return os.path.join(self.session_dir, f"{base_name}_measurements", key)
 
     def _load_existing_data(self, output_path):
         if os.path.exists(output_path):
-            with open(output_path, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return read_result(output_path)
         return {}
 
     def _save_data(self, output_path, data):
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
-
-    def _get_next_measurement_index(self, existing_data):
-        indices = [
-            int(k.split("_")[1]) for k in existing_data.keys()
-            if k.startswith("measurement_") and k.split("_")[1].isdigit()
-        ]
-        return max(indices) + 1 if indices else 0
+        write_result(output_path, data)
 
     def _create_without_baseline(self, baseline_data, measurement_data):
-        def calc_stats(values, delta_t=None):
-            arr = np.array(values)
-            mean = np.mean(arr)
-            event_data = {
-                "unit": "W",
-                "samples": len(arr),
-                "min": round(float(np.min(arr)), 3),
-                "max": round(float(np.max(arr)), 3),
-                "mean": round(float(mean), 3),
-                "std": round(float(np.std(arr)), 3),
-                "percentiles": {
-                    "p25": round(float(np.percentile(arr, 25)), 3),
-                    "p50": round(float(np.percentile(arr, 50)), 3),
-                    "p75": round(float(np.percentile(arr, 75)), 3),
-                    "p90": round(float(np.percentile(arr, 90)), 3),
-                    "p95": round(float(np.percentile(arr, 95)), 3),
-                    "p99": round(float(np.percentile(arr, 99)), 3),
-                },
-            }
-            if delta_t is not None:
-                event_data["consumption"] = round(float(mean * delta_t), 3)
-            return event_data
-
         corrected = {}
 
         delta_t = None
@@ -272,8 +407,8 @@ class perf:
                     "mean": diff,
                     "std": measurement_data[event].get("std", 0),
                     "percentiles": {
-                        p: max(0, measurement_data[event].get("percentiles", {}).get(p, 0) - baseline_data[event].get("percentiles", {}).get(p, 0))
-                        for p in ["p25", "p50", "p75", "p90", "p95", "p99"]
+                        p: max(0, v - baseline_data[event].get("percentiles", {}).get(p, 0))
+                        for p, v in measurement_data[event].get("percentiles", {}).items()
                     },
                     "consumption": max(0, measurement_data[event].get("consumption", 0) - baseline_data[event].get("consumption", 0)),
                 }
@@ -336,48 +471,30 @@ class perf:
         existing_data["aggregate"] = aggregate_entry
 
     def _aggregate_stats(self, measurements, timer_start, timer_end):
-        agg = {}
-        all_events = set()
+        means = {}
+        sketches = {}
         for m in measurements:
-            all_events.update(m.keys())
-
-        for event in all_events:
-            values = []
-            for m in measurements:
-                if event in m and "mean" in m[event]:
-                    values.append(m[event]["mean"])
-            if not values:
-                continue
+            for event, event_data in m.items():
+                if "mean" in event_data:
+                    means.setdefault(event, []).append(event_data["mean"])
+                if "sketch" in event_data:
+                    sketches.setdefault(event, []).append(event_data["sketch"])
+
+        delta_t = None
+        if timer_start is not None and timer_end is not None:
+            try:
+                delta_t = (int(timer_end) - int(timer_start)) / 1_000_000
+            except Exception:
+                pass
+
+        data = {}
+        for event, values in means.items():
+            if len(sketches.get(event, [])) == len(values):
+                merged = DDSketch.from_dict(sketches[event][0])
+                for sketch in sketches[event][1:]:
+                    merged.merge(DDSketch.from_dict(sketch))
+                data[event] = merged
+            else:
+                data[event] = values
 
-            arr = np.array(values)
-            mean = np.mean(arr)
-            event_data = {
-                "unit": "W",
-                "samples": len(arr),
-                "min": round(float(np.min(arr)), 3),
-                "max": round(float(np.max(arr)), 3),
-                "mean": round(float(mean), 3),
-                "std": round(float(np.std(arr)), 3),
-                "percentiles": {
-                    "p25": round(float(np.percentile(arr, 25)), 3),
-                    "p50": round(float(np.percentile(arr, 50)), 3),
-                    "p75": round(float(np.percentile(arr, 75)), 3),
-                    "p90": round(float(np.percentile(arr, 90)), 3),
-                    "p95": round(float(np.percentile(arr, 95)), 3),
-                    "p99": round(float(np.percentile(arr, 99)), 3),
-                },
-            }
-
-            delta_t = None
-            if timer_start is not None and timer_end is not None:
-                try:
-                    delta_t = (int(timer_end) - int(timer_start)) / 1_000_000
-                except Exception:
-                    pass
-
-            if delta_t is not None:
-                event_data["consumption"] = round(float(mean * delta_t), 3)
-
-            agg[event] = event_data
-
-        return agg
\ No newline at end of file
+        return describe_many(data, delta_t)
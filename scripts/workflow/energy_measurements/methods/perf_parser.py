@@ -0,0 +1,137 @@
+import io
+import os
+import re
+import warnings
+import numpy as np
+from .sample_store import SAMPLE_STORE_ENABLED, SAMPLES_NAME, SampleWriter
+from .sketch import DDSketch
+from .stats import STATS_MODE
+
+# one match per "time value unit event" row; '#' headers and "<not counted>" rows never match
+ROW_PATTERN = re.compile(rb"^[ \t]*([\d.,]+)[ \t]+([\d.,]+)[ \t]+\w+[ \t]+(\S+)", re.MULTILINE)
+NOT_COUNTED_PATTERN = re.compile(rb"^.*<not (?:counted|supported)>.*$\n?", re.MULTILINE)
+READ_BLOCK_SIZE = 8 * 1024 * 1024
+EVENT_WIDTH = 64
+ENCODE_SAMPLE = 256
+
+def _to_float(column):
+    try:
+        return column.astype(np.float64)
+    except ValueError:
+        return np.char.replace(column, b",", b".").astype(np.float64)
+
+def _loadtxt(block, dtype, usecols):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return np.loadtxt(io.BytesIO(block), dtype=dtype, usecols=usecols, comments="#", ndmin=1)
+
+def _load_columns(block):
+    number_dtype = [("time", np.float64), ("value", np.float64)]
+    event_width = EVENT_WIDTH
+    while True:
+        event_dtype = [("event", f"S{event_width}")]
+        try:
+            rows = _loadtxt(block, number_dtype + event_dtype, (0, 1, 3))
+            numbers, events = rows, rows["event"]
+        except ValueError:
+            # decimal commas from a non-C LC_NUMERIC; event names keep their own commas
+            numbers = _loadtxt(block.replace(b",", b"."), number_dtype, (0, 1))
+            events = _loadtxt(block, event_dtype, (3,))["event"]
+        if not len(events) or np.char.str_len(events).max() < event_width:
+            return numbers["time"], numbers["value"], events
+        event_width *= 4
+
+def _match_columns(block):
+    rows = ROW_PATTERN.findall(block)
+    if not rows:
+        return np.empty(0), np.empty(0), np.empty(0, dtype="S1")
+    columns = np.array(rows)
+    return _to_float(columns[:, 0]), _to_float(columns[:, 1]), columns[:, 2]
+
+def _encode_events(events):
+    names = []
+    codes = np.full(len(events), -1, dtype=np.intp)
+    pending = codes < 0
+    while pending.any():
+        for name in dict.fromkeys(events[pending][:ENCODE_SAMPLE].tolist()):
+            codes[events == name] = len(names)
+            names.append(name)
+        pending = codes < 0
+    return codes, [name.decode("utf-8", errors="replace") for name in names]
+
+def parse_block(block: bytes):
+    if b"<not " in block:
+        block = NOT_COUNTED_PATTERN.sub(b"", block)
+    try:
+        times, values, events = _load_columns(block)
+    except ValueError:
+        times, values, events = _match_columns(block)
+    codes, names = _encode_events(events)
+    return times, values, codes, names
+
+class PerfAccumulator:
+    def __init__(self, sketch=None, samples_dir=None):
+        self.sketch = STATS_MODE == "sketch" if sketch is None else sketch
+        self.store = None
+        if samples_dir is not None and SAMPLE_STORE_ENABLED:
+            self.store = SampleWriter(os.path.join(samples_dir, SAMPLES_NAME))
+        self.samples_path = None
+        self.data = {}
+        self._partial = b""
+        self._values = {}
+
+    def feed(self, block: bytes):
+        if not block:
+            return
+        buffer = self._partial + block
+        cut = buffer.rfind(b"\n") + 1
+        self._partial = buffer[cut:]
+        if cut:
+            self._add(parse_block(buffer[:cut]))
+
+    def close(self):
+        if self._partial:
+            self._add(parse_block(self._partial))
+            self._partial = b""
+        if self.store is not None:
+            self.samples_path = self.store.close()
+            self.store = None
+        if self.sketch:
+            return self.data
+        for event, parts in self._values.items():
+            if len(parts) > 1 or event not in self.data:
+                self.data[event] = np.concatenate(parts)
+                self._values[event] = [self.data[event]]
+        return self.data
+
+    def discard(self):
+        if self.store is not None:
+            self.store.discard()
+            self.store = None
+
+    def _add(self, parsed):
+        if self.store is not None:
+            self.store.append(*parsed)
+        _, values, codes, events = parsed
+        if self.sketch:
+            for code, event in enumerate(events):
+                sketch = self.data.get(event)
+                if sketch is None:
+                    sketch = self.data[event] = DDSketch()
+                sketch.add_many(values[codes == code])
+            return
+        if len(events) == 1:
+            self._values.setdefault(events[0], []).append(values)
+            return
+        for code, event in enumerate(events):
+            self._values.setdefault(event, []).append(values[codes == code])
+
+def parse_file(path, block_size=READ_BLOCK_SIZE, samples_dir=None):
+    accumulator = PerfAccumulator(samples_dir=samples_dir)
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            accumulator.feed(block)
+    return accumulator.close()
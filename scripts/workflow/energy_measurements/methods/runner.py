@@ -1,7 +1,11 @@
 import os
 import shutil
-from services.carbon_service import enrich_json_with_carbon_data, fetch_carbon_intensity
+from services.carbon_service import enrich_json_with_carbon_data
+from services.file_service import DECOMPRESSED_NAME, iter_decompressed_chunks, reconstruct_file_from_chunks
+from services.manifest_service import MANIFEST_NAME
+from services.storage_service import allocate_numbered_dir
 from .perf import perf
+from .sample_store import SAMPLES_NAME
 from .pcm import pcm
 
 class MethodRunner:
@@ -10,36 +14,60 @@ class MethodRunner:
         "pcm": pcm
     }
 
-    def __init__(self, approach, method, base_dir, path):
+    def __init__(self, approach, method, base_dir, path=None, accumulator=None, carbon_intensity=None):
         self.approach = approach
         self.method = method
         self.base_dir = base_dir
         self.path = path
+        self.accumulator = accumulator
+        self.carbon_intensity = carbon_intensity
+
+    @classmethod
+    def accumulator_class_for(cls, method):
+        return getattr(cls.METHODS.get(method), "accumulator_class", None)
+
+    def _create_processor(self, processor_class):
+        if self.path is not None:
+            return processor_class(self.base_dir, self.path)
+
+        accumulator_class = getattr(processor_class, "accumulator_class", None)
+        if accumulator_class is None:
+            return processor_class(self.base_dir, reconstruct_file_from_chunks(self.base_dir))
+
+        accumulator = self.accumulator
+        if accumulator is None:
+            accumulator = accumulator_class(samples_dir=self.base_dir)
+            for block in iter_decompressed_chunks(self.base_dir):
+                accumulator.feed(block)
+        path = os.path.join(self.base_dir, DECOMPRESSED_NAME)
+        return processor_class(self.base_dir, path, accumulator=accumulator)
 
     def run(self):
         if self.method not in self.METHODS:
             raise ValueError(f"Unsupported method: {self.method}")
         
         processor_class = self.METHODS[self.method]
-        processor = processor_class(self.base_dir, self.path)
-        decompressed_json_path = processor.process()
+        carbon_intensity = self.carbon_intensity
 
-        carbon_data = fetch_carbon_intensity()
-        carbon_intensity = carbon_data.get("carbonIntensity")
-        if carbon_intensity:
-            enrich_json_with_carbon_data(decompressed_json_path, carbon_intensity)
+        processor = self._create_processor(processor_class)
+        if hasattr(processor, "carbon_intensity"):
+            processor.carbon_intensity = carbon_intensity
+            decompressed_json_path = processor.process()
+        else:
+            decompressed_json_path = processor.process()
+            if carbon_intensity:
+                enrich_json_with_carbon_data(decompressed_json_path, carbon_intensity)
 
-        existing = [d for d in os.listdir(self.base_dir) if d.startswith("measurement")]
-        nums = [int(d.replace("measurement", "")) for d in existing if d.replace("measurement", "").isdigit()]
-        next_num = max(nums, default=-1) + 1
+        target_dir = allocate_numbered_dir(self.base_dir, "measurement")
 
-        target_dir = os.path.join(self.base_dir, f"measurement{next_num}")
-        os.makedirs(target_dir)
-
-        items_to_move = ["chunks", "data", "decompressed", "reconstructed.gz", os.path.basename(decompressed_json_path)]
+        items_to_move = ["chunks", "data", MANIFEST_NAME, SAMPLES_NAME, "decompressed", "reconstructed.gz", os.path.basename(decompressed_json_path)]
         for item in items_to_move:
             src = os.path.join(self.base_dir, item)
             if os.path.exists(src):
                 shutil.move(src, target_dir)
 
         return os.path.join(target_dir, os.path.basename(decompressed_json_path))
+
+
+def run_method(approach, method, base_dir, accumulator=None, carbon_intensity=None):
+    return MethodRunner(approach, method, base_dir, accumulator=accumulator, carbon_intensity=carbon_intensity).run()
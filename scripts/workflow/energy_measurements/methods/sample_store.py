@@ -0,0 +1,132 @@
+import os
+import json
+import shutil
+import struct
+import uuid
+import numpy as np
+from .stats import PERCENTILES, describe_many
+
+SAMPLE_STORE_ENABLED = os.environ.get("WATTSCI_SAMPLE_STORE", "1") != "0"
+SAMPLES_NAME = "samples"
+EVENTS_FILE = "events.json"
+COLUMNS = {
+    "time": np.dtype("<f8"),
+    "value": np.dtype("<f4"),
+    "event": np.dtype("<u2"),
+}
+# fixed-size .npy header so the sample count can be patched in place after streaming
+HEADER_SIZE = 128
+
+def _npy_header(dtype, count):
+    text = repr({
+        "descr": np.lib.format.dtype_to_descr(dtype),
+        "fortran_order": False,
+        "shape": (count,),
+    }).encode("latin1")
+    magic = np.lib.format.magic(1, 0)
+    padding = HEADER_SIZE - len(magic) - 2 - len(text) - 1
+    return magic + struct.pack("<H", len(text) + padding + 1) + text + b" " * padding + b"\n"
+
+def _column_path(directory, column):
+    return os.path.join(directory, f"{column}.npy")
+
+class SampleWriter:
+    def __init__(self, target):
+        self.target = target
+        self.part = f"{target}.{uuid.uuid4().hex}.part"
+        self.events = []
+        self.count = 0
+        self._codes = {}
+
+    def _code(self, name):
+        code = self._codes.get(name)
+        if code is None:
+            if len(self.events) > np.iinfo(COLUMNS["event"]).max:
+                raise ValueError(f"Too many distinct events for the sample store: {len(self.events)}")
+            code = self._codes[name] = len(self.events)
+            self.events.append(name)
+        return code
+
+    def append(self, times, values, codes, names):
+        if not len(times):
+            return
+        mapping = np.array([self._code(name) for name in names], dtype=COLUMNS["event"])
+        os.makedirs(self.part, exist_ok=True)
+        for column, data in (("time", times), ("value", values), ("event", mapping[codes])):
+            with open(_column_path(self.part, column), "ab") as f:
+                if not self.count:
+                    f.write(_npy_header(COLUMNS[column], 0))
+                f.write(np.ascontiguousarray(data, dtype=COLUMNS[column]).tobytes())
+        self.count += len(times)
+
+    def close(self):
+        if not self.count:
+            self.discard()
+            return None
+        for column, dtype in COLUMNS.items():
+            with open(_column_path(self.part, column), "r+b") as f:
+                f.write(_npy_header(dtype, self.count))
+        with open(os.path.join(self.part, EVENTS_FILE), "w", encoding="utf-8") as f:
+            json.dump({"events": self.events, "samples": self.count}, f)
+
+        if os.path.isdir(self.target):
+            shutil.rmtree(self.target)
+        os.replace(self.part, self.target)
+        return self.target
+
+    def discard(self):
+        shutil.rmtree(self.part, ignore_errors=True)
+
+class SampleStore:
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, EVENTS_FILE), "r", encoding="utf-8") as f:
+            self.events = json.load(f)["events"]
+        self._columns = {}
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = np.load(_column_path(self.path, name), mmap_mode="r")
+        return self._columns[name]
+
+    def __len__(self):
+        return len(self.column("time"))
+
+    def window(self, start=None, end=None):
+        time = self.column("time")
+        lo = 0 if start is None else int(np.searchsorted(time, start, side="left"))
+        hi = len(time) if end is None else int(np.searchsorted(time, end, side="right"))
+        return slice(lo, hi)
+
+    def _mask(self, event, window):
+        if event not in self.events:
+            raise KeyError(event)
+        return self.column("event")[window] == self.events.index(event)
+
+    def times(self, event, start=None, end=None):
+        window = self.window(start, end)
+        return np.asarray(self.column("time")[window][self._mask(event, window)])
+
+    def values(self, event, start=None, end=None):
+        window = self.window(start, end)
+        return np.asarray(self.column("value")[window][self._mask(event, window)], dtype=np.float64)
+
+    def load(self, events=None, start=None, end=None):
+        window = self.window(start, end)
+        codes = self.column("event")[window]
+        values = self.column("value")[window]
+        return {
+            event: np.asarray(values[codes == self.events.index(event)], dtype=np.float64)
+            for event in (self.events if events is None else events)
+        }
+
+def describe_window(path, start=None, end=None, events=None, decimals=3, percentiles=PERCENTILES):
+    store = SampleStore(path)
+    time = store.column("time")
+    if not len(time):
+        return {}
+    window = store.window(start, end)
+    delta_t = None
+    if window.stop > window.start:
+        delta_t = float(time[window.stop - 1] - time[window.start])
+    return describe_many(store.load(events, start, end), delta_t, decimals, percentiles)
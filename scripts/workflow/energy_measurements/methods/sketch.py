@@ -0,0 +1,109 @@
+import math
+import numpy as np
+
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+class DDSketch:
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add_many(self, values):
+        arr = np.asarray(values, dtype=float)
+        if not arr.size:
+            return
+
+        positive = arr[arr > 0]
+        self.zero_count += int(arr.size - positive.size)
+        if positive.size:
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0) + count
+
+        self._combine_moments(arr.size, float(arr.mean()), float(((arr - arr.mean()) ** 2).sum()))
+        self.min = min(self.min, float(arr.min()))
+        self.max = max(self.max, float(arr.max()))
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self._combine_moments(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _combine_moments(self, count, mean, m2):
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def _value_at(self, rank):
+        seen = self.zero_count
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        lower_rank = math.floor(rank)
+        lower = self._value_at(lower_rank)
+        if rank == lower_rank:
+            return lower
+        return lower + (self._value_at(lower_rank + 1) - lower) * (rank - lower_rank)
+
+    def to_dict(self):
+        keys = sorted(self.bins)
+        offset = keys[0] if keys else 0
+        counts = [0] * (keys[-1] - offset + 1) if keys else []
+        for key in keys:
+            counts[key - offset] = self.bins[key]
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "bin_offset": offset,
+            "bin_counts": counts
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data.get("relative_accuracy", DEFAULT_RELATIVE_ACCURACY))
+        sketch.count = data.get("count", 0)
+        sketch.mean = data.get("mean", 0.0)
+        sketch.m2 = data.get("m2", 0.0)
+        sketch.min = data["min"] if data.get("min") is not None else math.inf
+        sketch.max = data["max"] if data.get("max") is not None else -math.inf
+        sketch.zero_count = data.get("zero_count", 0)
+        offset = data.get("bin_offset", 0)
+        sketch.bins = {offset + i: c for i, c in enumerate(data.get("bin_counts", [])) if c}
+        return sketch
@@ -0,0 +1,74 @@
+import os
+import numpy as np
+from .sketch import DDSketch
+
+PERCENTILES = tuple(
+    float(p) for p in os.environ.get("WATTSCI_PERCENTILES", "25,50,75,90,95,99").split(",")
+)
+
+def percentile_key(p):
+    return f"p{p:g}"
+
+PERCENTILE_KEYS = [percentile_key(p) for p in PERCENTILES]
+
+STATS_MODE = os.environ.get("WATTSCI_STATS_MODE", "exact")
+
+def describe_sketch(sketch, delta_t=None, decimals=3, percentiles=PERCENTILES):
+    event_data = {
+        "unit": "W",
+        "samples": sketch.count,
+        "min": round(float(sketch.min), decimals),
+        "max": round(float(sketch.max), decimals),
+        "mean": round(float(sketch.mean), decimals),
+        "std": round(float(sketch.std), decimals),
+        "percentiles": {
+            percentile_key(p): round(float(sketch.quantile(p / 100)), decimals)
+            for p in percentiles
+        },
+    }
+    if delta_t is not None:
+        event_data["consumption"] = round(float(sketch.mean * delta_t), decimals)
+    event_data["sketch"] = sketch.to_dict()
+    return event_data
+
+def describe_many(data, delta_t=None, decimals=3, percentiles=PERCENTILES):
+    groups = {}
+    stats = {}
+    for event, values in data.items():
+        if isinstance(values, DDSketch):
+            if values.count:
+                stats[event] = describe_sketch(values, delta_t, decimals, percentiles)
+            continue
+        arr = np.asarray(values, dtype=float)
+        if arr.size:
+            groups.setdefault(arr.size, []).append((event, arr))
+
+    for size, members in groups.items():
+        matrix = np.stack([arr for _, arr in members])
+        mins = matrix.min(axis=1)
+        maxs = matrix.max(axis=1)
+        means = matrix.mean(axis=1)
+        stds = matrix.std(axis=1)
+        quantiles = np.percentile(matrix, percentiles, axis=1)
+
+        for i, (event, _) in enumerate(members):
+            event_data = {
+                "unit": "W",
+                "samples": size,
+                "min": round(float(mins[i]), decimals),
+                "max": round(float(maxs[i]), decimals),
+                "mean": round(float(means[i]), decimals),
+                "std": round(float(stds[i]), decimals),
+                "percentiles": {
+                    percentile_key(p): round(float(quantiles[j, i]), decimals)
+                    for j, p in enumerate(percentiles)
+                },
+            }
+            if delta_t is not None:
+                event_data["consumption"] = round(float(means[i] * delta_t), decimals)
+            stats[event] = event_data
+
+    return {event: stats[event] for event in data if event in stats}
+
+def describe(values, delta_t=None, decimals=3, percentiles=PERCENTILES):
+    return describe_many({None: values}, delta_t, decimals, percentiles).get(None)
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, String, Integer, Float, Index
+from models.result import Base
+
+class CommitRollup(Base):
+    __tablename__ = "commit_rollups"
+    __table_args__ = (
+        Index(
+            "ux_commit_rollups_key",
+            "repository", "branch", "commit_hash", "workflow_id", "approach", "method", "label", "variant", "event",
+            unique=True
+        ),
+        Index("ix_commit_rollups_commit_hash", "commit_hash"),
+    )
+
+    MAIN = "main"
+    SUBTRACTED = "subtracted"
+    RUN = ""
+
+    id                      = Column(Integer, primary_key=True)
+    repository              = Column(String, nullable=False)
+    branch                  = Column(String, nullable=False)
+    commit_hash             = Column(String, nullable=False)
+    workflow_id             = Column(String, nullable=False)
+    approach                = Column(String, nullable=False)
+    method                  = Column(String, nullable=False)
+    label                   = Column(String, nullable=False)
+    variant                 = Column(String, nullable=False)
+    event                   = Column(String, nullable=False)
+    count                   = Column(Integer, nullable=False, default=0)
+    consumption_sum         = Column(Float, nullable=False, default=0)
+    consumption_min         = Column(Float, nullable=True)
+    consumption_max         = Column(Float, nullable=True)
+    mean_sum                = Column(Float, nullable=False, default=0)
+    carbon_footprint_g_sum  = Column(Float, nullable=False, default=0)
+    delta_t_sum             = Column(Float, nullable=False, default=0)
+    delta_t_count           = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return (
+            f"<CommitRollup(commit_hash={self.commit_hash!r}, variant={self.variant!r}, "
+            f"event={self.event!r}, count={self.count!r})>"
+        )
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from models.result import Base
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    ALL = "*"
+
+    repository  = Column(String, primary_key=True)
+    version     = Column(Integer, nullable=False, default=0)
+    updated_at  = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, repository=None, version=0):
+        self.repository = repository
+        self.version = version
+        self.updated_at = datetime.utcnow()
+
+    def __repr__(self):
+        return f"<DataVersion(repository={self.repository!r}, version={self.version!r})>"
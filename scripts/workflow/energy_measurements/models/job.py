@@ -0,0 +1,55 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, JSON, DateTime, Text
+from models.result import Base
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+    id          = Column(String, primary_key=True, default=lambda: uuid.uuid4().hex)
+    kind        = Column(String, nullable=False)
+    session_id  = Column(String, nullable=False, index=True)
+    status      = Column(String, nullable=False, default=QUEUED, index=True)
+    progress    = Column(Integer, nullable=False, default=0)
+    stage       = Column(String, nullable=True)
+    params      = Column(JSON, nullable=False)
+    result      = Column(JSON, nullable=True)
+    error       = Column(Text, nullable=True)
+    attempts    = Column(Integer, nullable=False, default=0)
+    created_at  = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at  = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, kind=None, session_id=None, params=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.session_id = session_id
+        self.status = self.QUEUED
+        self.progress = 0
+        self.params = params or {}
+        self.attempts = 0
+
+    def __repr__(self):
+        return (
+            f"<Job(id={self.id!r}, kind={self.kind!r}, session_id={self.session_id!r}, "
+            f"status={self.status!r}, progress={self.progress!r}, stage={self.stage!r})>"
+        )
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "session_id": self.session_id,
+            "status": self.status,
+            "progress": self.progress,
+            "stage": self.stage,
+            "result": self.result,
+            "error": self.error,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,25 +1,33 @@
-from sqlalchemy import Column, String, Integer, JSON
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, JSON, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
 class Result(Base):
     __tablename__ = "results"
-    
+    __table_args__ = (
+        Index("ix_results_repository_branch_created_at", "repository", "branch", "created_at"),
+    )
+
     id             = Column(Integer, primary_key=True, index=True)
     session_id     = Column(String, nullable=False)
     ci             = Column(String, nullable=False)
-    run_id         = Column(String, nullable=False)
+    run_id         = Column(String, nullable=False, index=True)
     branch         = Column(String, nullable=False)
     repository     = Column(String, nullable=False)
     workflow_id    = Column(String, nullable=False)
     workflow_name  = Column(String, nullable=False)
-    commit_hash    = Column(String, nullable=False)
+    commit_hash    = Column(String, nullable=False, index=True)
     approach       = Column(String, nullable=False)
     method         = Column(String, nullable=False)
     label          = Column(String, nullable=False)
     json_main      = Column(String, nullable=False)
     json_baseline  = Column(String, nullable=True)
+    summary_main     = Column(JSON, nullable=True)
+    summary_baseline = Column(JSON, nullable=True)
+    runner           = Column(String, nullable=True)
+    created_at       = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     def __init__(
         self,
@@ -35,7 +43,11 @@ class Result(Base):
         approach=None,
         label=None,
         json_main=None,
-        json_baseline=None
+        json_baseline=None,
+        summary_main=None,
+        summary_baseline=None,
+        runner=None,
+        created_at=None
     ):
         self.session_id = session_id
         self.ci = ci
@@ -50,6 +62,10 @@ class Result(Base):
         self.label = label
         self.json_main = json_main or {}
         self.json_baseline = json_baseline
+        self.summary_main = summary_main
+        self.summary_baseline = summary_baseline
+        self.runner = runner
+        self.created_at = created_at or datetime.utcnow()
 
     def __repr__(self):
         return (
@@ -75,5 +91,7 @@ class Result(Base):
             "approach": self.approach,
             "label": self.label,
             "json_main": self.json_main,
-            "json_baseline": self.json_baseline
+            "json_baseline": self.json_baseline,
+            "runner": self.runner,
+            "created_at": self.created_at.isoformat() if self.created_at else None
         }
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Float, JSON, DateTime
+from models.result import Base
+
+class RunnerBaseline(Base):
+    __tablename__ = "runner_baselines"
+
+    fingerprint  = Column(String, primary_key=True)
+    method       = Column(String, primary_key=True)
+    event        = Column(String, primary_key=True)
+    samples      = Column(Integer, nullable=False, default=0)
+    mean         = Column(Float, nullable=False, default=0)
+    variance     = Column(Float, nullable=False, default=0)
+    stats        = Column(JSON, nullable=False)
+    updated_at   = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<RunnerBaseline(fingerprint={self.fingerprint!r}, method={self.method!r}, "
+            f"event={self.event!r}, samples={self.samples!r}, mean={self.mean!r})>"
+        )
@@ -0,0 +1,133 @@
+import os
+import math
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from models.runner_baseline import RunnerBaseline
+from db.db import db_session
+
+logger = logging.getLogger(__name__)
+
+BASELINE_EWMA_ALPHA = float(os.environ.get("WATTSCI_BASELINE_EWMA_ALPHA", "0.2"))
+BASELINE_MIN_SAMPLES = int(os.environ.get("WATTSCI_BASELINE_MIN_SAMPLES", "3"))
+BASELINE_MAX_AGE_HOURS = float(os.environ.get("WATTSCI_BASELINE_MAX_AGE_HOURS", "24"))
+BASELINE_DRIFT_SIGMAS = float(os.environ.get("WATTSCI_BASELINE_DRIFT_SIGMAS", "3"))
+BASELINE_DRIFT_TOLERANCE = float(os.environ.get("WATTSCI_BASELINE_DRIFT_TOLERANCE", "0.05"))
+
+RUNNER_SOURCE = "runner_baseline"
+
+def runner_fingerprint(cpu_model=None, kernel=None, host_id=None):
+    parts = [(value or "").strip() for value in (cpu_model, kernel, host_id)]
+    if not any(parts):
+        return None
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+def _numeric_fields(data):
+    fields = {}
+    for key, value in data.items():
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)):
+            fields[key] = float(value)
+        elif isinstance(value, dict):
+            nested = _numeric_fields(value)
+            if nested:
+                fields[key] = nested
+    return fields
+
+def _ewma_fields(previous, current, alpha):
+    merged = {}
+    for key, value in current.items():
+        old = previous.get(key)
+        if isinstance(value, dict):
+            merged[key] = _ewma_fields(old if isinstance(old, dict) else {}, value, alpha)
+        else:
+            merged[key] = value if old is None or isinstance(old, dict) else old + alpha * (value - old)
+    return merged
+
+def _drifted(row, value):
+    if row.samples < BASELINE_MIN_SAMPLES:
+        return False
+    deviation = abs(value - row.mean)
+    return deviation > BASELINE_DRIFT_SIGMAS * math.sqrt(row.variance) and deviation > BASELINE_DRIFT_TOLERANCE * abs(row.mean)
+
+def _record(fingerprint, method, summary, alpha):
+    now = datetime.utcnow()
+    rows = {
+        row.event: row
+        for row in db_session.query(RunnerBaseline).filter(
+            RunnerBaseline.fingerprint == fingerprint, RunnerBaseline.method == method
+        )
+    }
+
+    for event, data in (summary or {}).get("events", {}).items():
+        if not isinstance(data, dict) or not isinstance(data.get("mean"), (int, float)):
+            continue
+        stats = _numeric_fields(data)
+        value = stats["mean"]
+        row = rows.get(event)
+        if row is None:
+            row = RunnerBaseline(fingerprint=fingerprint, method=method, event=event)
+            db_session.add(row)
+        elif row.samples and _drifted(row, value):
+            logger.info(
+                f"Idle baseline for runner {fingerprint} {event} drifted from {row.mean:.4f} to {value:.4f}, restarting estimate"
+            )
+            row.samples = 0
+
+        if not row.samples:
+            row.samples, row.mean, row.variance, row.stats = 1, value, 0.0, stats
+        else:
+            delta = value - row.mean
+            row.mean += alpha * delta
+            row.variance = (1 - alpha) * (row.variance + alpha * delta * delta)
+            row.stats = _ewma_fields(row.stats, stats, alpha)
+            row.samples += 1
+        row.updated_at = now
+
+def record_runner_baseline(fingerprint, method, summary, alpha=None):
+    alpha = BASELINE_EWMA_ALPHA if alpha is None else alpha
+    try:
+        with db_session.begin_nested():
+            _record(fingerprint, method, summary, alpha)
+    except IntegrityError:
+        with db_session.begin_nested():
+            _record(fingerprint, method, summary, alpha)
+
+def _rows(fingerprint, method):
+    return (
+        db_session.query(RunnerBaseline)
+        .filter(RunnerBaseline.fingerprint == fingerprint, RunnerBaseline.method == method)
+        .order_by(RunnerBaseline.event)
+        .all()
+    )
+
+def runner_baseline_status(fingerprint, method):
+    rows = _rows(fingerprint, method)
+    samples = min((row.samples for row in rows), default=0)
+    updated_at = min((row.updated_at for row in rows), default=None)
+    stale = updated_at is None or datetime.utcnow() - updated_at > timedelta(hours=BASELINE_MAX_AGE_HOURS)
+    return {
+        "fingerprint": fingerprint,
+        "method": method,
+        "samples": samples,
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "stale": stale,
+        "needs_baseline": stale or samples < BASELINE_MIN_SAMPLES,
+        "events": {
+            row.event: {"samples": row.samples, "mean": row.mean, "std": math.sqrt(row.variance)}
+            for row in rows
+        }
+    }
+
+def runner_baseline_summary(fingerprint, method):
+    rows = _rows(fingerprint, method)
+    if not rows:
+        return None
+    return {
+        "source": RUNNER_SOURCE,
+        "runner": fingerprint,
+        "samples": min(row.samples for row in rows),
+        "events": {row.event: row.stats for row in rows}
+    }
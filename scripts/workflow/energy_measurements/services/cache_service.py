@@ -0,0 +1,112 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from functools import wraps
+from collections import OrderedDict
+from flask import Response, make_response, request
+from sqlalchemy.exc import IntegrityError
+from db.db import db_session
+from models.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = int(os.environ.get("WATTSCI_CACHE_MAX_ENTRIES", "256"))
+CACHE_TTL_SECONDS = float(os.environ.get("WATTSCI_CACHE_TTL_SECONDS", "300"))
+CACHE_MAX_BODY_BYTES = int(os.environ.get("WATTSCI_CACHE_MAX_BODY_BYTES", str(8 * 1024 * 1024)))
+
+class ResponseCache:
+    def __init__(self, max_entries, ttl_seconds):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+response_cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS)
+
+def get_data_version(repository=None):
+    row = db_session.get(DataVersion, repository or DataVersion.ALL)
+    return row.version if row else 0
+
+def _increment(repository):
+    return db_session.query(DataVersion).filter(DataVersion.repository == repository).update(
+        {DataVersion.version: DataVersion.version + 1}, synchronize_session=False
+    )
+
+def bump_data_version(repository):
+    for key in {repository or DataVersion.ALL, DataVersion.ALL}:
+        if _increment(key):
+            continue
+        try:
+            with db_session.begin_nested():
+                db_session.add(DataVersion(repository=key, version=1))
+        except IntegrityError:
+            _increment(key)
+
+def _cache_key(repository_arg):
+    args = tuple(sorted((k, v.strip()) for k, v in request.args.items(multi=True)))
+    repository = request.args.get(repository_arg, "").strip() or None
+    return request.path, args, get_data_version(repository)
+
+def _etag(key):
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:32]
+
+def cached_response(repository_arg="repository"):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                key = _cache_key(repository_arg)
+            except Exception as e:
+                db_session.rollback()
+                logger.warning(f"Response cache bypassed for {request.path}: {e}")
+                return view(*args, **kwargs)
+
+            etag = _etag(key)
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+            else:
+                cached = response_cache.get(key)
+                if cached is not None:
+                    body, status, headers = cached
+                    response = Response(body, status=status, headers=headers)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    if not response.is_streamed:
+                        body = response.get_data()
+                        if len(body) <= CACHE_MAX_BODY_BYTES:
+                            response_cache.put(key, (body, response.status_code, list(response.headers.items())))
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+import os
+import requests
+from datetime import datetime, timedelta
+
+CARBON_API_URL = os.environ.get("WATTSCI_CARBON_API_URL", "https://api.electricitymap.org/v3")
+CARBON_API_TOKEN = os.environ.get("WATTSCI_CARBON_API_TOKEN", "")
+CARBON_TIMEOUT = float(os.environ.get("WATTSCI_CARBON_TIMEOUT", "5"))
+CARBON_HISTORY_MAX_HOURS = int(os.environ.get("WATTSCI_CARBON_HISTORY_MAX_HOURS", "240"))
+
+def _parse_datetime(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+class StaticProvider:
+    name = "static"
+
+    def __init__(self, intensity):
+        self.intensity = intensity
+
+    def latest(self, zone=None):
+        return self.intensity
+
+    def history(self, zone, start, end):
+        hour = start.replace(minute=0, second=0, microsecond=0)
+        points = []
+        while hour < end:
+            points.append((hour, self.intensity))
+            hour += timedelta(hours=1)
+        return points
+
+class ElectricityMapsProvider:
+    name = "electricitymaps"
+
+    def __init__(self, url=None, token=None, timeout=None):
+        self.url = (url or CARBON_API_URL).rstrip("/")
+        self.token = CARBON_API_TOKEN if token is None else token
+        self.timeout = CARBON_TIMEOUT if timeout is None else timeout
+        self.session = requests.Session()
+
+    def _get(self, path, params):
+        response = self.session.get(
+            f"{self.url}{path}",
+            headers={"auth-token": self.token},
+            params={name: value for name, value in params.items() if value},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def latest(self, zone=None):
+        return self._get("/carbon-intensity/latest", {"zone": zone}).get("carbonIntensity")
+
+    def history(self, zone, start, end):
+        points = []
+        while start < end:
+            stop = min(end, start + timedelta(hours=CARBON_HISTORY_MAX_HOURS))
+            data = self._get("/carbon-intensity/past-range", {
+                "zone": zone,
+                "start": start.isoformat(),
+                "end": stop.isoformat()
+            })
+            points.extend(
+                (_parse_datetime(point["datetime"]), point["carbonIntensity"])
+                for point in data.get("data", [])
+                if point.get("carbonIntensity") is not None
+            )
+            start = stop
+        return points
+
+PROVIDERS = {
+    StaticProvider.name: StaticProvider,
+    ElectricityMapsProvider.name: ElectricityMapsProvider
+}
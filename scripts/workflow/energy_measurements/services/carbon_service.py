@@ -1,15 +1,178 @@
+import os
+import time
 import logging
-import json
-import requests
+import threading
+from datetime import datetime, timedelta, timezone
+from services.cache_service import ResponseCache
+from services.carbon_providers import CARBON_API_TOKEN, PROVIDERS, ElectricityMapsProvider, StaticProvider
+from services.result_codec import read_result, write_result
 
 logger = logging.getLogger(__name__)
 
-def fetch_carbon_intensity():
-    url = "https://api.electricitymap.org/v3/carbon-intensity/latest"
-    headers = {"auth-token": "yz4qkEc4LG63XC5G8Bq3"}
-    response = requests.get(url, headers=headers)
-    response.raise_for_status()
-    return response.json()
+CARBON_PROVIDER = os.environ.get("WATTSCI_CARBON_PROVIDER", "electricitymaps")
+CARBON_ZONE = os.environ.get("WATTSCI_CARBON_ZONE", "")
+CARBON_FALLBACK_INTENSITY = float(os.environ["WATTSCI_CARBON_FALLBACK_INTENSITY"]) if os.environ.get("WATTSCI_CARBON_FALLBACK_INTENSITY") else None
+CARBON_TTL_SECONDS = float(os.environ.get("WATTSCI_CARBON_TTL_SECONDS", "900"))
+CARBON_MAX_STALE_SECONDS = float(os.environ.get("WATTSCI_CARBON_MAX_STALE_SECONDS", "21600"))
+CARBON_RETRY_SECONDS = float(os.environ.get("WATTSCI_CARBON_RETRY_SECONDS", "60"))
+CARBON_PREFETCH_INTERVAL = float(os.environ.get("WATTSCI_CARBON_PREFETCH_INTERVAL", "600"))
+CARBON_HISTORY = os.environ.get("WATTSCI_CARBON_HISTORY", "1") == "1"
+CARBON_HISTORY_CACHE_ENTRIES = int(os.environ.get("WATTSCI_CARBON_HISTORY_CACHE_ENTRIES", "4096"))
+
+_latest = ResponseCache(64, float("inf"))
+_history = ResponseCache(CARBON_HISTORY_CACHE_ENTRIES, float("inf"))
+_history_misses = ResponseCache(CARBON_HISTORY_CACHE_ENTRIES, CARBON_TTL_SECONDS)
+_provider = None
+_provider_created = False
+_refreshing = set()
+_lock = threading.Lock()
+_prefetch_started = False
+
+def create_provider(name=None):
+    name = name or CARBON_PROVIDER
+    if name == StaticProvider.name or (name == ElectricityMapsProvider.name and not CARBON_API_TOKEN):
+        if name != StaticProvider.name:
+            logger.warning("WATTSCI_CARBON_API_TOKEN is not set, using the static carbon intensity")
+        return StaticProvider(CARBON_FALLBACK_INTENSITY) if CARBON_FALLBACK_INTENSITY is not None else None
+    if name not in PROVIDERS:
+        raise ValueError(f"Unsupported carbon provider: {name}")
+    return PROVIDERS[name]()
+
+def get_provider():
+    global _provider, _provider_created
+    with _lock:
+        if not _provider_created:
+            _provider = create_provider()
+            _provider_created = True
+        return _provider
+
+def set_provider(provider):
+    global _provider, _provider_created
+    with _lock:
+        _provider = provider
+        _provider_created = True
+    _latest.clear()
+    _history.clear()
+    _history_misses.clear()
+
+def refresh_carbon_intensity(zone=None):
+    zone = zone or CARBON_ZONE
+    provider = get_provider()
+    if provider is None:
+        return None
+    now = time.monotonic()
+    try:
+        value = provider.latest(zone)
+    except Exception as e:
+        logger.warning(f"Carbon intensity lookup failed for zone {zone or 'default'}: {e}")
+        value = None
+    if value is None:
+        fetched_at, _, previous = _latest.get(zone) or (now, None, None)
+        _latest.put(zone, (fetched_at, now + CARBON_RETRY_SECONDS, previous))
+    else:
+        _latest.put(zone, (now, now + CARBON_TTL_SECONDS, value))
+    return value
+
+def _refresh_async(zone):
+    with _lock:
+        if zone in _refreshing:
+            return
+        _refreshing.add(zone)
+
+    def refresh():
+        try:
+            refresh_carbon_intensity(zone)
+        finally:
+            with _lock:
+                _refreshing.discard(zone)
+
+    threading.Thread(target=refresh, name="carbon-refresh", daemon=True).start()
+
+def get_carbon_intensity(zone=None):
+    zone = zone or CARBON_ZONE
+    cached = _latest.get(zone)
+    if cached is None:
+        value = refresh_carbon_intensity(zone)
+    else:
+        fetched_at, refresh_at, value = cached
+        now = time.monotonic()
+        if now > refresh_at:
+            _refresh_async(zone)
+        if now - fetched_at > CARBON_MAX_STALE_SECONDS:
+            value = None
+    return CARBON_FALLBACK_INTENSITY if value is None else value
+
+def measurement_window(timer_start, timer_end):
+    try:
+        start, end = int(timer_start) / 1_000_000, int(timer_end) / 1_000_000
+    except (TypeError, ValueError):
+        return None
+    if end < start:
+        return None
+    return datetime.fromtimestamp(start, timezone.utc), datetime.fromtimestamp(end, timezone.utc)
+
+def _hours(start, end):
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    while hour <= end:
+        yield hour
+        hour += timedelta(hours=1)
+
+def _load_history(zone, hours):
+    complete = datetime.now(timezone.utc) - timedelta(hours=1)
+    missing = sorted(
+        hour for hour in hours
+        if hour <= complete and _history.get((zone, hour)) is None and _history_misses.get((zone, hour)) is None
+    )
+    provider = get_provider()
+    if not missing or provider is None:
+        return
+    for hour in missing:
+        _history_misses.put((zone, hour), True)
+    try:
+        points = provider.history(zone, missing[0], missing[-1] + timedelta(hours=1))
+    except Exception as e:
+        logger.warning(f"Historical carbon intensity lookup failed for zone {zone or 'default'}: {e}")
+        return
+    for moment, value in points:
+        _history.put((zone, moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)), value)
+
+def _window_intensity(zone, start, end):
+    total = weight = 0.0
+    for hour in _hours(start, end):
+        value = _history.get((zone, hour))
+        if value is None:
+            continue
+        overlap = (min(end, hour + timedelta(hours=1)) - max(start, hour)).total_seconds()
+        if start == end:
+            overlap = 1.0
+        elif overlap <= 0:
+            continue
+        total += value * overlap
+        weight += overlap
+    return total / weight if weight else None
+
+def carbon_intensity_for_windows(windows, zone=None):
+    zone = zone or CARBON_ZONE
+    if CARBON_HISTORY:
+        _load_history(zone, {hour for window in windows.values() if window for hour in _hours(*window)})
+
+    intensities = {}
+    for key, window in windows.items():
+        value = _window_intensity(zone, *window) if window and CARBON_HISTORY else None
+        intensities[key] = get_carbon_intensity(zone) if value is None else round(value, 3)
+    return intensities
+
+def _prefetch_loop():
+    while True:
+        refresh_carbon_intensity()
+        time.sleep(CARBON_PREFETCH_INTERVAL)
+
+def start_carbon_prefetch():
+    global _prefetch_started
+    if _prefetch_started or CARBON_PREFETCH_INTERVAL <= 0:
+        return
+    _prefetch_started = True
+    threading.Thread(target=_prefetch_loop, name="carbon-prefetch", daemon=True).start()
 
 def add_carbon_footprint(data: dict, carbon_intensity: float):
     events = data.get("events", {})
@@ -23,16 +186,15 @@ def add_carbon_footprint(data: dict, carbon_intensity: float):
             except Exception as e:
                 logger.warning(f"Error calculando huella para {event_name}: {e}")
 
+def apply_carbon_intensity(data: dict, carbon_intensity: float):
+    data["carbon_intensity"] = carbon_intensity
+    add_carbon_footprint(data, carbon_intensity)
+
 def enrich_json_with_carbon_data(json_path: str, carbon_intensity: float):
     try:
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        data["carbon_intensity"] = carbon_intensity
-        add_carbon_footprint(data, carbon_intensity)
-
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        data = read_result(json_path)
+        apply_carbon_intensity(data, carbon_intensity)
+        write_result(json_path, data)
 
         logger.info("JSON enriquecido con huella de carbono")
     except Exception as e:
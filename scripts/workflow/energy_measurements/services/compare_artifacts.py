@@ -1,4 +1,15 @@
-def compare_artifacts(base_data, refactor_data):
+from services.significance import INSUFFICIENT_DATA, compare_distributions, measurement_series
+
+def compare_artifacts(base_data, refactor_data, **options):
+    significance = compare_distributions(
+        measurement_series(base_data), measurement_series(refactor_data), **options
+    )
+    carbon_significance = compare_distributions(
+        measurement_series(base_data, field="carbon_footprint_g"),
+        measurement_series(refactor_data, field="carbon_footprint_g"),
+        **options
+    )
+
     base_withBaseline = base_data.get("aggregate", {}).get("withBaseline", {})
     refactor_withBaseline = refactor_data.get("aggregate", {}).get("withBaseline", {})
 
@@ -27,18 +38,14 @@ def compare_artifacts(base_data, refactor_data):
 
         diff = refactor_consumption - base_consumption if (base_consumption is not None and refactor_consumption is not None) else None
         status = (
-            "improved" if diff is not None and diff < 0
-            else "regressed" if diff is not None and diff > 0
-            else "no_change" if diff == 0
-            else "missing_consumption"
+            "missing_consumption" if diff is None
+            else significance.get(metric, {}).get("status", INSUFFICIENT_DATA)
         )
 
         carbon_diff = refactor_carbon - base_carbon if (base_carbon is not None and refactor_carbon is not None) else None
         carbon_status = (
-            "improved" if carbon_diff is not None and carbon_diff < 0
-            else "regressed" if carbon_diff is not None and carbon_diff > 0
-            else "no_change" if carbon_diff == 0
-            else "missing_carbon_footprint"
+            "missing_carbon_footprint" if carbon_diff is None
+            else carbon_significance.get(metric, {}).get("status", INSUFFICIENT_DATA)
         )
 
         comparison[metric] = {
@@ -49,7 +56,9 @@ def compare_artifacts(base_data, refactor_data):
             "base_carbon_footprint": base_carbon,
             "refactor_carbon_footprint": refactor_carbon,
             "carbon_difference": carbon_diff,
-            "carbon_status": carbon_status
+            "carbon_status": carbon_status,
+            "significance": significance.get(metric),
+            "carbon_significance": carbon_significance.get(metric)
         }
 
     return {"withBaseline": comparison}
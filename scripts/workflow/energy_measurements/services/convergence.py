@@ -0,0 +1,109 @@
+import os
+import math
+from services.significance import MIN_RELATIVE_EFFECT, SIGNIFICANCE_ALPHA, t_critical
+
+CONVERGENCE_TOLERANCE = float(os.environ.get("WATTSCI_CONVERGENCE_TOLERANCE", "0.02"))
+CONVERGENCE_CONFIDENCE = float(os.environ.get("WATTSCI_CONVERGENCE_CONFIDENCE", "0.95"))
+CONVERGENCE_MIN_RUNS = int(os.environ.get("WATTSCI_CONVERGENCE_MIN_RUNS", "5"))
+CONVERGENCE_MAX_RUNS = int(os.environ.get("WATTSCI_CONVERGENCE_MAX_RUNS", "30"))
+
+DONE = "done"
+NEED_MORE_RUNS = "need_more_runs"
+
+def fold(moments, value):
+    count, mean, m2 = moments or (0, 0.0, 0.0)
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    m2 += delta * (value - mean)
+    return [count, mean, m2]
+
+def _interval(moments, confidence):
+    count, mean, m2 = moments
+    if count < 2:
+        return None
+    return t_critical(confidence, count - 1) * math.sqrt(m2 / (count - 1) / count)
+
+def _welch_interval(moments, base, confidence):
+    (n1, _, m2_1), (n2, _, m2_2) = moments, base
+    v1, v2 = m2_1 / (n1 - 1) / n1, m2_2 / (n2 - 1) / n2
+    if v1 + v2 == 0:
+        return 0.0
+    df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+    return t_critical(confidence, df) * math.sqrt(v1 + v2)
+
+def _compare(moments, base, confidence, min_effect):
+    difference = moments[1] - base[1]
+    half_width = _welch_interval(moments, base, confidence)
+    low, high = difference - half_width, difference + half_width
+    margin = min_effect * abs(base[1])
+    if low > 0:
+        decision = "regressed"
+    elif high < 0:
+        decision = "improved"
+    elif margin and -margin < low and high < margin:
+        decision = "equivalent"
+    else:
+        decision = None
+    return {"difference": difference, "ci": [low, high], "decision": decision}
+
+def check_convergence(
+    series,
+    base_series=None,
+    tolerance=None,
+    confidence=None,
+    min_runs=None,
+    max_runs=None,
+    alpha=None,
+    min_effect=None
+):
+    tolerance = CONVERGENCE_TOLERANCE if tolerance is None else tolerance
+    confidence = CONVERGENCE_CONFIDENCE if confidence is None else confidence
+    min_runs = max(CONVERGENCE_MIN_RUNS if min_runs is None else min_runs, 2)
+    max_runs = max(CONVERGENCE_MAX_RUNS if max_runs is None else max_runs, min_runs)
+    alpha = SIGNIFICANCE_ALPHA if alpha is None else alpha
+    min_effect = MIN_RELATIVE_EFFECT if min_effect is None else min_effect
+    sequential_confidence = 1 - alpha / (max_runs - min_runs + 1)
+
+    runs = min((moments[0] for moments in series.values()), default=0)
+    events = {}
+    for event, moments in series.items():
+        count, mean, _ = moments
+        half_width = _interval(moments, confidence)
+        relative = half_width / abs(mean) if half_width is not None and mean else None
+        entry = {
+            "runs": count,
+            "mean": mean,
+            "half_width": half_width,
+            "relative_half_width": relative,
+            "converged": count >= min_runs and relative is not None and relative <= tolerance
+        }
+        base = (base_series or {}).get(event)
+        if base is not None and count >= min_runs and base[0] >= 2:
+            entry["comparison"] = _compare(moments, base, sequential_confidence, min_effect)
+        events[event] = entry
+
+    decided = bool(events) and all(e.get("comparison", {}).get("decision") for e in events.values())
+    if not events:
+        status, reason = NEED_MORE_RUNS, "no_data"
+    elif runs < min_runs:
+        status, reason = NEED_MORE_RUNS, "min_runs"
+    elif all(e["converged"] for e in events.values()):
+        status, reason = DONE, "converged"
+    elif decided:
+        status, reason = DONE, "decided"
+    elif runs >= max_runs:
+        status, reason = DONE, "max_runs"
+    else:
+        status, reason = NEED_MORE_RUNS, "not_converged"
+
+    return {
+        "status": status,
+        "reason": reason,
+        "runs": runs,
+        "min_runs": min_runs,
+        "max_runs": max_runs,
+        "tolerance": tolerance,
+        "confidence": confidence,
+        "events": events
+    }
@@ -0,0 +1,46 @@
+from sqlalchemy import func
+from db.db import db_session
+from models.result import Result
+from services.convergence import check_convergence, fold
+from services.result_service import get_summary, prefetch_summaries, save_backfilled_summaries
+
+def _filtered(query, filters):
+    for field, value in filters.items():
+        query = query.filter(getattr(Result, field) == value)
+    return query
+
+def result_moments(filters, events=None, variant="main"):
+    results = _filtered(db_session.query(Result), filters).order_by(Result.id).all()
+    prefetch_summaries(results, (variant,))
+    series = {}
+    for result in results:
+        for event, data in ((get_summary(result, variant) or {}).get("events", {})).items():
+            if events and event not in events:
+                continue
+            if isinstance(data, dict) and isinstance(data.get("consumption"), (int, float)):
+                series[event] = fold(series.get(event), data["consumption"])
+    save_backfilled_summaries()
+    return series
+
+def latest_commit(filters, exclude=None):
+    query = _filtered(db_session.query(Result.commit_hash), filters)
+    if exclude:
+        query = query.filter(Result.commit_hash != exclude)
+    row = query.group_by(Result.commit_hash).order_by(func.max(Result.created_at).desc()).first()
+    return row.commit_hash if row else None
+
+def get_convergence(filters, events=None, base_branch=None, base_commit=None, **options):
+    series = result_moments(filters, events)
+    base_series = None
+    if base_branch or base_commit:
+        base_filters = {k: v for k, v in filters.items() if k not in ("branch", "commit_hash")}
+        if base_branch:
+            base_filters["branch"] = base_branch
+        base_filters["commit_hash"] = base_commit or latest_commit(base_filters, exclude=filters["commit_hash"])
+        if base_filters["commit_hash"]:
+            base_series = result_moments(base_filters, events) or None
+
+    convergence = check_convergence(series, base_series, **options)
+    if base_series is not None:
+        convergence["base"] = {"branch": base_branch, "commit_hash": base_filters["commit_hash"]}
+    return convergence
@@ -1,11 +1,17 @@
 import os
 import hashlib
-import gzip
-import shutil
+import zlib
+from services.manifest_service import ordered_chunk_names
 
 BASE_UPLOAD_DIR = os.path.join(os.path.expanduser("~"), "cimeasurement", "uploads")
 os.makedirs(BASE_UPLOAD_DIR, exist_ok=True)
 
+KEEP_INTERMEDIATE_FILES = os.environ.get("WATTSCI_KEEP_INTERMEDIATE", "0").lower() in ("1", "true", "yes")
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+COMPRESSED_NAME = "reconstructed.gz"
+DECOMPRESSED_NAME = "decompressed"
+
 IDENTIFYING_FIELDS = [
     'CI',
     'RUN_ID',
@@ -19,6 +25,12 @@ IDENTIFYING_FIELDS = [
     'LABEL'
 ]
 
+RUNNER_FIELDS = [
+    'RUNNER_CPU',
+    'RUNNER_KERNEL',
+    'RUNNER_HOST'
+]
+
 def get_combined_id(form):
     combined_str = "|".join(form.get(f, "") for f in IDENTIFYING_FIELDS)
     return hashlib.sha256(combined_str.encode()).hexdigest()
@@ -29,25 +41,91 @@ def get_session_dir_by_form(form):
     os.makedirs(session_dir, exist_ok=True)
     return session_dir, session_id
 
-def reconstruct_file_from_chunks(base_dir):
+def list_chunk_paths(base_dir):
     chunks_dir = os.path.join(base_dir, "chunks")
     os.makedirs(chunks_dir, exist_ok=True)
 
-    chunks = sorted(f for f in os.listdir(chunks_dir) if "chunk" in f)
+    chunks = ordered_chunk_names(base_dir)
     if not chunks:
         raise Exception("No chunks found in chunks/")
 
-    compressed_path = os.path.join(base_dir, "reconstructed.gz")
-    with open(compressed_path, "wb") as out_f:
-        for chunk_name in chunks:
-            chunk_path = os.path.join(chunks_dir, chunk_name)
-            with open(chunk_path, "rb") as c:
-                out_f.write(c.read())
+    paths = [os.path.join(chunks_dir, c) for c in chunks]
+    missing = [c for c, path in zip(chunks, paths) if not os.path.exists(path)]
+    if missing:
+        raise Exception(f"Missing chunks: {', '.join(missing)}")
+    return paths
+
+class GzipStreamDecoder:
+    def __init__(self):
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        self._in_member = False
+
+    def feed(self, data):
+        out = []
+        while data:
+            self._in_member = True
+            out.append(self._decompressor.decompress(data))
+            if not self._decompressor.eof:
+                break
+            # perf captures may be concatenated gzip members
+            data = self._decompressor.unused_data
+            self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            self._in_member = False
+        return b"".join(out)
 
-    decompressed_path = os.path.join(base_dir, "decompressed")
-    with gzip.open(compressed_path, "rb") as f_in, open(decompressed_path, "wb") as f_out:
-        shutil.copyfileobj(f_in, f_out)
+    def flush(self):
+        data = self._decompressor.flush()
+        if self._in_member and not self._decompressor.eof:
+            raise EOFError("Compressed file ended before the end-of-stream marker was reached")
+        return data
 
+def iter_chunk_blocks(chunk_paths, block_size=STREAM_BLOCK_SIZE):
+    for chunk_path in chunk_paths:
+        with open(chunk_path, "rb") as c:
+            while True:
+                block = c.read(block_size)
+                if not block:
+                    break
+                yield block
+
+def iter_decompressed_chunks(base_dir, keep_intermediate=None):
+    if keep_intermediate is None:
+        keep_intermediate = KEEP_INTERMEDIATE_FILES
+
+    chunk_paths = list_chunk_paths(base_dir)
+    decoder = GzipStreamDecoder()
+
+    compressed_f = decompressed_f = None
+    if keep_intermediate:
+        compressed_f = open(os.path.join(base_dir, COMPRESSED_NAME), "wb")
+        decompressed_f = open(os.path.join(base_dir, DECOMPRESSED_NAME), "wb")
+
+    try:
+        for block in iter_chunk_blocks(chunk_paths):
+            if compressed_f:
+                compressed_f.write(block)
+            data = decoder.feed(block)
+            if data:
+                if decompressed_f:
+                    decompressed_f.write(data)
+                yield data
+
+        data = decoder.flush()
+        if data:
+            if decompressed_f:
+                decompressed_f.write(data)
+            yield data
+    finally:
+        if compressed_f:
+            compressed_f.close()
+        if decompressed_f:
+            decompressed_f.close()
+
+def reconstruct_file_from_chunks(base_dir):
+    decompressed_path = os.path.join(base_dir, DECOMPRESSED_NAME)
+    with open(decompressed_path, "wb") as f_out:
+        for data in iter_decompressed_chunks(base_dir, keep_intermediate=False):
+            f_out.write(data)
     return decompressed_path
 
 def cleanup_chunks_files(session_dir):
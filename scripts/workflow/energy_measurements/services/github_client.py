@@ -0,0 +1,151 @@
+import os
+import time
+import random
+import hashlib
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from services.cache_service import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+GITHUB_API_URL = os.environ.get("WATTSCI_GITHUB_API_URL", "https://api.github.com")
+GITHUB_TIMEOUT = float(os.environ.get("WATTSCI_GITHUB_TIMEOUT", "10"))
+GITHUB_MAX_RETRIES = int(os.environ.get("WATTSCI_GITHUB_MAX_RETRIES", "3"))
+GITHUB_BACKOFF_SECONDS = float(os.environ.get("WATTSCI_GITHUB_BACKOFF_SECONDS", "1"))
+GITHUB_MAX_BACKOFF_SECONDS = float(os.environ.get("WATTSCI_GITHUB_MAX_BACKOFF_SECONDS", "60"))
+GITHUB_POOL_SIZE = int(os.environ.get("WATTSCI_GITHUB_POOL_SIZE", "10"))
+GITHUB_ETAG_CACHE_ENTRIES = int(os.environ.get("WATTSCI_GITHUB_ETAG_CACHE_ENTRIES", "512"))
+GITHUB_PR_CACHE_TTL_SECONDS = float(os.environ.get("WATTSCI_GITHUB_PR_CACHE_TTL_SECONDS", "3600"))
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "PUT", "DELETE")
+API_VERSION = "2022-11-28"
+
+class GitHubClient:
+    def __init__(
+        self,
+        base_url=None,
+        timeout=None,
+        max_retries=None,
+        backoff=None,
+        max_backoff=None,
+        pool_size=None
+    ):
+        self.base_url = (base_url or GITHUB_API_URL).rstrip("/")
+        self.timeout = GITHUB_TIMEOUT if timeout is None else timeout
+        self.max_retries = GITHUB_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = GITHUB_BACKOFF_SECONDS if backoff is None else backoff
+        self.max_backoff = GITHUB_MAX_BACKOFF_SECONDS if max_backoff is None else max_backoff
+
+        pool_size = pool_size or GITHUB_POOL_SIZE
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+        self.session.mount("http://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+
+        self.etags = ResponseCache(GITHUB_ETAG_CACHE_ENTRIES, float("inf"))
+        self.pull_requests = ResponseCache(GITHUB_ETAG_CACHE_ENTRIES, GITHUB_PR_CACHE_TTL_SECONDS)
+
+    def _headers(self, token):
+        return {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": API_VERSION
+        }
+
+    def _rate_limited(self, response):
+        if response.status_code not in (403, 429):
+            return False
+        return (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+            or "rate limit" in response.text.lower()
+        )
+
+    def _retry_delay(self, response, attempt):
+        if response is not None:
+            if response.headers.get("Retry-After", "").isdigit():
+                return min(float(response.headers["Retry-After"]), self.max_backoff)
+            reset = response.headers.get("X-RateLimit-Reset", "")
+            if response.headers.get("X-RateLimit-Remaining") == "0" and reset.isdigit():
+                return min(max(float(reset) - time.time(), 0) + 1, self.max_backoff)
+        return min(self.backoff * 2 ** attempt * (1 + random.random()), self.max_backoff)
+
+    def request(self, method, path, token, headers=None, **kwargs):
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        headers = {**self._headers(token), **(headers or {})}
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries or method not in IDEMPOTENT_METHODS:
+                    raise
+                logger.warning(f"GitHub {method} {url} failed ({e}), retrying")
+            else:
+                retryable = self._rate_limited(response) or (
+                    response.status_code >= 500 and method in IDEMPOTENT_METHODS
+                )
+                if not retryable or attempt == self.max_retries:
+                    return response
+                logger.warning(f"GitHub {method} {url} returned {response.status_code}, retrying")
+            time.sleep(self._retry_delay(response, attempt))
+
+    def get_json(self, path, token, params=None):
+        url = f"{self.base_url}{path}"
+        key = (hashlib.sha256(token.encode("utf-8")).hexdigest(), url, tuple(sorted((params or {}).items())))
+        cached = self.etags.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+
+        response = self.request("GET", url, token, headers=headers, params=params)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        data = response.json()
+        if response.headers.get("ETag"):
+            self.etags.put(key, (response.headers["ETag"], data))
+        return data
+
+    def find_pull_request(self, repo, head, base, token):
+        pulls = self.get_json(f"/repos/{repo}/pulls", token, params={"head": head, "base": base, "state": "open"})
+        return pulls[0]["number"] if pulls else None
+
+    def pull_request_open(self, repo, number, token):
+        try:
+            return self.get_json(f"/repos/{repo}/pulls/{number}", token).get("state") == "open"
+        except requests.HTTPError as e:
+            logger.warning(f"Could not check pull request #{number} in {repo}: {e}")
+            return False
+
+    def create_pull_request(self, repo, base, branch, token, head_owner=None, title=None, body=None):
+        owner = repo.split("/")[0]
+        head_owner = head_owner or owner
+        key = (repo, f"{head_owner}:{branch}", base)
+        number = self.pull_requests.get(key)
+        if number is not None:
+            if self.pull_request_open(repo, number, token):
+                return number
+            self.pull_requests.put(key, None)
+
+        number = self.find_pull_request(repo, key[1], base, token)
+        if number is None:
+            response = self.request("POST", f"/repos/{repo}/pulls", token, json={
+                "title": title,
+                "head": branch if head_owner == owner else key[1],
+                "base": base,
+                "body": body
+            })
+            if response.status_code == 201:
+                number = response.json()["number"]
+                logger.info(f"Created pull request #{number} for {repo} {key[1]} -> {base}")
+            elif response.status_code == 422:
+                number = self.find_pull_request(repo, key[1], base, token)
+            if number is None:
+                logger.error(f"Failed to create PR: {response.status_code} - {response.text}")
+                return None
+        self.pull_requests.put(key, number)
+        return number
+
+    def post_comment(self, repo, number, token, body):
+        return self.request("POST", f"/repos/{repo}/issues/{number}/comments", token, json={"body": body})
+
+github_client = GitHubClient()
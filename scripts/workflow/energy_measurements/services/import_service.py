@@ -0,0 +1,54 @@
+import os
+import logging
+from sqlalchemy import insert
+from db.db import db_session
+from models.result import Result
+from services.cache_service import bump_data_version
+from services.result_service import prefetch_summaries
+from services.rollup_service import apply_rollup_bulk, rollup_rows
+
+logger = logging.getLogger(__name__)
+
+BULK_BATCH_SIZE = int(os.environ.get("WATTSCI_BULK_BATCH_SIZE", "1000"))
+RESULT_COLUMNS = tuple(column.name for column in Result.__table__.columns if column.name != "id")
+
+def _insert_batch(results):
+    prefetch_summaries(results)
+    loaded = []
+    for result in results:
+        if result.summary_main is None:
+            logger.warning(f"Skipping result for session {result.session_id}: main summary unavailable ({result.json_main})")
+            continue
+        loaded.append(result)
+    if not loaded:
+        return 0
+
+    try:
+        db_session.execute(
+            insert(Result.__table__),
+            [{column: getattr(result, column) for column in RESULT_COLUMNS} for result in loaded]
+        )
+        apply_rollup_bulk(db_session, [
+            row for result in loaded for row in rollup_rows(result, result.summary_main, result.summary_baseline)
+        ])
+        for repository in {result.repository for result in loaded}:
+            bump_data_version(repository)
+        db_session.commit()
+    except Exception:
+        db_session.rollback()
+        raise
+    return len(loaded)
+
+def bulk_insert_results(records, batch_size=None):
+    batch_size = batch_size or BULK_BATCH_SIZE
+    inserted = 0
+    batch = []
+    for record in records:
+        batch.append(Result(**record))
+        if len(batch) >= batch_size:
+            inserted += _insert_batch(batch)
+            batch = []
+    if batch:
+        inserted += _insert_batch(batch)
+    logger.info(f"Bulk inserted {inserted} results")
+    return inserted
@@ -0,0 +1,102 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from services.file_service import GzipStreamDecoder, KEEP_INTERMEDIATE_FILES, iter_chunk_blocks
+from services.manifest_service import ordered_chunk_names
+
+logger = logging.getLogger(__name__)
+
+MAX_ACTIVE_INGESTS = int(os.environ.get("WATTSCI_MAX_ACTIVE_INGESTS", "64"))
+INGEST_WORKERS = int(os.environ.get("WATTSCI_INGEST_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix="ingest")
+_ingests = OrderedDict()
+_registry_lock = threading.Lock()
+
+class SessionIngest:
+    def __init__(self, type_dir, accumulator):
+        self.type_dir = type_dir
+        self.accumulator = accumulator
+        self.decoder = GzipStreamDecoder()
+        self.folded = []
+        self.failed = False
+        self.lock = threading.Lock()
+
+    def advance(self):
+        with self.lock:
+            if self.failed:
+                return
+            try:
+                self._fold_available()
+            except Exception as e:
+                self.failed = True
+                logger.warning(f"Incremental ingest disabled for {self.type_dir}: {e}")
+
+    def _fold_available(self):
+        names = ordered_chunk_names(self.type_dir)
+        if names[:len(self.folded)] != self.folded:
+            raise ValueError("chunk order changed after folding")
+
+        chunks_dir = os.path.join(self.type_dir, "chunks")
+        for name in names[len(self.folded):]:
+            path = os.path.join(chunks_dir, name)
+            if not os.path.exists(path):
+                break
+            for block in iter_chunk_blocks([path]):
+                self.accumulator.feed(self.decoder.feed(block))
+            self.folded.append(name)
+
+    def finish(self):
+        with self.lock:
+            if self.failed:
+                self.accumulator.discard()
+                return None
+            try:
+                self._fold_available()
+                if self.folded != ordered_chunk_names(self.type_dir):
+                    self.accumulator.discard()
+                    return None
+                self.accumulator.feed(self.decoder.flush())
+            except Exception as e:
+                logger.warning(f"Incremental ingest unusable for {self.type_dir}: {e}")
+                self.accumulator.discard()
+                return None
+            return self.accumulator
+
+    def abandon(self):
+        with self.lock:
+            self.failed = True
+            self.accumulator.discard()
+
+def chunk_received(type_dir, accumulator_class, chunk_name, replaced=False):
+    if accumulator_class is None or KEEP_INTERMEDIATE_FILES:
+        return
+
+    with _registry_lock:
+        ingest = _ingests.get(type_dir)
+        if ingest is not None and replaced and chunk_name in ingest.folded:
+            ingest.failed = True
+            return
+        if ingest is None:
+            ingest = _ingests[type_dir] = SessionIngest(type_dir, accumulator_class(samples_dir=type_dir))
+            while len(_ingests) > MAX_ACTIVE_INGESTS:
+                evicted_dir, evicted = _ingests.popitem(last=False)
+                _executor.submit(evicted.abandon)
+                logger.info(f"Evicted incremental ingest for {evicted_dir}")
+
+    _executor.submit(ingest.advance)
+
+def finish_ingest(type_dir):
+    with _registry_lock:
+        ingest = _ingests.pop(type_dir, None)
+    if ingest is None:
+        return None
+    return ingest.finish()
+
+def discard_ingest(type_dir):
+    with _registry_lock:
+        ingest = _ingests.pop(type_dir, None)
+    if ingest is not None:
+        _executor.submit(ingest.abandon)
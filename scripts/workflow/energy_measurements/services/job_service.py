@@ -0,0 +1,264 @@
+import os
+import logging
+import threading
+import multiprocessing
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from models.job import Job
+from models.result import Result
+from db.db import db_session
+from methods.runner import run_method
+from services.file_service import BASE_UPLOAD_DIR
+from services.ingest_service import finish_ingest
+from services.result_service import load_summary
+from services.baseline_service import record_runner_baseline, runner_baseline_summary, runner_fingerprint
+from services.cache_service import bump_data_version
+from services.carbon_service import carbon_intensity_for_windows, measurement_window, start_carbon_prefetch
+from services.rollup_service import record_result
+from services.manifest_service import read_timers
+from services.storage_service import session_lock
+
+logger = logging.getLogger(__name__)
+
+JOB_PROCESSES = int(os.environ.get("WATTSCI_JOB_PROCESSES", str(os.cpu_count() or 2)))
+JOB_DISPATCHERS = int(os.environ.get("WATTSCI_JOB_DISPATCHERS", "2"))
+JOB_POLL_INTERVAL = float(os.environ.get("WATTSCI_JOB_POLL_INTERVAL", "2"))
+JOB_LEASE_SECONDS = float(os.environ.get("WATTSCI_JOB_LEASE_SECONDS", "60"))
+
+RECONSTRUCT = "reconstruct"
+CHUNK_TYPES = ("baseline", "main")
+
+_pool = None
+_pool_lock = threading.Lock()
+_wakeup = threading.Event()
+_started = False
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=JOB_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def enqueue_reconstruction(session_id, fields):
+    job = Job(kind=RECONSTRUCT, session_id=session_id, params=fields)
+    db_session.add(job)
+    db_session.commit()
+    _wakeup.set()
+    logger.info(f"Queued reconstruction job {job.id} for session {session_id}")
+    return job
+
+def get_job(job_id):
+    return db_session.get(Job, job_id)
+
+def _claim_next_job():
+    candidate = (
+        db_session.query(Job.id)
+        .filter(Job.status == Job.QUEUED)
+        .order_by(Job.created_at)
+        .first()
+    )
+    if candidate is None:
+        return None
+
+    claimed = (
+        db_session.query(Job)
+        .filter(Job.id == candidate.id, Job.status == Job.QUEUED)
+        .update(
+            {"status": Job.RUNNING, "attempts": Job.attempts + 1, "updated_at": datetime.utcnow()},
+            synchronize_session=False
+        )
+    )
+    db_session.commit()
+    if claimed != 1:
+        return None
+    return db_session.get(Job, candidate.id)
+
+def _set_progress(job, progress, stage):
+    job.progress = progress
+    job.stage = stage
+    db_session.commit()
+
+def _run_reconstruction(job):
+    session_dir = os.path.join(BASE_UPLOAD_DIR, job.session_id)
+    with session_lock(session_dir):
+        return _reconstruct_session(job, session_dir)
+
+def _reconstruct_session(job, session_dir):
+    params = job.params
+
+    type_dirs = {
+        chunk_type: os.path.join(session_dir, chunk_type)
+        for chunk_type in CHUNK_TYPES
+        if os.path.exists(os.path.join(session_dir, chunk_type))
+    }
+    carbon_intensities = carbon_intensity_for_windows(
+        {chunk_type: measurement_window(*read_timers(type_dir)) for chunk_type, type_dir in type_dirs.items()}
+    )
+
+    pool = _get_pool()
+    futures = {}
+    for chunk_type, type_dir in type_dirs.items():
+        future = pool.submit(
+            run_method,
+            params.get("APPROACH"),
+            params.get("METHOD"),
+            type_dir,
+            finish_ingest(type_dir),
+            carbon_intensities[chunk_type]
+        )
+        futures[future] = chunk_type
+    _set_progress(job, 5, "processing " + ", ".join(futures.values()))
+
+    json_paths = {}
+    errors = []
+    for future in as_completed(futures):
+        chunk_type = futures[future]
+        try:
+            json_paths[chunk_type] = future.result()
+        except BrokenProcessPool as e:
+            _discard_pool(pool)
+            logger.error(f"Job {job.id}: worker process died while processing {chunk_type}: {e}")
+            errors.append(f"{chunk_type}: {e}")
+        except Exception as e:
+            logger.error(f"Job {job.id}: {chunk_type} processing failed: {e}", exc_info=True)
+            errors.append(f"{chunk_type}: {e}")
+        _set_progress(job, 5 + int(85 * len(json_paths) / len(futures)), f"{chunk_type} processed")
+
+    if errors:
+        raise RuntimeError("; ".join(errors))
+
+    runner = runner_fingerprint(params.get("RUNNER_CPU"), params.get("RUNNER_KERNEL"), params.get("RUNNER_HOST"))
+    summary_baseline = load_summary(json_paths["baseline"]) if "baseline" in json_paths else None
+    if runner and summary_baseline is not None:
+        record_runner_baseline(runner, params.get("METHOD"), summary_baseline)
+    elif runner:
+        summary_baseline = runner_baseline_summary(runner, params.get("METHOD"))
+
+    result = Result(
+        session_id=job.session_id,
+        ci=params.get("CI"),
+        run_id=params.get("RUN_ID"),
+        branch=params.get("REF_NAME"),
+        repository=params.get("REPOSITORY"),
+        workflow_id=params.get("WORKFLOW_ID"),
+        workflow_name=params.get("WORKFLOW_NAME"),
+        commit_hash=params.get("COMMIT_HASH"),
+        approach=params.get("APPROACH"),
+        method=params.get("METHOD"),
+        label=params.get("LABEL"),
+        json_main=json_paths.get("main"),
+        json_baseline=json_paths.get("baseline"),
+        summary_main=load_summary(json_paths["main"]) if "main" in json_paths else None,
+        summary_baseline=summary_baseline,
+        runner=runner
+    )
+    db_session.add(result)
+    db_session.flush()
+    record_result(result)
+    bump_data_version(result.repository)
+
+    return {
+        "result_id": result.id,
+        "json_main": json_paths.get("main"),
+        "json_baseline": json_paths.get("baseline")
+    }
+
+JOB_HANDLERS = {
+    RECONSTRUCT: _run_reconstruction
+}
+
+def _heartbeat(job_id, stop):
+    try:
+        while not stop.wait(JOB_LEASE_SECONDS / 3):
+            try:
+                db_session.query(Job).filter(Job.id == job_id, Job.status == Job.RUNNING).update(
+                    {"updated_at": datetime.utcnow()}, synchronize_session=False
+                )
+                db_session.commit()
+            except Exception as e:
+                db_session.rollback()
+                logger.warning(f"Failed to renew lease for job {job_id}: {e}")
+    finally:
+        db_session.remove()
+
+def _process_job(job):
+    logger.info(f"Running job {job.id} ({job.kind}) for session {job.session_id}")
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(job.id, stop), name=f"job-heartbeat-{job.id}", daemon=True).start()
+    try:
+        result = JOB_HANDLERS[job.kind](job)
+        job.result = result
+        job.status = Job.SUCCEEDED
+        job.progress = 100
+        job.stage = "done"
+        db_session.commit()
+        logger.info(f"Job {job.id} succeeded")
+    except Exception as e:
+        db_session.rollback()
+        job = db_session.get(Job, job.id)
+        job.status = Job.FAILED
+        job.error = str(e)
+        job.stage = "failed"
+        db_session.commit()
+        logger.error(f"Job {job.id} failed: {e}", exc_info=True)
+    finally:
+        stop.set()
+
+def _dispatch_loop():
+    while True:
+        try:
+            _requeue_expired_jobs()
+            job = _claim_next_job()
+            if job is not None:
+                _process_job(job)
+                continue
+        except Exception as e:
+            db_session.rollback()
+            logger.error(f"Job dispatcher error: {e}", exc_info=True)
+        finally:
+            db_session.remove()
+        _wakeup.wait(JOB_POLL_INTERVAL)
+        _wakeup.clear()
+
+def _requeue_expired_jobs():
+    expired_before = datetime.utcnow() - timedelta(seconds=JOB_LEASE_SECONDS)
+    requeued = (
+        db_session.query(Job)
+        .filter(Job.status == Job.RUNNING, Job.updated_at < expired_before)
+        .update({"status": Job.QUEUED, "stage": "requeued after lease expired"}, synchronize_session=False)
+    )
+    db_session.commit()
+    if requeued:
+        logger.warning(f"Requeued {requeued} jobs whose worker stopped renewing the lease")
+
+def start_job_workers():
+    global _started
+    if _started or multiprocessing.current_process().name != "MainProcess":
+        return
+    _started = True
+
+    try:
+        _requeue_expired_jobs()
+    except (OperationalError, ProgrammingError) as e:
+        db_session.rollback()
+        logger.error(f"Could not requeue expired jobs, the jobs table is not available (run db/db_init.py): {e}")
+    finally:
+        db_session.remove()
+
+    start_carbon_prefetch()
+    for i in range(JOB_DISPATCHERS):
+        threading.Thread(target=_dispatch_loop, name=f"job-dispatcher-{i}", daemon=True).start()
+    logger.info(f"Started {JOB_DISPATCHERS} job dispatchers with {JOB_PROCESSES} worker processes")
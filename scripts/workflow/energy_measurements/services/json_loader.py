@@ -0,0 +1,62 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from services.result_codec import decode
+
+JSON_LOAD_WORKERS = int(os.environ.get("WATTSCI_JSON_LOAD_WORKERS", "8"))
+JSON_CACHE_ENTRIES = int(os.environ.get("WATTSCI_JSON_CACHE_ENTRIES", "1024"))
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+
+def _cache_key(path):
+    stat = os.stat(path)
+    return path, stat.st_mtime_ns, stat.st_size
+
+def _cache_get(key):
+    with _cache_lock:
+        content = _cache.get(key)
+        if content is not None:
+            _cache.move_to_end(key)
+        return content
+
+def _cache_put(key, content):
+    if JSON_CACHE_ENTRIES <= 0:
+        return
+    with _cache_lock:
+        _cache[key] = content
+        _cache.move_to_end(key)
+        while len(_cache) > JSON_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+def load_json(path):
+    key = _cache_key(path)
+    content = _cache_get(key)
+    if content is None:
+        with open(path, "rb") as f:
+            content = decode(f.read())
+        _cache_put(key, content)
+    return content
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=JSON_LOAD_WORKERS, thread_name_prefix="json_loader")
+        return _executor
+
+def _load_or_error(path):
+    try:
+        return load_json(path)
+    except Exception as e:
+        return e
+
+def load_many(paths):
+    paths = list(dict.fromkeys(paths))
+    if len(paths) <= 1:
+        return {path: _load_or_error(path) for path in paths}
+    futures = {path: _get_executor().submit(_load_or_error, path) for path in paths}
+    return {path: future.result() for path, future in futures.items()}
@@ -0,0 +1,161 @@
+import os
+import json
+import uuid
+import hashlib
+from services.storage_service import write_atomic
+
+MANIFEST_NAME = "manifest.json"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+class ChunkIntegrityError(ValueError):
+    pass
+
+def is_chunk_file(name):
+    return "chunk" in name and not name.startswith(".") and not name.endswith(".part")
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(type_dir):
+    path = os.path.join(type_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_manifest(type_dir, chunks, chunk_count=None):
+    if not isinstance(chunks, list):
+        raise ValueError("chunks must be a list")
+    if not all(isinstance(c, dict) for c in chunks):
+        raise ValueError("each chunk entry must be an object")
+    if chunk_count is None:
+        chunk_count = len(chunks)
+    if chunk_count != len(chunks):
+        raise ValueError(f"chunk_count {chunk_count} does not match {len(chunks)} listed chunks")
+
+    entries = []
+    names = set()
+    for c in chunks:
+        name = c.get("name")
+        if not name or not is_chunk_file(name) or os.path.basename(name) != name:
+            raise ValueError(f"Invalid chunk name: {name!r}")
+        if name in names:
+            raise ValueError(f"Duplicate chunk name: {name}")
+        names.add(name)
+        entries.append({
+            "name": name,
+            "size": int(c["size"]) if c.get("size") is not None else None,
+            "sha256": c["sha256"].lower() if c.get("sha256") else None
+        })
+
+    manifest = {"chunk_count": chunk_count, "chunks": entries}
+    os.makedirs(type_dir, exist_ok=True)
+    write_atomic(os.path.join(type_dir, MANIFEST_NAME), json.dumps(manifest))
+    return manifest
+
+def manifest_entry(manifest, chunk_name):
+    if not manifest:
+        return None
+    for entry in manifest["chunks"]:
+        if entry["name"] == chunk_name:
+            return entry
+    return None
+
+def ordered_chunk_names(type_dir):
+    manifest = load_manifest(type_dir)
+    if manifest:
+        return [entry["name"] for entry in manifest["chunks"]]
+
+    chunks_dir = os.path.join(type_dir, "chunks")
+    if not os.path.isdir(chunks_dir):
+        return []
+    return sorted(f for f in os.listdir(chunks_dir) if is_chunk_file(f))
+
+def chunk_status(type_dir):
+    manifest = load_manifest(type_dir)
+    chunks_dir = os.path.join(type_dir, "chunks")
+    present = set()
+    if os.path.isdir(chunks_dir):
+        present = {f for f in os.listdir(chunks_dir) if is_chunk_file(f)}
+
+    if manifest is None:
+        return {
+            "manifest": False,
+            "received": sorted(present),
+            "missing": []
+        }
+
+    expected = [entry["name"] for entry in manifest["chunks"]]
+    return {
+        "manifest": True,
+        "chunk_count": manifest["chunk_count"],
+        "received": [name for name in expected if name in present],
+        "missing": [name for name in expected if name not in present]
+    }
+
+def store_chunk(type_dir, chunk_name, stream, sha256=None):
+    if not is_chunk_file(chunk_name) or os.path.basename(chunk_name) != chunk_name:
+        raise ChunkIntegrityError(f"Invalid chunk name: {chunk_name!r}")
+
+    entry = manifest_entry(load_manifest(type_dir), chunk_name)
+    expected_sha = (sha256 or (entry or {}).get("sha256") or "").lower() or None
+    if entry and sha256 and entry.get("sha256") and entry["sha256"] != sha256.lower():
+        raise ChunkIntegrityError(f"Checksum for {chunk_name} does not match the manifest")
+
+    chunks_dir = os.path.join(type_dir, "chunks")
+    os.makedirs(chunks_dir, exist_ok=True)
+    chunk_path = os.path.join(chunks_dir, chunk_name)
+    tmp_path = os.path.join(chunks_dir, f".upload-{uuid.uuid4().hex}.part")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as f:
+            for block in iter(lambda: stream.read(COPY_BUFFER_SIZE), b""):
+                digest.update(block)
+                size += len(block)
+                f.write(block)
+
+        actual_sha = digest.hexdigest()
+        if expected_sha and actual_sha != expected_sha:
+            raise ChunkIntegrityError(f"Checksum mismatch for {chunk_name}")
+        if entry and entry.get("size") is not None and entry["size"] != size:
+            raise ChunkIntegrityError(f"Size mismatch for {chunk_name}: expected {entry['size']}, got {size}")
+
+        existed = os.path.exists(chunk_path)
+        if existed and file_sha256(chunk_path) == actual_sha:
+            os.remove(tmp_path)
+            return "duplicate", actual_sha, size
+
+        os.replace(tmp_path, chunk_path)
+        return "replaced" if existed else "stored", actual_sha, size
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def write_timers(type_dir, timer_start, timer_end, overwrite=False):
+    data_dir = os.path.join(type_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    written = False
+    for name, value in (("timer_start.txt", timer_start), ("timer_end.txt", timer_end)):
+        path = os.path.join(data_dir, name)
+        if value is None or (os.path.exists(path) and not overwrite):
+            continue
+        write_atomic(path, str(value))
+        written = True
+    return data_dir, written
+
+def read_timers(type_dir):
+    values = []
+    for name in ("timer_start.txt", "timer_end.txt"):
+        path = os.path.join(type_dir, "data", name)
+        if os.path.isfile(path):
+            with open(path, "r") as f:
+                values.append(f.read().strip())
+        else:
+            values.append(None)
+    return tuple(values)
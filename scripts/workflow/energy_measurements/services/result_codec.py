@@ -0,0 +1,93 @@
+import os
+import gzip
+import json
+from services.storage_service import write_atomic
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = zstandard = None
+
+RESULT_CODEC = os.environ.get("WATTSCI_RESULT_CODEC", "json")
+ZSTD_LEVEL = int(os.environ.get("WATTSCI_RESULT_ZSTD_LEVEL", "10"))
+
+def decode_json(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+class JsonCodec:
+    name = "json"
+    extension = ".json"
+    magic = None
+
+    def encode(self, data):
+        return json.dumps(data, indent=2).encode("utf-8")
+
+    def decode(self, raw):
+        return decode_json(raw)
+
+class GzipJsonCodec:
+    name = "json-gzip"
+    extension = ".json.gz"
+    magic = b"\x1f\x8b"
+
+    def encode(self, data):
+        return gzip.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), mtime=0)
+
+    def decode(self, raw):
+        return decode_json(gzip.decompress(raw))
+
+class MsgpackZstdCodec:
+    name = "msgpack-zstd"
+    extension = ".msgpack.zst"
+    magic = b"\x28\xb5\x2f\xfd"
+
+    def encode(self, data):
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(msgpack.packb(data, use_bin_type=True))
+
+    def decode(self, raw):
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(raw), raw=False, strict_map_key=False)
+
+CODECS = {codec.name: codec for codec in (JsonCodec(), GzipJsonCodec())}
+if msgpack is not None:
+    CODECS[MsgpackZstdCodec.name] = MsgpackZstdCodec()
+
+def get_codec(name=None):
+    name = name or RESULT_CODEC
+    if name not in CODECS:
+        raise ValueError(f"Unsupported result codec: {name} (available: {', '.join(CODECS)})")
+    return CODECS[name]
+
+def detect_codec(raw):
+    for codec in CODECS.values():
+        if codec.magic and raw.startswith(codec.magic):
+            return codec
+    if raw.startswith(MsgpackZstdCodec.magic):
+        raise ValueError("Result is msgpack-zstd encoded but msgpack/zstandard are not installed")
+    return CODECS[JsonCodec.name]
+
+def decode(raw):
+    return detect_codec(raw).decode(raw)
+
+def codec_for_path(path):
+    for codec in sorted(CODECS.values(), key=lambda c: len(c.extension), reverse=True):
+        if path.endswith(codec.extension):
+            return codec
+    return get_codec()
+
+def result_path(directory, base_name, codec=None):
+    return os.path.join(directory, base_name + get_codec(codec).extension)
+
+def read_result(path):
+    with open(path, "rb") as f:
+        return decode(f.read())
+
+def write_result(path, data):
+    write_atomic(path, codec_for_path(path).encode(data))
@@ -1,6 +1,11 @@
-import json
+import logging
+from collections import defaultdict
+from sqlalchemy import func, tuple_
 from models.result import Result
 from db.db import db_session
+from services.json_loader import load_json, load_many
+
+logger = logging.getLogger(__name__)
 
 
 def save_result(session_id, json_path, upload_fields):
@@ -18,6 +23,105 @@ def save_result(session_id, json_path, upload_fields):
     db_session.commit()
     return result
 
+def _strip_sketches(content):
+    summary = dict(content)
+    if "events" in content:
+        summary["events"] = {
+            name: {k: v for k, v in data.items() if k != "sketch"} if isinstance(data, dict) else data
+            for name, data in content["events"].items()
+        }
+    return summary
+
+def load_summary(json_path):
+    return _strip_sketches(load_json(json_path))
+
+def prefetch_summaries(results, variants=("main", "baseline")):
+    missing = [
+        (result, variant) for result in results for variant in variants
+        if getattr(result, f"summary_{variant}") is None and getattr(result, f"json_{variant}")
+    ]
+    if not missing:
+        return
+    loaded = load_many(getattr(result, f"json_{variant}") for result, variant in missing)
+    for result, variant in missing:
+        content = loaded[getattr(result, f"json_{variant}")]
+        if not isinstance(content, Exception):
+            setattr(result, f"summary_{variant}", _strip_sketches(content))
+
+def get_summary(result, variant="main"):
+    summary = getattr(result, f"summary_{variant}")
+    if summary is None:
+        json_path = getattr(result, f"json_{variant}")
+        if not json_path:
+            return None
+        summary = load_summary(json_path)
+        setattr(result, f"summary_{variant}", summary)
+    return summary
+
+def save_backfilled_summaries():
+    if not db_session.dirty:
+        return
+    try:
+        db_session.commit()
+    except Exception as e:
+        db_session.rollback()
+        logger.warning(f"Could not store backfilled summaries: {e}")
+
+def subtract_events(main_events, baseline_events):
+    subtracted = {}
+    for event_name, main_data in main_events.items():
+        baseline_data = baseline_events.get(event_name)
+        if baseline_data:
+            subtracted[event_name] = {}
+            for k, v in main_data.items():
+                if isinstance(v, (int, float)):
+                    subtracted[event_name][k] = v - baseline_data.get(k, 0)
+                else:
+                    subtracted[event_name][k] = v
+        else:
+            subtracted[event_name] = main_data.copy()
+            subtracted[event_name]["no_baseline"] = True
+    return subtracted
+
+def _consumption_by_event(events):
+    return {
+        metric: data.get("consumption")
+        for metric, data in events.items()
+        if isinstance(data, dict) and "consumption" in data
+    }
+
+def _consumption_records(results):
+    output = []
+
+    for result in results:
+        try:
+            main = get_summary(result, "main") or {}
+            baseline = get_summary(result, "baseline")
+        except Exception as e:
+            logger.warning(f"Skipping result {result.id}: summary unavailable ({e})")
+            continue
+
+        with_baseline = _consumption_by_event(main.get("events", {}))
+        without_baseline = {}
+        if baseline:
+            baseline_consumption = _consumption_by_event(baseline.get("events", {}))
+            without_baseline = {
+                metric: consumption - baseline_consumption[metric]
+                for metric, consumption in with_baseline.items()
+                if metric in baseline_consumption
+            }
+
+        output.append({
+            "id": result.id,
+            "session_id": result.session_id,
+            "commit_hash": result.commit_hash,
+            "workflow_id": result.workflow_id,
+            "withBaseline": with_baseline,
+            "withoutBaseline": without_baseline
+        })
+
+    return output
+
 def get_results_by_repo_branch(repo, branch):
     repo = repo.strip()
     branch = branch.strip()
@@ -26,45 +130,62 @@ def get_results_by_repo_branch(repo, branch):
         Result.repository == repo,
         Result.branch == branch
     ).all()
+    prefetch_summaries(results)
 
-    output = []
-
-    for result in results:
-        try:
-            with open(result.json_path, "r") as f:
-                json_content = json.load(f)
-
-            aggregate = json_content.get("aggregate", {})
+    output = _consumption_records(results)
+    save_backfilled_summaries()
+    return output
 
-            with_baseline_data = aggregate.get("withBaseline", {})
-            with_baseline = {
-                metric: data.get("consumption")
-                for metric, data in with_baseline_data.items()
-                if isinstance(data, dict) and "consumption" in data
-            }
+def _commit_range(results, from_commit=None, to_commit=None):
+    start = 0
+    end = len(results)
+    if from_commit:
+        positions = [i for i, r in enumerate(results) if r.commit_hash == from_commit]
+        if not positions:
+            raise ValueError(f"Unknown from_commit: {from_commit}")
+        start = positions[0]
+    if to_commit:
+        positions = [i for i, r in enumerate(results) if r.commit_hash == to_commit]
+        if not positions:
+            raise ValueError(f"Unknown to_commit: {to_commit}")
+        end = positions[-1] + 1
+    if start >= end:
+        raise ValueError(f"from_commit {from_commit} is newer than to_commit {to_commit}")
+    return results[start:end]
+
+def get_results_by_repo_branches(queries):
+    pairs = list({(q["repo"], q["branch"]) for q in queries})
+    grouped = defaultdict(list)
+    if pairs:
+        results = db_session.query(Result).filter(
+            tuple_(Result.repository, Result.branch).in_(pairs)
+        ).order_by(Result.created_at, Result.id).all()
+        prefetch_summaries(results)
+        for result in results:
+            grouped[(result.repository, result.branch)].append(result)
 
-            without_baseline_data = aggregate.get("withoutBaseline", {})
-            without_baseline = {
-                metric: data.get("consumption")
-                for metric, data in without_baseline_data.items()
-                if isinstance(data, dict) and "consumption" in data
-            }
+    output = []
+    for query in queries:
+        try:
+            selected = _commit_range(grouped[(query["repo"], query["branch"])], query.get("from_commit"), query.get("to_commit"))
+            output.append({**query, "results": _consumption_records(selected)})
+        except ValueError as e:
+            output.append({**query, "error": str(e)})
 
-            output.append({
-                "id": result.id,
-                "session_id": result.session_id,
-                "commit_hash": result.commit_hash,
-                "workflow_id": result.workflow_id,
-                "created_at": result.created_at.isoformat(),
-                "withBaseline": with_baseline,
-                "withoutBaseline": without_baseline
-            })
+    save_backfilled_summaries()
+    return output
 
-        except Exception as e:
-            continue
 
-    return output
+FILTER_FIELDS = (
+    "ci", "run_id", "branch", "repository", "workflow_id",
+    "workflow_name", "commit_hash", "approach", "method", "label"
+)
 
+def _apply_filters(query, filters):
+    for field, value in filters.items():
+        if value is not None:
+            query = query.filter(getattr(Result, field) == value)
+    return query
 
 def get_results_by_filters(
     ci=None,
@@ -78,27 +199,30 @@ def get_results_by_filters(
     method=None,
     label=None
 ):
-    query = db_session.query(Result)
-
-    if ci is not None:
-        query = query.filter(Result.ci == ci)
-    if run_id is not None:
-        query = query.filter(Result.run_id == run_id)
-    if branch is not None:
-        query = query.filter(Result.branch == branch)
-    if repository is not None:
-        query = query.filter(Result.repository == repository)
-    if workflow_id is not None:
-        query = query.filter(Result.workflow_id == workflow_id)
-    if workflow_name is not None:
-        query = query.filter(Result.workflow_name == workflow_name)
-    if commit_hash is not None:
-        query = query.filter(Result.commit_hash == commit_hash)
-    if approach is not None:
-        query = query.filter(Result.approach == approach)
-    if method is not None:
-        query = query.filter(Result.method == method)
-    if label is not None:
-        query = query.filter(Result.label == label)
-
-    return query.all()
+    filters = {
+        "ci": ci, "run_id": run_id, "branch": branch, "repository": repository,
+        "workflow_id": workflow_id, "workflow_name": workflow_name, "commit_hash": commit_hash,
+        "approach": approach, "method": method, "label": label
+    }
+    return _apply_filters(db_session.query(Result), filters).all()
+
+def get_commit_page(filters, after=None, limit=None):
+    first_id = func.min(Result.id).label("first_id")
+    query = _apply_filters(db_session.query(Result.commit_hash, first_id), filters).group_by(Result.commit_hash)
+    if after is not None:
+        query = query.having(first_id > after)
+    query = query.order_by(first_id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].first_id
+    return [row.commit_hash for row in rows], next_cursor
+
+def get_results_for_commits(filters, commits):
+    return _apply_filters(db_session.query(Result), filters).filter(
+        Result.commit_hash.in_(commits)
+    ).order_by(Result.id).all()
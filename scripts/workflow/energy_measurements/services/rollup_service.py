@@ -0,0 +1,156 @@
+import logging
+from collections import defaultdict
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from db.db import db_session
+from models.commit_rollup import CommitRollup
+from services.result_service import subtract_events
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_DIMENSIONS = ("repository", "branch", "commit_hash", "workflow_id", "approach", "method", "label")
+ROLLUP_KEY = ROLLUP_DIMENSIONS + ("variant", "event")
+SUMMED_FIELDS = {
+    "consumption": "consumption_sum",
+    "mean": "mean_sum",
+    "carbon_footprint_g": "carbon_footprint_g_sum"
+}
+
+def _variant_rows(keys, variant, summary, events):
+    rows = [{
+        **keys, "variant": variant, "event": CommitRollup.RUN, "count": 1,
+        "delta_t_sum": summary.get("delta_t_seconds", 0),
+        "delta_t_count": 1 if "delta_t_seconds" in summary else 0
+    }]
+    for event_name, event_data in events.items():
+        row = {**keys, "variant": variant, "event": event_name, "count": 1}
+        for field, column in SUMMED_FIELDS.items():
+            row[column] = event_data.get(field, 0)
+        if isinstance(event_data.get("consumption"), (int, float)):
+            row["consumption_min"] = row["consumption_max"] = event_data["consumption"]
+        rows.append(row)
+    return rows
+
+def rollup_rows(result, summary_main, summary_baseline=None):
+    if not summary_main:
+        return []
+    keys = {dimension: getattr(result, dimension) for dimension in ROLLUP_DIMENSIONS}
+    main_events = summary_main.get("events", {})
+    rows = _variant_rows(keys, CommitRollup.MAIN, summary_main, main_events)
+    if summary_baseline is not None:
+        subtracted = subtract_events(main_events, summary_baseline.get("events", {}))
+        rows += _variant_rows(keys, CommitRollup.SUBTRACTED, summary_main, subtracted)
+    return rows
+
+def merge_rollup_rows(rows):
+    merged = {}
+    for row in rows:
+        key = tuple(row[c] for c in ROLLUP_KEY)
+        current = merged.get(key)
+        if current is None:
+            merged[key] = dict(row)
+            continue
+        for column in ("count", "delta_t_sum", "delta_t_count", *SUMMED_FIELDS.values()):
+            if column in row:
+                current[column] = current.get(column, 0) + row[column]
+        if "consumption_min" in row:
+            current["consumption_min"] = min(current.get("consumption_min", row["consumption_min"]), row["consumption_min"])
+            current["consumption_max"] = max(current.get("consumption_max", row["consumption_max"]), row["consumption_max"])
+    return list(merged.values())
+
+def _increment(connection, row):
+    table = CommitRollup.__table__
+    amounts = {c: row[c] for c in ("count", "delta_t_sum", "delta_t_count", *SUMMED_FIELDS.values()) if c in row}
+    values = {table.c[c]: table.c[c] + amount for c, amount in amounts.items()}
+    if "consumption_min" in row:
+        low, high = table.c.consumption_min, table.c.consumption_max
+        values[low] = case((low.is_(None) | (low > row["consumption_min"]), row["consumption_min"]), else_=low)
+        values[high] = case((high.is_(None) | (high < row["consumption_max"]), row["consumption_max"]), else_=high)
+    statement = update(table).where(*(table.c[c] == row[c] for c in ROLLUP_KEY)).values(values)
+    return connection.execute(statement).rowcount
+
+def apply_rollup(connection, rows):
+    for row in rows:
+        if _increment(connection, row):
+            continue
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(CommitRollup.__table__).values(row))
+        except IntegrityError:
+            _increment(connection, row)
+
+def _existing_keys(connection, rows, chunk_size=500):
+    table = CommitRollup.__table__
+    commits = sorted({row["commit_hash"] for row in rows})
+    existing = set()
+    for i in range(0, len(commits), chunk_size):
+        statement = select(*(table.c[c] for c in ROLLUP_KEY)).where(table.c.commit_hash.in_(commits[i:i + chunk_size]))
+        existing.update(tuple(key) for key in connection.execute(statement))
+    return existing
+
+def apply_rollup_bulk(connection, rows):
+    rows = merge_rollup_rows(rows)
+    existing = _existing_keys(connection, rows)
+    new_rows, updates = [], []
+    for row in rows:
+        (updates if tuple(row[c] for c in ROLLUP_KEY) in existing else new_rows).append(row)
+
+    if new_rows:
+        defaults = {c: 0 for c in ("count", "delta_t_sum", "delta_t_count", *SUMMED_FIELDS.values())}
+        defaults.update(consumption_min=None, consumption_max=None)
+        try:
+            with connection.begin_nested():
+                connection.execute(insert(CommitRollup.__table__), [{**defaults, **row} for row in new_rows])
+        except IntegrityError:
+            apply_rollup(connection, new_rows)
+    apply_rollup(connection, updates)
+
+def record_result(result):
+    apply_rollup(db_session, rollup_rows(result, result.summary_main, result.summary_baseline))
+
+def can_serve(filters):
+    return set(filters) <= set(ROLLUP_DIMENSIONS)
+
+def get_commit_rollups(filters, commits):
+    query = db_session.query(
+        CommitRollup.commit_hash,
+        CommitRollup.variant,
+        CommitRollup.event,
+        func.sum(CommitRollup.count),
+        func.sum(CommitRollup.consumption_sum),
+        func.sum(CommitRollup.mean_sum),
+        func.sum(CommitRollup.carbon_footprint_g_sum),
+        func.sum(CommitRollup.delta_t_sum),
+        func.sum(CommitRollup.delta_t_count)
+    ).filter(CommitRollup.commit_hash.in_(commits))
+    for field, value in filters.items():
+        query = query.filter(getattr(CommitRollup, field) == value)
+    query = query.group_by(CommitRollup.commit_hash, CommitRollup.variant, CommitRollup.event)
+
+    rollups = defaultdict(lambda: defaultdict(dict))
+    for commit, variant, event, count, consumption, mean, carbon, delta_t_sum, delta_t_count in query.all():
+        rollups[commit][variant][event] = {
+            "count": count,
+            "consumption": consumption,
+            "mean": mean,
+            "carbon_footprint_g": carbon,
+            "delta_t_sum": delta_t_sum,
+            "delta_t_count": delta_t_count
+        }
+    return rollups
+
+def get_event_series(filters, variant, event):
+    query = db_session.query(
+        CommitRollup.commit_hash,
+        func.sum(CommitRollup.count),
+        func.sum(CommitRollup.consumption_sum),
+        func.min(CommitRollup.consumption_min),
+        func.max(CommitRollup.consumption_max)
+    ).filter(CommitRollup.variant == variant, CommitRollup.event == event)
+    for field, value in filters.items():
+        query = query.filter(getattr(CommitRollup, field) == value)
+    return {
+        commit: {"runs": count, "mean": total / count, "min": low, "max": high}
+        for commit, count, total, low, high in query.group_by(CommitRollup.commit_hash).all()
+        if count
+    }
@@ -0,0 +1,215 @@
+import os
+import math
+import numpy as np
+
+SIGNIFICANCE_ALPHA = float(os.environ.get("WATTSCI_SIGNIFICANCE_ALPHA", "0.05"))
+SIGNIFICANCE_TEST = os.environ.get("WATTSCI_SIGNIFICANCE_TEST", "mannwhitney")
+CONFIDENCE_LEVEL = float(os.environ.get("WATTSCI_CONFIDENCE_LEVEL", "0.95"))
+BOOTSTRAP_RESAMPLES = int(os.environ.get("WATTSCI_BOOTSTRAP_RESAMPLES", "1000"))
+BOOTSTRAP_SEED = int(os.environ.get("WATTSCI_BOOTSTRAP_SEED", "0"))
+BOOTSTRAP_MAX_CELLS = int(os.environ.get("WATTSCI_BOOTSTRAP_MAX_CELLS", str(4_000_000)))
+MIN_RELATIVE_EFFECT = float(os.environ.get("WATTSCI_MIN_RELATIVE_EFFECT", "0"))
+MIN_SAMPLES = int(os.environ.get("WATTSCI_MIN_SAMPLES", "3"))
+
+TESTS = ("mannwhitney", "welch")
+
+IMPROVED = "improved"
+REGRESSED = "regressed"
+NO_SIGNIFICANT_CHANGE = "no_significant_change"
+INSUFFICIENT_DATA = "insufficient_data"
+
+def measurement_series(data, variant="withBaseline", field="consumption"):
+    keys = sorted((k for k in data if k.startswith("measurement_")), key=lambda k: int(k.split("_")[1]))
+    series = {}
+    for key in keys:
+        for event, values in data[key].get(variant, {}).items():
+            if isinstance(values, dict) and isinstance(values.get(field), (int, float)):
+                series.setdefault(event, []).append(values[field])
+    return {event: np.asarray(values, dtype=float) for event, values in series.items()}
+
+def _betacf(a, b, x, iterations=300, eps=3e-14):
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, iterations + 1):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < eps:
+            break
+    return h
+
+def _betainc(a, b, x):
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x))
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+def t_two_sided_p(t, df):
+    return _betainc(df / 2, 0.5, df / (df + t * t))
+
+def t_critical(confidence, df, iterations=100):
+    alpha = 1 - confidence
+    low, high = 0.0, 1.0
+    while t_two_sided_p(high, df) > alpha:
+        high *= 2
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        if t_two_sided_p(mid, df) > alpha:
+            low = mid
+        else:
+            high = mid
+        if high - low < 1e-10:
+            break
+    return (low + high) / 2
+
+def welch_test(x, y):
+    n1, n2 = x.size, y.size
+    v1, v2 = x.var(ddof=1) / n1, y.var(ddof=1) / n2
+    difference = x.mean() - y.mean()
+    if v1 + v2 == 0:
+        return {"t": None, "df": n1 + n2 - 2, "p_value": 1.0 if difference == 0 else 0.0}
+    t = difference / math.sqrt(v1 + v2)
+    df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+    return {"t": float(t), "df": float(df), "p_value": float(t_two_sided_p(t, df))}
+
+def mann_whitney_test(x, y):
+    n1, n2 = x.size, y.size
+    combined = np.concatenate([x, y])
+    order = np.argsort(combined, kind="mergesort")
+    _, first, counts = np.unique(combined[order], return_index=True, return_counts=True)
+    ranks = np.empty(combined.size)
+    ranks[order] = np.repeat(first + (counts + 1) / 2, counts)
+
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    ties = float((counts ** 3 - counts).sum())
+    sigma = math.sqrt(n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))))
+    if sigma == 0:
+        p_value = 1.0
+    else:
+        z = max(abs(u - n1 * n2 / 2) - 0.5, 0) / sigma
+        p_value = min(1.0, math.erfc(z / math.sqrt(2)))
+    return {"u": float(u), "p_value": p_value}
+
+def cliffs_delta(u, n1, n2):
+    return float(2 * u / (n1 * n2) - 1)
+
+def hedges_g(x, y):
+    n1, n2 = x.size, y.size
+    pooled = math.sqrt(((n1 - 1) * x.var(ddof=1) + (n2 - 1) * y.var(ddof=1)) / (n1 + n2 - 2))
+    if pooled == 0:
+        return None
+    return float((x.mean() - y.mean()) / pooled * (1 - 3 / (4 * (n1 + n2) - 9)))
+
+def _bootstrap_means(matrix, resamples, rng):
+    events, n = matrix.shape
+    center = matrix.mean(axis=1)
+    deviations = (matrix - center[:, None]).T.astype(np.float32)
+    chunk = max(1, min(BOOTSTRAP_MAX_CELLS, np.iinfo(np.int32).max) // n)
+    means = np.empty((resamples, events))
+    for start in range(0, resamples, chunk):
+        size = min(chunk, resamples - start)
+        indices = rng.integers(0, n, (size, n), dtype=np.int32)
+        indices += (np.arange(size, dtype=np.int32) * n)[:, None]
+        weights = np.bincount(indices.ravel(), minlength=size * n).astype(np.float32).reshape(size, n)
+        means[start:start + size] = weights @ deviations / n + center
+    return means
+
+def bootstrap_means(series, resamples, rng):
+    groups = {}
+    for event, values in series.items():
+        groups.setdefault(values.size, []).append(event)
+    means = {}
+    for events in groups.values():
+        matrix = _bootstrap_means(np.stack([series[e] for e in events]), resamples, rng)
+        for i, event in enumerate(events):
+            means[event] = matrix[:, i]
+    return means
+
+def _finite(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+def _verdict(difference, ci, p_value, relative_change, alpha, min_effect):
+    if p_value >= alpha or ci[0] <= 0 <= ci[1] or abs(relative_change or 0) < min_effect:
+        return NO_SIGNIFICANT_CHANGE
+    return IMPROVED if difference < 0 else REGRESSED
+
+def compare_distributions(
+    base_series,
+    refactor_series,
+    alpha=None,
+    test=None,
+    confidence=None,
+    resamples=None,
+    min_effect=None,
+    seed=None
+):
+    alpha = SIGNIFICANCE_ALPHA if alpha is None else alpha
+    test = test or SIGNIFICANCE_TEST
+    confidence = CONFIDENCE_LEVEL if confidence is None else confidence
+    resamples = resamples or BOOTSTRAP_RESAMPLES
+    min_effect = MIN_RELATIVE_EFFECT if min_effect is None else min_effect
+    if test not in TESTS:
+        raise ValueError(f"Unsupported significance test: {test} (available: {', '.join(TESTS)})")
+
+    comparison = {}
+    testable = []
+    for event, base in base_series.items():
+        refactor = refactor_series.get(event)
+        samples = [int(base.size), int(refactor.size) if refactor is not None else 0]
+        if min(samples) < max(MIN_SAMPLES, 2):
+            comparison[event] = {"samples": samples, "status": INSUFFICIENT_DATA}
+        else:
+            testable.append(event)
+    if not testable:
+        return comparison
+
+    rng = np.random.default_rng(BOOTSTRAP_SEED if seed is None else seed)
+    base_means = bootstrap_means({e: base_series[e] for e in testable}, resamples, rng)
+    refactor_means = bootstrap_means({e: refactor_series[e] for e in testable}, resamples, rng)
+    differences = np.stack([refactor_means[e] - base_means[e] for e in testable], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative = differences / np.stack([base_means[e] for e in testable], axis=1)
+    tail = (1 - confidence) / 2 * 100
+    ci = np.percentile(differences, [tail, 100 - tail], axis=0)
+    relative_ci = np.percentile(relative, [tail, 100 - tail], axis=0)
+
+    for i, event in enumerate(testable):
+        base, refactor = base_series[event], refactor_series[event]
+        base_mean, refactor_mean = float(base.mean()), float(refactor.mean())
+        difference = refactor_mean - base_mean
+        relative_change = difference / base_mean if base_mean else None
+        tests = {"mannwhitney": mann_whitney_test(refactor, base), "welch": welch_test(refactor, base)}
+        interval = [float(ci[0, i]), float(ci[1, i])]
+        comparison[event] = {
+            "samples": [int(base.size), int(refactor.size)],
+            "base_mean": base_mean,
+            "refactor_mean": refactor_mean,
+            "difference": difference,
+            "relative_change": relative_change,
+            "confidence": confidence,
+            "ci": interval,
+            "relative_ci": [_finite(relative_ci[0, i]), _finite(relative_ci[1, i])],
+            "mannwhitney": tests["mannwhitney"],
+            "welch": tests["welch"],
+            "hedges_g": hedges_g(refactor, base),
+            "cliffs_delta": cliffs_delta(tests["mannwhitney"]["u"], refactor.size, base.size),
+            "test": test,
+            "alpha": alpha,
+            "p_value": tests[test]["p_value"],
+            "status": _verdict(difference, interval, tests[test]["p_value"], relative_change, alpha, min_effect)
+        }
+    return comparison
@@ -0,0 +1,53 @@
+import os
+import json
+import uuid
+import fcntl
+import threading
+from contextlib import contextmanager
+
+LOCK_NAME = ".lock"
+
+_held = threading.local()
+
+@contextmanager
+def session_lock(session_dir, shared=False):
+    held = _held.__dict__.setdefault("paths", set())
+    lock_path = os.path.join(os.path.abspath(session_dir), LOCK_NAME)
+    if lock_path in held:
+        yield
+        return
+
+    os.makedirs(session_dir, exist_ok=True)
+    with open(lock_path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held.add(lock_path)
+        try:
+            yield
+        finally:
+            held.discard(lock_path)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def write_atomic(path, content):
+    binary = isinstance(content, bytes)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def write_json_atomic(path, data, **kwargs):
+    write_atomic(path, json.dumps(data, **kwargs))
+
+def allocate_numbered_dir(parent, prefix):
+    existing = [d[len(prefix):] for d in os.listdir(parent) if d.startswith(prefix)]
+    number = max((int(n) for n in existing if n.isdigit()), default=-1) + 1
+    while True:
+        path = os.path.join(parent, f"{prefix}{number}")
+        try:
+            os.makedirs(path)
+            return path
+        except FileExistsError:
+            number += 1
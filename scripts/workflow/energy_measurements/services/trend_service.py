@@ -0,0 +1,82 @@
+import numpy as np
+from sqlalchemy import func
+from db.db import db_session
+from models.result import Result
+from services.rollup_service import get_event_series
+
+TREND_MODES = ("bucket", "lttb")
+
+def _commit_times(filters):
+    query = db_session.query(Result.commit_hash, func.min(Result.created_at))
+    for field, value in filters.items():
+        query = query.filter(getattr(Result, field) == value)
+    return dict(query.group_by(Result.commit_hash).all())
+
+def lttb_indices(x, y, points):
+    n = len(x)
+    if points >= n:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    selected = [0]
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        prev = selected[-1]
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev]) - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        selected.append(start + int(np.argmax(areas)))
+    selected.append(n - 1)
+    return np.array(selected)
+
+def _bucket(series):
+    runs = sum(p["runs"] for p in series)
+    lows = [p["min"] for p in series if p["min"] is not None]
+    highs = [p["max"] for p in series if p["max"] is not None]
+    return {
+        "commit_hash": series[-1]["commit_hash"],
+        "timestamp": series[-1]["timestamp"],
+        "start": series[0]["timestamp"],
+        "end": series[-1]["timestamp"],
+        "first_commit": series[0]["commit_hash"],
+        "last_commit": series[-1]["commit_hash"],
+        "commits": len(series),
+        "runs": runs,
+        "mean": sum(p["mean"] * p["runs"] for p in series) / runs,
+        "min": min(lows) if lows else None,
+        "max": max(highs) if highs else None
+    }
+
+def downsample(series, points, mode="bucket"):
+    if len(series) <= points:
+        return [_bucket([p]) for p in series]
+    if mode == "lttb":
+        x = np.array([p["time"] for p in series], dtype=float)
+        y = np.array([p["mean"] for p in series], dtype=float)
+        return [_bucket([series[i]]) for i in lttb_indices(x, y, points)]
+    return [_bucket(list(chunk)) for chunk in np.array_split(np.array(series, dtype=object), points)]
+
+def get_trend(filters, event, variant, points, mode="bucket"):
+    values = get_event_series(filters, variant, event)
+    times = _commit_times(filters)
+
+    series = sorted(
+        (
+            {"commit_hash": commit, "time": times[commit].timestamp(), "timestamp": times[commit].isoformat(), **value}
+            for commit, value in values.items()
+            if commit in times
+        ),
+        key=lambda p: p["time"]
+    )
+    total = len(series)
+    sampled = downsample(series, points, mode)
+    for point in sampled:
+        for key in ("mean", "min", "max"):
+            if point[key] is not None:
+                point[key] = round(point[key], 2)
+    return {"event": event, "variant": variant, "mode": mode, "commits": total, "points": sampled}
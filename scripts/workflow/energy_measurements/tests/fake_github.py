@@ -0,0 +1,100 @@
+import json
+import time
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeGitHub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(("127.0.0.1", 0), FakeGitHubHandler)
+        self.latency = latency
+        self.pulls = {}
+        self.closed = set()
+        self.faults = []
+        self.calls = Counter()
+        self.connections = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def clear_pulls(self):
+        self.pulls.clear()
+        self.closed.clear()
+
+    def reset(self):
+        with self.lock:
+            self.calls.clear()
+            self.connections = 0
+            self.not_modified = 0
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_cached(self, body, etag):
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            return self._send(304, headers={"ETag": etag})
+        self._send(200, body, {"ETag": etag})
+
+    def _handle(self, method):
+        time.sleep(self.server.latency)
+        path, _, query = self.path.partition("?")
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        with self.server.lock:
+            segment = path.rsplit("/", 1)[-1]
+            self.server.calls[method, "pull" if segment.isdigit() else segment] += 1
+            fault = self.server.faults.pop(0) if self.server.faults else None
+        if fault == "5xx":
+            return self._send(502, {"message": "Bad Gateway"})
+        if fault == "secondary":
+            return self._send(403, {"message": "You have exceeded a secondary rate limit."}, {"Retry-After": "0"})
+
+        repo = "/".join(path.split("/")[2:4])
+        if method == "GET" and path.endswith("/pulls"):
+            params = dict(p.split("=", 1) for p in query.split("&") if p)
+            number = self.server.pulls.get((repo, params.get("head", "").replace("%3A", ":"), params.get("base")))
+            number = None if number in self.server.closed else number
+            return self._send_cached([{"number": number}] if number else [], f'"{repo}-{number}"')
+        if method == "GET" and "/pulls/" in path:
+            number = int(path.rsplit("/", 1)[-1])
+            if number not in self.server.pulls.values():
+                return self._send(404, {"message": "Not Found"})
+            state = "closed" if number in self.server.closed else "open"
+            return self._send_cached({"number": number, "state": state}, f'"{repo}-{number}-{state}"')
+        if method == "POST" and path.endswith("/pulls"):
+            key = (repo, f"{repo.split('/')[0]}:{body['head']}", body["base"])
+            if key in self.server.pulls and self.server.pulls[key] not in self.server.closed:
+                return self._send(422, {"message": "A pull request already exists"})
+            self.server.pulls[key] = len(self.server.pulls) + len(self.server.closed) + 1
+            return self._send(201, {"number": self.server.pulls[key]})
+        if method == "POST" and path.endswith("/comments"):
+            return self._send(201, {"id": 1})
+        self._send(404, {"message": "Not Found"})
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
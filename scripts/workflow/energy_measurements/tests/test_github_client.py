@@ -0,0 +1,67 @@
+import threading
+import pytest
+from services.github_client import GitHubClient
+from tests.fake_github import FakeGitHub
+
+TOKEN = "ghp_test"
+REPO = "org/repo"
+
+@pytest.fixture
+def server():
+    server = FakeGitHub(0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def client(server):
+    return GitHubClient(base_url=f"http://127.0.0.1:{server.server_address[1]}", backoff=0.01, max_backoff=0.05)
+
+def test_cached_pull_request_is_reused(server, client):
+    number = client.create_pull_request(REPO, "main", "refactor", TOKEN)
+    assert server.calls["POST", "pulls"] == 1
+
+    server.reset()
+    for _ in range(2):
+        assert client.create_pull_request(REPO, "main", "refactor", TOKEN) == number
+    assert not server.calls["GET", "pulls"] and not server.calls["POST", "pulls"]
+    assert server.calls["GET", "pull"] == 2
+    assert server.not_modified == 1
+
+def test_expired_cache_revalidates_with_etag(server, client):
+    number = client.create_pull_request(REPO, "main", "refactor", TOKEN)
+
+    server.reset()
+    for _ in range(2):
+        client.pull_requests.clear()
+        assert client.create_pull_request(REPO, "main", "refactor", TOKEN) == number
+    assert server.calls["GET", "pulls"] == 2 and not server.calls["POST", "pulls"]
+    assert server.not_modified == 1
+
+def test_closed_pull_request_is_reopened(server, client):
+    closed = client.create_pull_request(REPO, "main", "refactor", TOKEN)
+    server.closed.add(closed)
+
+    server.reset()
+    number = client.create_pull_request(REPO, "main", "refactor", TOKEN)
+    assert number != closed
+    assert server.calls["POST", "pulls"] == 1
+    assert client.create_pull_request(REPO, "main", "refactor", TOKEN) == number
+
+@pytest.mark.parametrize("fault", ["5xx", "secondary"])
+def test_idempotent_requests_are_retried(server, client, fault):
+    number = client.create_pull_request(REPO, "main", "refactor", TOKEN)
+    client.pull_requests.clear()
+
+    server.reset()
+    server.faults = [fault, fault]
+    assert client.create_pull_request(REPO, "main", "refactor", TOKEN) == number
+    assert server.calls["GET", "pulls"] == 3
+    assert not server.calls["POST", "pulls"]
+
+def test_post_is_not_retried_on_5xx(server, client):
+    server.faults = ["5xx"]
+    response = client.post_comment(REPO, 1, TOKEN, "x")
+    assert response.status_code == 502
+    assert server.calls["POST", "comments"] == 1
@@ -0,0 +1,117 @@
+import os
+import glob
+import json
+import time
+import shutil
+import multiprocessing
+import pytest
+from services.storage_service import allocate_numbered_dir, session_lock, write_json_atomic
+
+PROCESSES = 4
+ITERATIONS = 5
+CAPTURE_ROOT = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), "..", "..", "..", "..", "evaluation", "results", "energy_measurements", "original", "main"
+))
+
+def _run(target, *args):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(PROCESSES)
+    workers = [context.Process(target=target, args=(w, barrier) + args) for w in range(PROCESSES)]
+    for w in workers:
+        w.start()
+    # Process.start() drops its args, so the caller holds the barrier until the workers are joined.
+    return workers, barrier
+
+def _join(workers):
+    for w in workers:
+        w.join(120)
+    assert [w.exitcode for w in workers] == [0] * PROCESSES
+
+def _allocate(worker, barrier, parent, results):
+    barrier.wait()
+    for _ in range(ITERATIONS):
+        results.put(allocate_numbered_dir(parent, "measurement"))
+
+def _increment(worker, barrier, session_dir):
+    barrier.wait()
+    counter = os.path.join(session_dir, "counter")
+    for _ in range(ITERATIONS):
+        with session_lock(session_dir):
+            with open(counter) as f:
+                value = int(f.read())
+            time.sleep(0.001)
+            with open(counter, "w") as f:
+                f.write(str(value + 1))
+
+def _write(worker, barrier, path):
+    barrier.wait()
+    for i in range(ITERATIONS * 10):
+        write_json_atomic(path, {"worker": worker, "iteration": i, "payload": [worker] * 20000})
+
+def _process(worker, barrier, session_dir, captures):
+    from methods.perf2 import perf
+
+    barrier.wait()
+    for i in range(ITERATIONS):
+        capture, timer_start, timer_end = captures[(worker * ITERATIONS + i) % len(captures)]
+        with session_lock(session_dir):
+            shutil.copy(capture, os.path.join(session_dir, "perf.txt"))
+            perf(session_dir, "perf.txt", timer_start, timer_end, False).process()
+
+def test_numbered_dirs_are_unique(tmp_path):
+    results = multiprocessing.get_context("spawn").Queue()
+    workers, barrier = _run(_allocate, str(tmp_path), results)
+    paths = [results.get(timeout=120) for _ in range(PROCESSES * ITERATIONS)]
+    _join(workers)
+
+    assert len(set(paths)) == len(paths)
+    assert sorted(os.listdir(tmp_path)) == sorted(f"measurement{i}" for i in range(len(paths)))
+
+def test_session_lock_serializes_same_session_work(tmp_path):
+    (tmp_path / "counter").write_text("0")
+    workers, barrier = _run(_increment, str(tmp_path))
+    _join(workers)
+
+    assert (tmp_path / "counter").read_text() == str(PROCESSES * ITERATIONS)
+
+def test_atomic_writes_are_never_torn(tmp_path):
+    path = str(tmp_path / "result.json")
+    workers, barrier = _run(_write, path)
+    reads = 0
+    while any(w.is_alive() for w in workers):
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            assert data["payload"] == [data["worker"]] * 20000
+            reads += 1
+    _join(workers)
+
+    assert reads
+    assert not glob.glob(f"{path}.*.tmp")
+
+def _captures():
+    captures = []
+    for path in sorted(glob.glob(os.path.join(CAPTURE_ROOT, "measurement*")))[:PROCESSES]:
+        with open(os.path.join(path, "data", "timer_start.txt")) as f:
+            timer_start = f.read().strip()
+        with open(os.path.join(path, "data", "timer_end.txt")) as f:
+            timer_end = f.read().strip()
+        captures.append((os.path.join(path, "decompressed"), timer_start, timer_end))
+    return captures
+
+def test_concurrent_measurements_land_in_one_session(tmp_path):
+    from methods.perf2 import perf
+    from services.result_codec import read_result
+
+    captures = _captures()
+    if not captures:
+        pytest.skip("evaluation captures are not available")
+    workers, barrier = _run(_process, str(tmp_path), captures)
+    _join(workers)
+
+    expected = PROCESSES * ITERATIONS
+    session = perf(str(tmp_path), "perf.txt", None, None, False)
+    data = session.load(exact=True)
+    assert len([k for k in data if k.startswith("measurement_")]) == expected
+    assert all(event["samples"] == expected for event in data["aggregate"]["withBaseline"].values())
+    assert sorted(read_result(session.document_path())) == sorted(session.load())